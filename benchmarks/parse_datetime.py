@@ -0,0 +1,58 @@
+"""Time `utils.parse_datetime` against plain dateparser on the kind of dates found on comment
+pages, where most dates are repeated.
+
+    python -m benchmarks.parse_datetime [--count 2000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+
+import dateparser
+
+from facebook_scraper import utils
+
+
+DATES = [
+    "Yesterday at 3:04 PM",
+    "Today at 11:00 AM",
+    "2 hrs",
+    "16h",
+    "5 mins",
+    "1 wk",
+    "3 mth",
+    "March 3, 2021 at 1:00 PM",
+    "7 November at 20:01",
+    "Oct 16 at 11:00 PM",
+    "Sat",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    texts = [
+        f"{random.choice(DATES).replace('1', str(random.randint(1, 9)), 1)} · Public"
+        for _ in range(args.count)
+    ]
+    print(f"{len(texts)} dates, {len(set(texts))} distinct")
+
+    settings = {'RELATIVE_BASE': datetime.today().replace(minute=0, hour=0, second=0)}
+    start = time.perf_counter()
+    for text in texts:
+        match = utils.datetime_regex.search(text) or utils.day_of_week_regex.search(text)
+        dateparser.parse(match.group(0).replace("mth", "month"), settings=settings)
+    print(f"  dateparser {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    utils._parse_datetime.cache_clear()
+    start = time.perf_counter()
+    for text in texts:
+        utils.parse_datetime(text)
+    print(f"  current    {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
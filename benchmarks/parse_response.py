@@ -0,0 +1,97 @@
+"""Compare the CPU time spent preparing and checking each response in `FacebookScraper.get`,
+before and after responses were parsed only once.
+
+Replays the responses recorded in the test cassettes:
+
+    python -m benchmarks.parse_response [--repeat 5]
+"""
+import argparse
+import glob
+import gzip
+import os
+import time
+import warnings
+
+import yaml
+
+from facebook_scraper import FacebookScraper, exceptions, utils
+
+
+CASSETTES = os.path.join(os.path.dirname(__file__), "..", "tests", "cassettes", "*.yaml")
+
+
+def load_responses():
+    responses = []
+    for filename in sorted(glob.glob(CASSETTES)):
+        with open(filename) as f:
+            cassette = yaml.safe_load(f)
+        for interaction in cassette["interactions"]:
+            response = interaction["response"]
+            content = response["body"]["string"]
+            if isinstance(content, str):
+                content = content.encode()
+            headers = {k: v[0] for k, v in response["headers"].items()}
+            if "gzip" in headers.get("Content-Encoding", headers.get("content-encoding", "")):
+                content = gzip.decompress(content)
+            if not content.strip():
+                continue
+            responses.append(
+                (interaction["request"]["uri"], response["status"]["code"], headers, content)
+            )
+    return responses
+
+
+def old_prepare_and_check(scraper, response):
+    """The response pipeline as it was: the page is serialised, stripped and parsed again,
+    and the checks serialise it once more"""
+    response.html.html = response.html.html.replace('<!--', '').replace('-->', '')
+    response.html.find("script", first=True)
+    "script" not in response.html.html
+    response.html.find("h1,h2", containing="Unsupported Browser")
+    title = response.html.find("title", first=True)
+    if title:
+        title.text.lower()
+        ">your account has been disabled<" in response.html.html.lower()
+        ">We saw unusual activity on your account." in response.html.html
+
+
+def new_prepare_and_check(scraper, response):
+    scraper.prepare_response(response)
+    try:
+        scraper.check_response(response)
+    except (exceptions.NotFound, exceptions.UnexpectedResponse):
+        pass
+
+
+def run(scraper, responses, prepare_and_check, repeat):
+    elapsed = 0
+    for _ in range(repeat):
+        for url, status_code, headers, content in responses:
+            response = utils.make_response(scraper.session, url, status_code, headers, content)
+            start = time.process_time()
+            prepare_and_check(scraper, response)
+            # Page parsers and extractors search the same document
+            response.html.find("article")
+            elapsed += time.process_time() - start
+    return elapsed / (repeat * len(responses))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    scraper = FacebookScraper()
+    scraper.have_checked_locale = True
+    responses = load_responses()
+
+    old = run(scraper, responses, old_prepare_and_check, args.repeat)
+    new = run(scraper, responses, new_prepare_and_check, args.repeat)
+    print(f"{len(responses)} responses")
+    print(f"before: {old * 1000:.1f} ms CPU per response")
+    print(f"after:  {new * 1000:.1f} ms CPU per response ({(1 - new / old) * 100:.0f}% less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Time `utils.remove_control_characters` against the original implementation on the pages
+and AJAX payloads recorded in the test cassettes, plus an emoji-heavy comment page.
+
+    python -m benchmarks.remove_control_characters [--repeat 20]
+"""
+import argparse
+import timeit
+
+from facebook_scraper.utils import remove_control_characters
+from tests.test_remove_control_characters import (
+    cassette_bodies,
+    reference_remove_control_characters,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    bodies = list(cassette_bodies())
+    emoji_page = "<div>Great game!!! 😂😂💖🎮 ¡Qué bueno! &amp; &#128150;</div>\n" * 5000
+    cases = [("cassettes", bodies), ("emoji comments", [emoji_page])]
+
+    for name, htmls in cases:
+        size = sum(len(html) for html in htmls) / 1e6
+        print(f"{name}: {len(htmls)} documents, {size:.1f}M characters")
+        for label, fn in [
+            ("original", reference_remove_control_characters),
+            ("current", remove_control_characters),
+        ]:
+            elapsed = min(
+                timeit.repeat(lambda: [fn(html) for html in htmls], number=1, repeat=args.repeat)
+            )
+            print(f"  {label:<9} {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Measure `get_posts` and `get_group_posts` end to end, with no network, by replaying the
+responses recorded in the test cassettes.
+
+Each scenario runs in its own process, so its peak RSS isn't mixed up with the others, and
+reports posts per second, CPU time per post, peak RSS, and the time split between parsing
+responses in `FacebookScraper.get`, `PageParser`, `PostExtractor` and `utils.parse_datetime`.
+Stages are nested: `PostExtractor` time includes the requests it sends and `parse_datetime`:
+
+    python -m benchmarks.replay_cassettes [--repeat 5] [--scenario smoke ...] [--output before.json]
+
+Save the JSON output of two commits and compare them with:
+
+    python -m benchmarks.replay_cassettes --compare before.json after.json
+"""
+import argparse
+import concurrent.futures
+import functools
+import gzip
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import warnings
+from collections import defaultdict
+from urllib.parse import urljoin, urlparse
+
+import yaml
+from requests_html import HTMLSession
+
+from facebook_scraper import FacebookScraper, Timings, utils
+
+
+CASSETTES = os.path.join(os.path.dirname(__file__), "..", "tests", "cassettes")
+NINTENDO_POSTS = "https://m.facebook.com/Nintendo/posts/"
+GROUP = 117507531664134
+
+# name: (cassette, method, positional argument, keyword arguments)
+SCENARIOS = {
+    "smoke": (
+        "TestGetPosts.test_smoketest.yaml",
+        "get_posts",
+        "Nintendo",
+        {"start_url": NINTENDO_POSTS, "options": {}},
+    ),
+    "no_extra_requests": (
+        "TestGetPosts.test_smoketest.yaml",
+        "get_posts",
+        "Nintendo",
+        {"start_url": NINTENDO_POSTS, "options": {"allow_extra_requests": False}},
+    ),
+    "fields": (
+        "TestGetPosts.test_smoketest.yaml",
+        "get_posts",
+        "Nintendo",
+        {"start_url": NINTENDO_POSTS, "options": {"fields": ["post_id", "text", "time"]}},
+    ),
+    "reactions": (
+        "TestGetPosts.test_get_posts_fields_presence.yaml",
+        "get_posts",
+        "Nintendo",
+        {"start_url": NINTENDO_POSTS, "options": {"reactions": True}},
+    ),
+    "group": (
+        "TestGetGroupPosts.test_get_group_posts.yaml",
+        "get_group_posts",
+        GROUP,
+        {"options": {}},
+    ),
+}
+
+
+def load_cassette(filename):
+    """The recorded responses by URL path, in the order they were recorded"""
+    with open(os.path.join(CASSETTES, filename)) as f:
+        cassette = yaml.safe_load(f)
+    responses = defaultdict(list)
+    for interaction in cassette["interactions"]:
+        response = interaction["response"]
+        content = response["body"]["string"]
+        if isinstance(content, str):
+            content = content.encode()
+        headers = {k: v[0] for k, v in response["headers"].items()}
+        if "gzip" in headers.get("Content-Encoding", headers.get("content-encoding", "")):
+            content = gzip.decompress(content)
+            headers = {k: v for k, v in headers.items() if k.lower() != "content-encoding"}
+        path = urlparse(interaction["request"]["uri"]).path.rstrip("/")
+        responses[path].append((response["status"]["code"], headers, content))
+    return responses
+
+
+class ReplaySession(HTMLSession):
+    """A session answering with the recorded responses instead of sending requests. Requests are
+    matched by path, like the test cassettes, and the last response is repeated once they run
+    out. Redirects are followed like requests does"""
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = responses
+        self.played = defaultdict(int)
+        self.requested = 0
+
+    def get(self, url, **kwargs):
+        for _ in range(10):
+            path = urlparse(url).path.rstrip("/")
+            recorded = self.responses.get(path)
+            if not recorded:
+                raise ValueError(f"No recorded response for {url}")
+            status_code, headers, content = recorded[min(self.played[path], len(recorded) - 1)]
+            self.played[path] += 1
+            self.requested += 1
+            location = headers.get("Location", headers.get("location"))
+            if status_code in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+            return utils.make_response(self, url, status_code, headers, content)
+        raise ValueError(f"Too many redirects for {url}")
+
+
+def timed_parse_datetime(timings, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with timings.time("parse_datetime"):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def run_scenario(name, repeat):
+    warnings.simplefilter("ignore")
+    cassette, method, argument, kwargs = SCENARIOS[name]
+    responses = load_cassette(cassette)
+    timings = Timings()
+    # Extractors call parse_datetime through the utils module
+    utils.parse_datetime = timed_parse_datetime(timings, utils.parse_datetime)
+
+    runs = []
+    for _ in range(repeat):
+        utils._parse_datetime.cache_clear()
+        timings.reset()
+        session = ReplaySession(responses)
+        scraper = FacebookScraper(session=session)
+        scraper.have_checked_locale = True
+        scraper.set_retry_policy(None)
+        scraper.set_timings(timings)
+        options = dict(kwargs["options"])
+        call_kwargs = dict(kwargs, options=options, page_limit=2)
+
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        posts = list(getattr(scraper, method)(argument, **call_kwargs))
+        cpu = time.process_time() - cpu_started
+        elapsed = time.perf_counter() - started
+
+        stages = timings.stats()
+        extract = sum(
+            stats["total"] for stage, stats in stages.items() if stage.startswith("extract.")
+        )
+        runs.append(
+            {
+                "posts": len(posts),
+                "requests": session.requested,
+                "elapsed": elapsed,
+                "cpu": cpu,
+                "split": {
+                    "check": stages.get("check", {}).get("total", 0.0),
+                    "parse": stages.get("parse", {}).get("total", 0.0),
+                    "extract": extract,
+                    "parse_datetime": stages.get("parse_datetime", {}).get("total", 0.0),
+                    "request": stages.get("request", {}).get("total", 0.0),
+                },
+                "stages": {stage: stats["total"] for stage, stats in stages.items()},
+            }
+        )
+
+    # The fastest run is the one least disturbed by the rest of the machine
+    best = min(runs, key=lambda run: run["cpu"])
+    posts = best["posts"]
+    return {
+        "posts": posts,
+        "requests": best["requests"],
+        "posts_per_second": posts / best["elapsed"] if best["elapsed"] else None,
+        "cpu_per_post": best["cpu"] / posts if posts else None,
+        "elapsed": best["elapsed"],
+        "cpu": best["cpu"],
+        # Kilobytes on Linux, bytes on macOS
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        / (1 << 20 if sys.platform == "darwin" else 1 << 10),
+        "split": best["split"],
+        "stages": best["stages"],
+        "repeat": repeat,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except OSError:
+        return None
+
+
+def compare(before_filename, after_filename):
+    with open(before_filename) as f:
+        before = json.load(f)
+    with open(after_filename) as f:
+        after = json.load(f)
+    print(f"{before.get('commit')} -> {after.get('commit')}")
+    for name, new in after["scenarios"].items():
+        old = before["scenarios"].get(name)
+        if old is None:
+            continue
+        print(name)
+        for key in ["posts_per_second", "cpu_per_post", "peak_rss_mb"]:
+            if not old[key] or new[key] is None:
+                continue
+            change = (new[key] / old[key] - 1) * 100
+            print(f"  {key:<17} {old[key]:10.3f} {new[key]:10.3f} {change:+6.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS))
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = {}
+    for name in args.scenario or SCENARIOS:
+        # A fresh process per scenario, so peak RSS and caches aren't shared between them
+        with concurrent.futures.ProcessPoolExecutor(
+            1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            result = executor.submit(run_scenario, name, args.repeat).result()
+        results[name] = result
+        split = ", ".join(
+            f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in result["split"].items()
+        )
+        print(
+            f"{name:<18} {result['posts']:3} posts {result['posts_per_second']:7.1f} posts/s "
+            f"{result['cpu_per_post'] * 1000:7.1f} ms CPU/post {result['peak_rss_mb']:6.1f} MB "
+            f"({split})"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "commit": git_commit(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "scenarios": results,
+                },
+                f,
+                indent=4,
+            )
+
+
+if __name__ == "__main__":
+    main()
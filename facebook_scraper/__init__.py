@@ -1,9 +1,9 @@
-import csv
 import json
 import locale
 import logging
 import pathlib
 import sys
+import threading
 import warnings
 import pickle
 from typing import Any, Dict, Iterator, Optional, Set, Union
@@ -12,9 +12,19 @@ from requests.cookies import cookiejar_from_dict
 
 from .constants import DEFAULT_REQUESTS_TIMEOUT, DEFAULT_COOKIES_FILE_PATH
 from .facebook_scraper import FacebookScraper
-from .fb_types import Credentials, Post, RawPost, Profile
+from .async_facebook_scraper import AsyncFacebookScraper
+from .cache import ResponseCache
+from .rate_limiter import RateLimiter
+from .retry import RetryPolicy
+from .sinks import Sink, CsvSink, JsonSink, JsonLinesSink, ParquetSink, SqliteSink, QueuedSink
+from .identities import Identity, IdentityPool
+from .seen_posts import SeenPostIndex
+from .checkpoint import Checkpoint
+from .timings import Timings
+from .batch import BatchScraper
+from .fb_types import Credentials, Post, RawPost, Profile, json_default
 from .utils import html_element_to_string, parse_cookie_file
-from . import exceptions
+from . import exceptions, sinks
 import traceback
 import time
 from datetime import datetime, timedelta
@@ -22,7 +32,29 @@ import re
 import os
 
 
-_scraper = FacebookScraper()
+class _LazyScraper:
+    """The scraper of the module level functions. Creating a scraper imports requests_html and
+    opens a session, so it's only done when the scraper is first used"""
+
+    def __init__(self):
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def get_instance(self) -> FacebookScraper:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    object.__setattr__(self, "_instance", FacebookScraper())
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self.get_instance(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.get_instance(), name, value)
+
+
+_scraper = _LazyScraper()
 
 
 def set_cookies(cookies):
@@ -70,6 +102,30 @@ def set_noscript(noscript):
     _scraper.set_noscript(noscript)
 
 
+def set_cache(cache):
+    _scraper.set_cache(cache)
+
+
+def set_rate_limiter(rate_limiter):
+    _scraper.set_rate_limiter(rate_limiter)
+
+
+def set_retry_policy(retry_policy):
+    _scraper.set_retry_policy(retry_policy)
+
+
+def set_identities(identities):
+    _scraper.set_identities(identities)
+
+
+def set_seen_posts(seen_posts):
+    _scraper.set_seen_posts(seen_posts)
+
+
+def set_timings(timings):
+    _scraper.set_timings(timings)
+
+
 def get_profile(
     account: str,
     **kwargs,
@@ -365,7 +421,7 @@ def write_post_to_disk(post: Post, source: RawPost, location: pathlib.Path):
     logger.debug("Writing post %s", post_id)
     with open(location.joinpath(filename), mode='wt') as f:
         f.write('<!--\n')
-        json.dump(post, f, indent=4, default=str)
+        json.dump(post, f, indent=4, default=json_default)
         f.write('\n-->\n')
         f.write(html_element_to_string(source, pretty=True))
 
@@ -377,39 +433,60 @@ def write_posts_to_csv(
     encoding: str = None,
     **kwargs,
 ):
-    """Write posts from an account or group to a CSV or JSON file
+    """Write posts from an account or group to a CSV, JSON or JSON Lines file, or to a sink
 
     Args:
         account (str): Facebook account name e.g. "nike" or "nintendo"
         group (Union[str, int, None]): Facebook group id e.g. 676845025728409
         filename (str): Filename, defaults to <account or group>_posts.csv
         encoding (str): Encoding for the output file, defaults to locale.getpreferredencoding()
+        format (str): "csv", "json", "jsonl", "parquet" or "sqlite".
+        compression (Optional[str]): "gzip" or "zstd" to compress the output file. Defaults to
+            compressing it if the filename ends with .gz or .zst. For Parquet files, the codec
+            of the columns, defaults to snappy.
+        sink (Optional[Sink]): Sink to write the posts to instead of a file.
         credentials (Optional[Tuple[str, str]]): Tuple of email and password to login before scraping. Defaults to scrape anonymously
         timeout (Optional[int]): Timeout for requests.
         page_limit (Optional[int]): How many pages of posts to go through.
             Use None to try to get all of them.
         extra_info (Optional[bool]): Set to True to try to get reactions.
         dump_location (Optional[pathlib.Path]): Location where to write the HTML source of the posts.
+        checkpoint (Union[Checkpoint, str, None]): Checkpoint to resume from and save the progress
+            of the crawl to, or the path of one. When the output file exists, the rest of the
+            posts are written to a new numbered file (nike_posts.2.csv).
     """
     dump_location = kwargs.pop('dump_location', None)  # For dumping HTML to disk, for debugging
     if dump_location is not None:
         dump_location.mkdir(exist_ok=True)
         kwargs["remove_source"] = False
 
-    # Set a default filename, based on the account name with the appropriate extension
-    if filename is None:
-        filename = str(account or group) + "_posts." + kwargs.get("format")
-
-    if encoding is None:
-        encoding = locale.getpreferredencoding()
-
-    if os.path.isfile(filename):
-        raise FileExistsError(f"{filename} exists")
+    output_format = kwargs.get("format") or "csv"
+    compression = kwargs.pop("compression", None)
+    sink = kwargs.pop("sink", None)
+    keys = kwargs.get("keys")
 
-    if filename == "-":
-        output_file = sys.stdout
-    else:
-        output_file = open(filename, 'w', newline='', encoding=encoding)
+    if sink is None:
+        # Set a default filename, based on the account name with the appropriate extension
+        if filename is None:
+            filename = sinks.default_filename(str(account or group), output_format, compression)
+
+        if encoding is None:
+            encoding = locale.getpreferredencoding()
+
+        # Existing SQLite databases are updated rather than overwritten
+        sink_class = sinks.SINKS.get(output_format)
+        if os.path.isfile(filename) and not (sink_class and sink_class.appends):
+            if kwargs.get("checkpoint") is None:
+                raise FileExistsError(f"{filename} exists")
+            # A resumed crawl writes the rest of the posts to a new numbered file
+            filename = sinks.numbered_filename(filename)
+            logger.info("Resuming into %s", filename)
+
+        sink = sinks.make_sink(
+            output_format, filename, encoding=encoding, keys=keys, compression=compression
+        )
+    # Posts are written from another thread, waiting for it when it falls behind
+    sink = sinks.QueuedSink(sink, timings=_scraper.timings)
 
     first_post = True
 
@@ -435,14 +512,14 @@ def write_posts_to_csv(
             with open(resume_file, "w") as f:
                 f.write(url + "\n")
 
-    keys = kwargs.get("keys")
-
     try:
         for post in get_posts(
             account=account,
             group=group,
             start_url=start_url,
             request_url_callback=handle_pagination_url,
+            # Posts are only recorded as seen and checkpointed once they're on disk
+            after_flush=sink.call_after_flush,
             **kwargs,
         ):
             if dump_location is not None:
@@ -453,17 +530,6 @@ def write_posts_to_csv(
                     logger.exception("Error writing post to disk")
             elif post.get("source"):
                 post["source"] = post["source"].html
-            if first_post:
-                if kwargs.get("format") == "json":
-                    output_file.write("[\n")
-                else:
-                    if not keys:
-                        keys = list(post.keys())
-                    dict_writer = csv.DictWriter(output_file, keys, extrasaction='ignore')
-                    dict_writer.writeheader()
-            else:
-                if kwargs.get("format") == "json":
-                    output_file.write(",")
             match = None
             if post["text"]:
                 match = re.search(kwargs.get("matching", '.+'), post["text"], flags=re.IGNORECASE)
@@ -472,12 +538,7 @@ def write_posts_to_csv(
                 ):
                     match = None
             if match:
-                if kwargs.get("format") == "json":
-                    if keys:
-                        post = {k: v for k, v in post.items() if k in keys}
-                    json.dump(post, output_file, default=str, indent=4)
-                else:
-                    dict_writer.writerow(post)
+                sink.write(post)
             if not first_post and post["time"] and post["time"] < max_post_time:
                 logger.debug(
                     f"Reached days_limit - {post['time']} is more than {days_limit} days old (older than {max_post_time})"
@@ -490,11 +551,9 @@ def write_posts_to_csv(
     except Exception as e:
         traceback.print_exc()
 
-    if kwargs.get("format") == "json":
-        output_file.write("\n]")
     if first_post:
         print("Couldn't get any posts.", file=sys.stderr)
-    output_file.close()
+    sink.close()
 
 
 def get_groups_by_search(
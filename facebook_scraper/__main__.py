@@ -7,11 +7,24 @@ import locale
 import json
 import csv
 
-from . import enable_logging, write_posts_to_csv, get_profile
+from . import (
+    enable_logging,
+    write_posts_to_csv,
+    get_profile,
+    set_rate_limiter,
+    set_seen_posts,
+    set_timings,
+    Checkpoint,
+    RateLimiter,
+    Timings,
+)
 
 
 def run():
     """facebook-scraper entry point when used as a script"""
+    if sys.argv[1:2] == ["batch"]:
+        return run_batch(sys.argv[2:])
+
     parser = argparse.ArgumentParser(
         prog='facebook-scraper',
         description="Scrape Facebook public pages without an API key",
@@ -22,6 +35,27 @@ def run():
     parser.add_argument(
         '-s', '--sleep', type=float, help="How long to sleep for between posts", default=0
     )
+    parser.add_argument(
+        '--rate-limit',
+        action='store_true',
+        help="Throttle requests per kind of page, slowing down when Facebook refuses them",
+    )
+    parser.add_argument(
+        '--seen-posts',
+        type=str,
+        help="Only scrape the posts that aren't in this file, and add the new ones to it",
+    )
+    parser.add_argument(
+        '--max-known-posts',
+        type=int,
+        default=5,
+        help="With --seen-posts, stop after this many already scraped posts in a row",
+    )
+    parser.add_argument(
+        '--timings',
+        action='store_true',
+        help="Print how long requests, parsing, extraction and writing took when done",
+    )
     parser.add_argument(
         '-t',
         '--timeout',
@@ -52,10 +86,17 @@ def run():
         '-fmt',
         '--format',
         type=str.lower,
-        choices=["csv", "json"],
+        choices=["csv", "json", "jsonl", "parquet", "sqlite"],
         default="csv",
         help="What format to export as",
     )
+    parser.add_argument(
+        '--compression',
+        choices=["gzip", "zstd"],
+        default=None,
+        help="Compress the output file, defaults to compressing it if it ends with .gz or .zst. "
+        "For Parquet files, the codec of the columns",
+    )
     parser.add_argument(
         '-d',
         '--days-limit',
@@ -70,6 +111,17 @@ def run():
         type=str,
         help="Filename to store the last pagination URL in, for resuming",
     )
+    parser.add_argument(
+        '--checkpoint',
+        type=str,
+        help="Save the progress of the crawl to this file, and resume from it if it exists",
+    )
+    parser.add_argument(
+        '--checkpoint-every',
+        type=int,
+        default=10,
+        help="Save the checkpoint every this many posts",
+    )
     parser.add_argument(
         '-ner',
         '--no-extra-requests',
@@ -143,6 +195,9 @@ def run():
         enable_logging(level)
 
     if args.profile:
+        if args.format not in ("csv", "json", "jsonl"):
+            parser.error("Profiles can only be exported as csv, json or jsonl")
+
         # Set a default filename, based on the account name with the appropriate extension
         if args.filename is None:
             args.filename = str(args.account) + "_profile." + args.format
@@ -159,19 +214,35 @@ def run():
 
         if args.format == "json":
             json.dump(profile, output_file, default=str, indent=4)
+        elif args.format == "jsonl":
+            output_file.write(json.dumps(profile, default=str) + "\n")
         else:
             dict_writer = csv.DictWriter(output_file, profile.keys())
             dict_writer.writeheader()
             dict_writer.writerow(profile)
         output_file.close()
     else:
+        if args.rate_limit:
+            set_rate_limiter(RateLimiter())
+        if args.seen_posts:
+            set_seen_posts(args.seen_posts)
+        timings = Timings() if args.timings else None
+        set_timings(timings)
+
         # Choose the right argument to pass to write_posts_to_csv (group or account)
         account_type = 'group' if args.group else 'account'
         kwargs = {
             account_type: args.account,
             "format": args.format,
+            "compression": args.compression,
             "days_limit": args.days_limit,
             "resume_file": args.resume_file,
+            "max_known_posts": args.max_known_posts,
+            "checkpoint": (
+                Checkpoint.load(args.checkpoint, save_every=args.checkpoint_every)
+                if args.checkpoint
+                else None
+            ),
             "cookies": args.cookies,
             "timeout": args.timeout,
             "sleep": args.sleep,
@@ -197,6 +268,92 @@ def run():
             encoding=args.encoding,
             dump_location=args.dump_location,
         )
+        if timings is not None:
+            print(timings.report(), file=sys.stderr)
+
+
+def run_batch(argv):
+    """facebook-scraper batch entry point, scraping the accounts listed in a file"""
+    from . import _scraper, set_cookies
+    from .batch import BatchScraper, read_accounts
+
+    parser = argparse.ArgumentParser(
+        prog='facebook-scraper batch',
+        description="Scrape the accounts and groups (group:<id>) listed in a file, one per line",
+    )
+    parser.add_argument('accounts', type=str, help="File with the accounts to scrape")
+    parser.add_argument('-o', '--out', type=str, default=".", help="Output directory")
+    parser.add_argument(
+        '-w', '--workers', type=int, default=4, help="Number of accounts to scrape at once"
+    )
+    parser.add_argument('-p', '--pages', type=int, help="Number of pages to download", default=10)
+    parser.add_argument(
+        '-fmt',
+        '--format',
+        type=str.lower,
+        choices=["csv", "json", "jsonl", "parquet", "sqlite"],
+        default="jsonl",
+        help="What format to export as",
+    )
+    parser.add_argument('--compression', choices=["gzip", "zstd"], default=None)
+    parser.add_argument('-t', '--timeout', type=int, default=30)
+    parser.add_argument('-v', '--verbose', action='count', help="Enable logging", default=0)
+    parser.add_argument('-c', '--cookies', type=str, help="Path to a cookies file")
+    parser.add_argument('--comments', action='store_true', help="Extract comments")
+    parser.add_argument('-r', '--reactions', action='store_true', help="Extract reactions")
+    parser.add_argument('-rs', '--reactors', action='store_true', help="Extract reactors")
+    parser.add_argument(
+        '-ner',
+        '--no-extra-requests',
+        dest='allow_extra_requests',
+        action='store_false',
+        help="Disable making extra requests (for things like high quality image URLs)",
+    )
+    parser.add_argument(
+        '-ppp', '--posts-per-page', type=int, default=4, help="Number of posts to fetch per page"
+    )
+    parser.add_argument('--rate-limit', action='store_true', help="Throttle requests")
+    parser.add_argument('--seen-posts', type=str, help="Only scrape the posts not in this file")
+    parser.add_argument('--max-known-posts', type=int, default=5)
+    parser.add_argument('--checkpoint-every', type=int, default=10)
+    parser.add_argument('--timings', action='store_true', help="Print the time of each stage")
+    args = parser.parse_args(argv)
+
+    if args.verbose > 0:
+        args.verbose = min(args.verbose, 3)
+        level = {1: logging.WARNING, 2: logging.INFO, 3: logging.DEBUG}[args.verbose]
+        enable_logging(level)
+
+    set_cookies(args.cookies)
+    _scraper.requests_kwargs['timeout'] = args.timeout
+    if args.rate_limit:
+        set_rate_limiter(RateLimiter())
+    if args.seen_posts:
+        set_seen_posts(args.seen_posts)
+    timings = Timings() if args.timings else None
+    set_timings(timings)
+
+    batch = BatchScraper(
+        args.out,
+        workers=args.workers,
+        format=args.format,
+        compression=args.compression,
+        scraper=_scraper.get_instance(),
+        checkpoint_every=args.checkpoint_every,
+        page_limit=args.pages,
+        max_known_posts=args.max_known_posts,
+        options={
+            "reactions": args.reactions,
+            "reactors": args.reactors,
+            "comments": args.comments,
+            "allow_extra_requests": args.allow_extra_requests,
+            "posts_per_page": args.posts_per_page,
+        },
+    )
+    batch.run(read_accounts(args.accounts))
+    print(batch.report(), file=sys.stderr)
+    if timings is not None:
+        print(timings.report(), file=sys.stderr)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,450 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Union
+from urllib.parse import urlparse
+
+from requests.exceptions import HTTPError
+
+from . import exceptions, utils
+from .constants import DEFAULT_PAGE_LIMIT, FB_MOBILE_BASE_URL
+from .extractors import extract_group_post, extract_post, extract_post_id, PostExtractor
+from .facebook_scraper import FacebookScraper
+from .fb_types import Post, Profile
+from .page_iterators import GroupPageParser, PageParser, next_page_url
+from .retry import DEFAULT_RETRY_RULES, RetryPolicy
+
+
+logger = logging.getLogger(__name__)
+
+
+# Arguments of `FacebookScraper._generic_get_posts` that aren't implemented here
+UNSUPPORTED_KWARGS = ("latest_date", "max_past_limit", "checkpoint", "after_flush")
+
+# aiohttp is slow to import, so it's imported when the first AsyncFacebookScraper is created
+aiohttp = None
+
+
+def _import_aiohttp():
+    global aiohttp
+    if aiohttp is None:
+        try:
+            import aiohttp as module
+        except ImportError:
+            raise ModuleNotFoundError("aiohttp must be installed to use AsyncFacebookScraper")
+        aiohttp = module
+    return aiohttp
+
+
+class AsyncFacebookScraper(FacebookScraper):
+    """Class for creating FacebookScraper async iterators, on top of aiohttp.
+
+    Pages are requested from the event loop, while the existing page parsers and post
+    extractors run in worker threads, so many posts and timelines can be scraped at once.
+    Requests made by the extractors are sent back to the event loop, where at most
+    `max_connections_per_host` requests per host are in flight at any time. With
+    `set_identities`, requests are sent by the identities' own sessions from worker threads.
+
+    Example:
+    ```
+    async with AsyncFacebookScraper() as scraper:
+        async for post in scraper.get_posts('nintendo', page_limit=2):
+            print(post['post_id'])
+    ```
+    """
+
+    def __init__(
+        self, session=None, requests_kwargs=None, max_connections_per_host=4, max_workers=16
+    ):
+        _import_aiohttp()
+        super().__init__(session=session, requests_kwargs=requests_kwargs)
+        self.retry_policy = RetryPolicy(
+            rules=DEFAULT_RETRY_RULES
+            + [
+                (aiohttp.ClientConnectionError, 5),
+                (aiohttp.ClientPayloadError, 3),
+                (asyncio.TimeoutError, 3),
+            ]
+        )
+        self.max_connections_per_host = max_connections_per_host
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        self._client = None
+        self._loop = None
+        self._loop_thread = None
+        self._host_semaphores = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+        self.executor.shutdown(wait=False)
+
+    def _running_loop(self):
+        """The event loop running the current coroutine, kept for the worker threads to send
+        their requests to. Like `asyncio.get_running_loop`, which needs Python 3.7"""
+        self._loop = asyncio.get_event_loop()
+        self._loop_thread = threading.get_ident()
+        return self._loop
+
+    def get(self, url, **kwargs):
+        """Blocking version of `aget`, for the extractors running in worker threads"""
+        if self._loop_thread == threading.get_ident() and self._loop.is_running():
+            raise RuntimeError("Use `await AsyncFacebookScraper.aget` inside the event loop")
+        if self.identities is not None:
+            # Identities send their requests with their own sessions
+            self.request_count += 1
+            return self.identities.get(url, **kwargs)
+        if self._loop is None:
+            raise RuntimeError("AsyncFacebookScraper has no running event loop to request from")
+        return asyncio.run_coroutine_threadsafe(self.aget(url, **kwargs), self._loop).result()
+
+    async def aget(self, url, **kwargs):
+        loop = self._running_loop()
+        self.request_count += 1
+        if self.identities is not None:
+            # Identities send their requests with their own sessions, from a worker thread
+            return await loop.run_in_executor(
+                self.executor, partial(self.identities.get, url, **kwargs)
+            )
+        url = str(url)
+        if not url.startswith("http"):
+            url = utils.urljoin(FB_MOBILE_BASE_URL, url)
+
+        cacheable = not kwargs
+        response = self.get_cached_response(url) if cacheable else None
+        from_cache = response is not None
+        if from_cache:
+            cacheable = False
+        else:
+            try:
+                response = await self.asend(url, **kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError, HTTPError) as ex:
+                logger.exception("Exception while requesting URL: %s\nException: %r", url, ex)
+                raise
+        # Parsing the page would block the event loop
+        await loop.run_in_executor(self.executor, self.prepare_response, response)
+
+        redirect_url = self.get_redirect_url(url, response)
+        if redirect_url:
+            logger.debug(f"Requesting page from: {redirect_url}")
+            response = await self.aget(redirect_url)
+
+        consent = "cookie/consent-page" in response.url
+        if consent:
+            response = await self.asubmit_form(response)
+        try:
+            await loop.run_in_executor(self.executor, self.check_response, response)
+        except (exceptions.TemporarilyBanned, exceptions.UnexpectedResponse):
+            self.slow_down(url)
+            raise
+        if self.rate_limiter is not None and not from_cache:
+            self.rate_limiter.speed_up(url)
+        if cacheable and not consent:
+            self.cache_response(url, response)
+        return response
+
+    async def asend(self, url, post=False, **kwargs):
+        """Async version of `FacebookScraper.send`"""
+        method = "POST" if post else "GET"
+        started = time.monotonic()
+        for attempt in itertools.count(1):
+            await self.athrottle(url)
+            try:
+                response = await self._request(method, url, **kwargs)
+                response.raise_for_status()
+                return response
+            except (aiohttp.ClientError, asyncio.TimeoutError, HTTPError) as ex:
+                response = getattr(ex, "response", None)
+                if isinstance(ex, HTTPError) and (
+                    response.status_code >= 500 or response.status_code == 429
+                ):
+                    self.slow_down(url)
+                delay = None
+                if self.retry_policy is not None:
+                    delay = self.retry_policy.get_delay(attempt, ex, started)
+                if delay is None:
+                    raise
+                logger.warning(
+                    "Retrying %s in %.1fs after attempt %s failed: %r", url, delay, attempt, ex
+                )
+                await asyncio.sleep(delay)
+
+    async def athrottle(self, url):
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.reserve(url)
+            if delay:
+                await asyncio.sleep(delay)
+
+    async def asubmit_form(self, response, extra_data={}):
+        action = response.html.find("form", first=True).attrs.get('action')
+        url = utils.urljoin(self.base_url, action)
+        elems = response.html.find("input[name][value]")
+        data = {elem.attrs['name']: elem.attrs['value'] for elem in elems}
+        data.update(extra_data)
+        return await self._request("POST", url, data=data)
+
+    async def _request(self, method, url, headers=None, **kwargs):
+        if self._client is None:
+            self._client = aiohttp.ClientSession()
+
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.max_connections_per_host)
+
+        request_headers = dict(self.session.headers)
+        request_headers.update(headers or {})
+        request_kwargs = {
+            "headers": request_headers,
+            # Cookies set with set_cookies/set_noscript live in the requests session
+            "cookies": self.session.cookies.get_dict(),
+        }
+        timeout = kwargs.pop("timeout", self.requests_kwargs.get("timeout"))
+        if timeout:
+            request_kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        proxies = self.requests_kwargs.get("proxies")
+        if proxies:
+            request_kwargs["proxy"] = proxies.get(urlparse(url).scheme)
+        if self.requests_kwargs.get("verify") is False:
+            request_kwargs["ssl"] = False
+        request_kwargs.update(kwargs)
+
+        async with self._host_semaphores[host]:
+            async with self._client.request(method, url, **request_kwargs) as resp:
+                content = await resp.read()
+        self.update_cookies(resp)
+
+        return utils.make_response(
+            self.session, str(resp.url), resp.status, resp.headers, content, resp.reason
+        )
+
+    def update_cookies(self, resp):
+        """Keep the cookies set by a response and the redirects before it in the requests
+        session, like requests does, so later requests send them"""
+        for response in list(resp.history) + [resp]:
+            domain = urlparse(str(response.url)).hostname
+            for name, morsel in response.cookies.items():
+                if morsel["max-age"] == "0":
+                    # Deleted
+                    self.session.cookies.set(name, None, domain=morsel["domain"] or domain)
+                    continue
+                self.session.cookies.set(
+                    name,
+                    morsel.value,
+                    domain=morsel["domain"] or domain,
+                    path=morsel["path"] or "/",
+                )
+
+    async def _map_in_executor(self, fn, iterable) -> AsyncIterator:
+        """Run `fn` on every item in worker threads, yielding the results in order"""
+        loop = self._running_loop()
+        iterator = iter(iterable)
+        pending = [
+            loop.run_in_executor(self.executor, fn, item)
+            for item in itertools.islice(iterator, self.max_workers)
+        ]
+        while pending:
+            result = await pending.pop(0)
+            for item in itertools.islice(iterator, 1):
+                pending.append(loop.run_in_executor(self.executor, fn, item))
+            yield result
+
+    async def _iter_in_executor(self, generator) -> AsyncIterator:
+        """Consume a blocking generator from a worker thread"""
+        loop = self._running_loop()
+        done = object()
+        while True:
+            item = await loop.run_in_executor(self.executor, next, generator, done)
+            if item is done:
+                return
+            yield item
+
+    async def _iter_pages(self, start_url, page_parser_cls, **kwargs):
+        loop = self._running_loop()
+        next_url = start_url
+
+        request_url_callback = kwargs.get('request_url_callback')
+        while next_url:
+            if request_url_callback:
+                request_url_callback(next_url)
+
+            logger.debug("Requesting page from: %s", next_url)
+            try:
+                response = await self.aget(next_url)
+            except HTTPError as e:
+                # Like `fetch_page`, when Facebook keeps failing try the noscript version
+                if e.response.status_code != 500 or self.session.cookies.get("noscript") == "1":
+                    raise
+                logger.debug("Requesting noscript")
+                self.set_noscript(True)
+                response = await self.aget(next_url)
+
+            logger.debug("Parsing page response")
+            parser = await loop.run_in_executor(self.executor, page_parser_cls, response)
+            page = await loop.run_in_executor(self.executor, parser.get_page)
+            logger.debug("Got %s raw posts from page", len(page))
+            yield page
+
+            next_url = await loop.run_in_executor(
+                self.executor, partial(next_page_url, parser, **kwargs)
+            )
+
+    async def _generic_get_posts(
+        self,
+        extract_post_fn,
+        start_url,
+        page_parser_cls,
+        page_limit=DEFAULT_PAGE_LIMIT,
+        options=None,
+        remove_source=True,
+        seen_key=None,
+        post_id_fn=None,
+        max_known_posts=5,
+        **kwargs,
+    ) -> AsyncIterator[Post]:
+        unsupported = [name for name in UNSUPPORTED_KWARGS if kwargs.get(name) is not None]
+        if unsupported:
+            raise TypeError(f"AsyncFacebookScraper doesn't support {', '.join(unsupported)}")
+        if options is None:
+            options = {}
+        elif isinstance(options, set):
+            warnings.warn("The options argument should be a dictionary.", stacklevel=3)
+            options = {k: True for k in options}
+        if self.session.cookies.get("noscript") == "1":
+            options["noscript"] = True
+        # Photo pages are fetched by one pool of workers for the whole crawl
+        photo_executor = ThreadPoolExecutor(
+            max_workers=options.get("photo_workers", 4), thread_name_prefix="photos"
+        )
+        options = dict(options, photo_executor=photo_executor)
+        # Relative dates are parsed from the day the crawl started
+        options.setdefault("relative_base", utils.start_of_today())
+
+        def extract(post_element):
+            # Each post gets its own copy, as the extractors store per post state in options
+            return extract_post_fn(post_element, options=dict(options), request_fn=self.get)
+
+        counter = itertools.count(0) if page_limit is None else range(page_limit)
+        pages = self._iter_pages(start_url, page_parser_cls, options=options, **kwargs)
+        # In incremental mode, posts that were already scraped are skipped before extracting them
+        seen_posts = self.seen_posts if seen_key is not None else None
+        if seen_posts is not None:
+            pages = self._skip_known(pages, seen_key, post_id_fn, max_known_posts)
+
+        logger.debug("Starting to iterate pages")
+        try:
+            for i in counter:
+                try:
+                    page = await pages.__anext__()
+                except StopAsyncIteration:
+                    break
+                logger.debug("Extracting posts from page %s", i)
+                async for post in self._map_in_executor(extract, page):
+                    if remove_source:
+                        post.pop('source', None)
+                    yield post
+                    if seen_posts is not None and post.get("post_id"):
+                        seen_posts.add(seen_key, post["post_id"])
+        finally:
+            photo_executor.shutdown(wait=False)
+            await pages.aclose()
+
+    async def _skip_known(self, pages, account, post_id_fn, max_known_posts):
+        """Async version of `SeenPostIndex.skip_known`"""
+        known_in_a_row = 0
+        try:
+            async for page in pages:
+                new_posts = []
+                for post_element in page:
+                    post_id = post_id_fn(post_element)
+                    if post_id is None or not self.seen_posts.is_known(account, post_id):
+                        known_in_a_row = 0
+                        new_posts.append(post_element)
+                        continue
+                    self.seen_posts.skipped += 1
+                    known_in_a_row += 1
+                    if known_in_a_row >= max_known_posts:
+                        logger.info(
+                            "Found %s known posts in a row, stopping at post %s",
+                            known_in_a_row,
+                            post_id,
+                        )
+                        yield new_posts
+                        return
+                yield new_posts
+        finally:
+            await pages.aclose()
+
+    async def get_posts(self, account: str, **kwargs) -> AsyncIterator[Post]:
+        start_url = kwargs.pop("start_url", None)
+        if not start_url:
+            start_url = utils.urljoin(FB_MOBILE_BASE_URL, f'/{account}/')
+        kwargs["options"] = kwargs.get("options") or {}
+        kwargs["options"].setdefault("account", account)
+        async for post in self._generic_get_posts(
+            extract_post,
+            start_url,
+            PageParser,
+            seen_key=account,
+            post_id_fn=extract_post_id,
+            **kwargs,
+        ):
+            yield post
+
+    async def get_group_posts(self, group: Union[str, int], **kwargs) -> AsyncIterator[Post]:
+        self.set_user_agent(
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_12_6) AppleWebKit/603.3.8 (KHTML, like Gecko) Version/10.1.2 Safari/603.3.8"
+        )
+        start_url = kwargs.pop("start_url", None)
+        if not start_url:
+            start_url = utils.urljoin(FB_MOBILE_BASE_URL, f'groups/{group}/')
+        async for post in self._generic_get_posts(
+            extract_group_post,
+            start_url,
+            GroupPageParser,
+            seen_key=str(group),
+            post_id_fn=extract_post_id,
+            **kwargs,
+        ):
+            yield post
+
+    async def get_posts_by_url(
+        self, post_urls, options=None, remove_source=True
+    ) -> AsyncIterator[Post]:
+        options = options or {}
+        if self.session.cookies.get("noscript") == "1":
+            options["noscript"] = True
+
+        def get_post(post_url):
+            # Each post gets its own copy, as the extractors store per post state in options
+            return self._get_post_by_url(post_url, dict(options), remove_source)
+
+        async for post in self._map_in_executor(get_post, post_urls):
+            yield post
+
+    async def get_reactors(self, post_id: int, **kwargs) -> AsyncIterator[dict]:
+        reaction_url = (
+            f'https://m.facebook.com/ufi/reaction/profile/browser/?ft_ent_identifier={post_id}'
+        )
+        logger.debug(f"Fetching {reaction_url}")
+        response = await self.aget(reaction_url)
+        extractor = PostExtractor(response.html, kwargs, self.get, full_post_html=response.html)
+        async for reactor in self._iter_in_executor(extractor.extract_reactors(response)):
+            yield reactor
+
+    async def get_profile(self, account, **kwargs) -> Profile:
+        loop = self._running_loop()
+        get_profile = partial(FacebookScraper.get_profile, self, account, **kwargs)
+        return await loop.run_in_executor(self.executor, get_profile)
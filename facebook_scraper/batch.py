@@ -0,0 +1,219 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional
+
+from requests.adapters import HTTPAdapter
+
+from . import exceptions, sinks
+from .checkpoint import Checkpoint
+from .facebook_scraper import FacebookScraper
+
+
+logger = logging.getLogger(__name__)
+
+
+GROUP_PREFIX = "group:"
+
+
+def read_accounts(filename: str) -> List[str]:
+    """Accounts to scrape, one per line. Groups are written as group:<id>, and empty lines and
+    lines starting with # are ignored"""
+    with open(filename, encoding="utf-8") as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith("#")]
+
+
+def share_scraper(scraper: FacebookScraper) -> FacebookScraper:
+    """A scraper with its own request count and session, sharing the connection pools, cache,
+    rate limiter, retry policy, identities, seen posts and timings of `scraper`.
+
+    The session starts with copies of the headers and cookies of the session of `scraper`, as
+    scraping sets the user agent and the noscript cookie of the session"""
+    session = type(scraper.session)()
+    session.headers = scraper.session.headers.copy()
+    session.cookies = scraper.session.cookies.copy()
+    for prefix, adapter in scraper.session.adapters.items():
+        session.mount(prefix, adapter)
+    shared = FacebookScraper(session=session, requests_kwargs=scraper.requests_kwargs)
+    shared.cache = scraper.cache
+    shared.rate_limiter = scraper.rate_limiter
+    shared.retry_policy = scraper.retry_policy
+    shared.identities = scraper.identities
+    shared.seen_posts = scraper.seen_posts
+    shared.timings = scraper.timings
+    return shared
+
+
+class BatchScraper:
+    """Scrapes the posts of several accounts and groups in a pool of worker threads.
+
+    The workers share the connection pools of the session of `scraper`, so connections are
+    reused, and its response cache and rate limiter. Each account is written to its own file in
+    `out_dir`, with its own checkpoint, so running the same batch again resumes the accounts
+    that didn't finish and skips the ones that did. A summary of the posts, requests, errors and
+    time of each account is kept in `summary.json` in `out_dir`.
+    """
+
+    def __init__(
+        self,
+        out_dir: str,
+        workers: int = 4,
+        format: str = "jsonl",
+        compression: Optional[str] = None,
+        scraper: Optional[FacebookScraper] = None,
+        checkpoint_every: int = 10,
+        **kwargs,
+    ):
+        self.out_dir = out_dir
+        self.workers = workers
+        self.format = format
+        self.compression = compression
+        self.scraper = scraper or FacebookScraper()
+        self.checkpoint_every = checkpoint_every
+        self.kwargs = kwargs
+        self.summary: Dict[str, Dict[str, Any]] = {}
+
+        self._lock = threading.Lock()
+        os.makedirs(out_dir, exist_ok=True)
+        # One connection per worker and host
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(10, workers))
+        self.scraper.session.mount("https://", adapter)
+        self.scraper.session.mount("http://", adapter)
+
+    @property
+    def summary_path(self) -> str:
+        return os.path.join(self.out_dir, "summary.json")
+
+    def load_summary(self):
+        try:
+            with open(self.summary_path, encoding="utf-8") as f:
+                self.summary = json.load(f)
+        except FileNotFoundError:
+            self.summary = {}
+
+    def save_summary(self):
+        with self._lock:
+            state = json.dumps(self.summary, indent=4)
+            temp_path = self.summary_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(state)
+            os.replace(temp_path, self.summary_path)
+
+    def output_filename(self, name: str) -> str:
+        """A file that doesn't exist yet, numbered after the files of previous runs"""
+        filename = sinks.default_filename(name, self.format, self.compression)
+        return sinks.numbered_filename(os.path.join(self.out_dir, filename))
+
+    def scrape(self, account: str) -> Dict[str, Any]:
+        group = account[len(GROUP_PREFIX) :] if account.startswith(GROUP_PREFIX) else None
+        name = f"group_{group}" if group else account
+        checkpoint = Checkpoint.load(
+            os.path.join(self.out_dir, f"{name}.checkpoint.json"),
+            save_every=self.checkpoint_every,
+        )
+        previous = self.summary.get(account, {})
+        result = {
+            "status": "running",
+            "posts": previous.get("posts", 0),
+            "requests": previous.get("requests", 0),
+            "errors": previous.get("errors", 0),
+            "elapsed": previous.get("elapsed", 0.0),
+            "files": list(previous.get("files", [])),
+        }
+        if checkpoint.finished:
+            result["status"] = "finished"
+            with self._lock:
+                self.summary[account] = result
+            return result
+
+        scraper = share_scraper(self.scraper)
+        kwargs = dict(self.kwargs)
+        options = dict(kwargs.pop("options", None) or {})
+        options.setdefault("account", None if group else account)
+        filename = self.output_filename(name)
+        result["files"].append(os.path.basename(filename))
+        started = time.monotonic()
+        sink = sinks.QueuedSink(
+            sinks.make_sink(self.format, filename, compression=self.compression),
+            timings=scraper.timings,
+        )
+        # Posts are only checkpointed once they're on disk
+        kwargs["after_flush"] = sink.call_after_flush
+        closed = False
+        try:
+            if group:
+                posts = scraper.get_group_posts(
+                    group, checkpoint=checkpoint, options=options, **kwargs
+                )
+            else:
+                posts = scraper.get_posts(
+                    account, checkpoint=checkpoint, options=options, **kwargs
+                )
+            for post in posts:
+                if post.get("source") is not None:
+                    post["source"] = post["source"].html
+                sink.write(post)
+                result["posts"] += 1
+            closed = True
+            sink.close()
+            # Stopped by the page limit, the next batch carries on from there
+            result["status"] = "finished" if checkpoint.finished else "stopped"
+        except exceptions.TemporarilyBanned:
+            # The other accounts would be banned too
+            result["status"] = "banned"
+            result["errors"] += 1
+            raise
+        except Exception as ex:
+            logger.exception("Error scraping %s", account)
+            result["status"] = "failed"
+            result["errors"] += 1
+            result["error"] = repr(ex)
+        finally:
+            try:
+                if not closed:
+                    sink.close()
+            finally:
+                result["requests"] += scraper.request_count
+                result["elapsed"] += time.monotonic() - started
+                with self._lock:
+                    self.summary[account] = result
+                self.save_summary()
+        return result
+
+    def run(self, accounts: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        self.load_summary()
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="batch") as executor:
+            futures = [executor.submit(self.scrape, account) for account in accounts]
+            # Results are checked as accounts finish, so a ban stops the accounts that haven't
+            # started yet however long the accounts before them take
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                try:
+                    future.result()
+                except exceptions.TemporarilyBanned:
+                    logger.error("Temporarily banned, stopping the batch")
+                    for pending in futures:
+                        pending.cancel()
+                    break
+        return self.summary
+
+    def report(self) -> str:
+        row = "{:30} {:10} {:>8} {:>9} {:>7} {:>9}"
+        lines = [row.format("account", "status", "posts", "requests", "errors", "time")]
+        for account, result in self.summary.items():
+            lines.append(
+                row.format(
+                    account,
+                    result["status"],
+                    result["posts"],
+                    result["requests"],
+                    result["errors"],
+                    f"{result['elapsed']:.1f}s",
+                )
+            )
+        return "\n".join(lines)
@@ -0,0 +1,204 @@
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from .constants import DEFAULT_CACHE_FILE_PATH
+
+
+logger = logging.getLogger(__name__)
+
+
+# Pages that don't change (much) once they exist, with how many seconds they are kept for.
+# The first matching pattern is used, and pages that don't match any pattern aren't cached
+DEFAULT_CACHE_TTLS = [
+    (r"/photo\.php|/photos/(?:[^/]+/)?\d+|/photo/view_full_size/", 30 * 24 * 3600),
+    (r"/ufi/reaction/profile/browser/", 6 * 3600),
+    (r"/about/|[?&]v=info|[?&]sk=about", 24 * 3600),
+    (r"/story\.php|/permalink/|/posts/[^/?]+", 3600),
+]
+
+# Pages that must always be requested, even if they match one of the patterns above.
+# Timeline cursors point to a page of whatever is newest at the time of the request, and so do
+# the photos timeline and its pager
+UNCACHEABLE_URLS = re.compile(
+    r"cursor|/page_content|bacr=|/checkpoint|/login|/photos/(?:pandora/|\?|$)"
+)
+
+
+class ResponseCache:
+    """HTTP response cache stored in a SQLite database, used by `FacebookScraper.get`.
+
+    Responses are keyed by their normalised URL and a hash of the identity they were requested
+    with, so pages seen by one account are never served to another. Only URLs matching one of
+    the `ttls` patterns are stored, for the number of seconds of the first matching pattern,
+    and the least recently used responses are evicted once the cache grows over `max_size`
+    bytes.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_FILE_PATH,
+        ttls: Optional[List[Tuple[str, int]]] = None,
+        max_size: int = 256 * 1024 * 1024,
+    ):
+        if ttls is None:
+            ttls = DEFAULT_CACHE_TTLS
+        self.path = path
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls]
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        # Extractors request pages from worker threads, so the connection is shared
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    url TEXT,
+                    status_code INTEGER,
+                    content_type TEXT,
+                    content BLOB,
+                    size INTEGER,
+                    expires REAL,
+                    accessed REAL
+                )"""
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+            )
+        self.size = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """Drop the fragment and tracking parameters, and sort the query string"""
+        parts = urlparse(url)
+        query = sorted(
+            (k, v)
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if k not in ("refid", "_rdr")
+        )
+        path = parts.path.rstrip("/") or "/"
+        return urlunparse(
+            (parts.scheme.lower(), parts.netloc.lower(), path, "", urlencode(query), "")
+        )
+
+    def make_key(self, url: str, identity: str) -> str:
+        key = f"{hashlib.sha256(identity.encode()).hexdigest()} {self.normalize_url(url)}"
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get_ttl(self, url: str) -> Optional[int]:
+        if UNCACHEABLE_URLS.search(url):
+            return None
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+        return None
+
+    def get(self, url: str, identity: str) -> Optional[Tuple[str, int, str, bytes]]:
+        """Returns the url, status code, content type and content of the cached response"""
+        if not self.get_ttl(url):
+            return None
+        key = self.make_key(url, identity)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT url, status_code, content_type, content, size, expires FROM responses "
+                "WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response_url, status_code, content_type, content, size, expires = row
+            with self._connection:
+                if expires < now:
+                    self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.size -= size
+                    self.misses += 1
+                    return None
+                self._connection.execute(
+                    "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+                )
+            self.hits += 1
+        logger.debug(f"Cache hit for {url}")
+        return response_url, status_code, content_type, content
+
+    def set(
+        self,
+        url: str,
+        identity: str,
+        response_url: str,
+        status_code: int,
+        content_type: str,
+        content: bytes,
+    ):
+        ttl = self.get_ttl(url)
+        if not ttl or UNCACHEABLE_URLS.search(response_url):
+            return
+        key = self.make_key(url, identity)
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                self.size -= row[0]
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    response_url,
+                    status_code,
+                    content_type,
+                    content,
+                    len(content),
+                    now + ttl,
+                    now,
+                ),
+            )
+            self.size += len(content)
+            self.stores += 1
+            self._evict()
+
+    def _evict(self):
+        while self.size > self.max_size:
+            rows = self._connection.execute(
+                "SELECT key, size FROM responses ORDER BY accessed LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self.size = 0
+                return
+            for key, size in rows:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.size -= size
+                self.evictions += 1
+                if self.size <= self.max_size:
+                    break
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses")
+            self.size = 0
+
+    def close(self):
+        self._connection.close()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "size": self.size,
+        }
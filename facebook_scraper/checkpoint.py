@@ -0,0 +1,243 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from .fb_types import Options, Page, Post, RawPost
+
+
+logger = logging.getLogger(__name__)
+
+
+# Options of the extractors used to resume the comments and reactors of a post, by cursor kind
+CURSOR_OPTIONS = {
+    "comments": ("comment_start_url", "comment_request_url_callback"),
+    "reactors": ("reactors_start_url", "reactors_request_url_callback"),
+}
+
+
+def _chain(*callbacks: Optional[Callable[[str], Any]]) -> Callable[[str], None]:
+    callbacks = [callback for callback in callbacks if callback is not None]
+
+    def callback(url):
+        for fn in callbacks:
+            fn(url)
+
+    return callback
+
+
+def _serializable(options: Options) -> Options:
+    """The options that can be saved as JSON, callbacks are left out and sets become sorted
+    lists"""
+    result = {}
+    for key, value in options.items():
+        if isinstance(value, (set, frozenset)):
+            value = sorted(value)
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            continue
+        result[key] = value
+    return result
+
+
+class Checkpoint:
+    """Progress of a crawl of `get_posts` or `get_group_posts`, to resume it after a crash.
+
+    A checkpoint holds the URL of the timeline page being scraped and how many of its posts are
+    done, the comment and reactor cursors of the post being scraped, when they're extracted as
+    generators, and the options of the crawl. It's saved to `path` as JSON every `save_every`
+    posts, atomically, and when the crawl stops. Resuming skips the posts of the page that were
+    done. A post that was interrupted is scraped again from the start, except for generators of
+    comments and reactors, which resume from their cursors and only hold the comments and
+    reactors from there on.
+    A post is done once the next one is asked for, or once it's flushed to the output, so the
+    posts yielded but not done before a crash are scraped again. `finished` is set once the
+    timeline has been scraped to the end and every post is done.
+    """
+
+    def __init__(self, path: Optional[str] = None, save_every: int = 10):
+        self.path = path
+        self.save_every = save_every
+        self.page_url: Optional[str] = None
+        self.page_index = 0
+        self.cursors: Dict[str, Dict[str, str]] = {}
+        self.options: Optional[Options] = None
+        self.posts = 0
+        self.finished = False
+
+        self._unsaved = 0
+        # Positions of the posts that were yielded but aren't done yet, in order
+        self._pending = deque()
+        self._finishing = False
+        self._stopped = False
+        # Comments can be extracted from worker threads
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, save_every: int = 10) -> "Checkpoint":
+        """Load the checkpoint saved at `path`, or start a new one if there's none yet"""
+        checkpoint = cls(path, save_every)
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return checkpoint
+        checkpoint.page_url = state.get("page_url")
+        checkpoint.page_index = state.get("page_index", 0)
+        checkpoint.cursors = state.get("cursors", {})
+        checkpoint.options = state.get("options")
+        checkpoint.posts = state.get("posts", 0)
+        checkpoint.finished = state.get("finished", False)
+        logger.debug(
+            "Resuming from %s at post %s of %s", path, checkpoint.page_index, checkpoint.page_url
+        )
+        return checkpoint
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Resume from the first post that isn't done
+        page_url, page_index = self.page_url, self.page_index
+        if self._pending:
+            page_url, page_index = self._pending[0]
+        return {
+            "page_url": page_url,
+            "page_index": page_index,
+            "cursors": self.cursors,
+            "options": self.options,
+            "posts": self.posts,
+            "finished": self.finished,
+            "saved": time.time(),
+        }
+
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            state = json.dumps(self.to_dict(), default=str)
+            directory = os.path.dirname(os.path.abspath(self.path))
+            # Written to a temporary file first, so a crash never leaves half a checkpoint
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".checkpoint-")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(state)
+                os.replace(temp_path, self.path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+            self._unsaved = 0
+
+    def use_options(self, options: Optional[Options]) -> Optional[Options]:
+        """The options to crawl with: the given ones, which are saved, or the saved ones"""
+        if options is None:
+            return dict(self.options) if self.options is not None else None
+        if isinstance(options, dict):
+            self.options = _serializable(options)
+        return options
+
+    def page_callback(
+        self, callback: Optional[Callable[[str], Any]] = None
+    ) -> Callable[[str], None]:
+        """A `request_url_callback` recording the page being scraped, then calling `callback`"""
+        return _chain(self.start_page, callback)
+
+    def start_page(self, url: str):
+        # The page being resumed is requested again
+        if url != self.page_url:
+            self.page_url = url
+            self.page_index = 0
+
+    def set_cursor(self, post_id: str, kind: str, url: str):
+        with self._lock:
+            self.cursors.setdefault(post_id, {})[kind] = url
+
+    def post_options(self, options: Options, post_id: Optional[str]) -> Options:
+        """Options to extract the post `post_id` with, resuming its comments and reactors from
+        the saved cursors, and recording the new ones.
+
+        Only comments and reactors extracted as generators are resumed: otherwise they're
+        consumed before the post is yielded, so the post was never written and its earlier
+        pages would be lost. Such a post is scraped again from the start"""
+        if post_id is None:
+            return options
+        options = dict(options)
+        cursors = self.cursors.get(post_id, {})
+        for kind, (start_option, callback_option) in CURSOR_OPTIONS.items():
+            if options.get(kind) != "generator":
+                continue
+            if kind in cursors:
+                options[start_option] = cursors[kind]
+
+            def record(url, kind=kind):
+                self.set_cursor(post_id, kind, url)
+
+            options[callback_option] = _chain(record, options.get(callback_option))
+        return options
+
+    def post_yielded(self):
+        """Called when a post is yielded, it's resumed from until `post_done` is called for it"""
+        with self._lock:
+            self._pending.append((self.page_url, self.page_index))
+
+    def post_done(self, post: Post):
+        """Called for each yielded post in order, once it's done"""
+        with self._lock:
+            position = self._pending.popleft() if self._pending else None
+            if position == (self.page_url, self.page_index):
+                # The crawl hasn't moved on yet, it resumes after this post
+                self.page_index += 1
+            self.posts += 1
+            self.cursors.pop(str(post.get("post_id")), None)
+            self._unsaved += 1
+            due = self._unsaved >= self.save_every
+            if self._finishing and not self._pending:
+                self._set_finished()
+            # Posts are done after the crawl stopped when they're flushed to the output
+            if self._stopped and not self._pending:
+                due = True
+        if due:
+            self.save()
+
+    def finish(self):
+        with self._lock:
+            self._finishing = True
+            if not self._pending:
+                self._set_finished()
+        self.save()
+
+    def _set_finished(self):
+        self.finished = True
+        self.page_url = None
+        self.page_index = 0
+        self.cursors = {}
+
+    def resume_pages(self, pages: Iterable[Page]) -> Iterator[Iterator[RawPost]]:
+        """Skip the posts of the first page that were done, and keep track of the position
+        within each page. Saves the checkpoint when the crawl stops"""
+        skip = self.page_index
+        finished = False
+        try:
+            for page in pages:
+                yield self._iter_page(page, skip)
+                skip = 0
+            finished = True
+        finally:
+            self._stopped = True
+            if finished:
+                self.finish()
+            else:
+                self.save()
+
+    def _iter_page(self, page: Page, skip: int) -> Iterator[RawPost]:
+        count = 0
+        for index, post_element in enumerate(page):
+            count = index + 1
+            if index < skip:
+                continue
+            # Posts are done once the next one is requested, or when `post_done` is called
+            self.page_index = index
+            yield post_element
+        self.page_index = max(self.page_index, count)
@@ -7,3 +7,5 @@ DEFAULT_REQUESTS_TIMEOUT = 30
 DEFAULT_PAGE_LIMIT = 10
 
 DEFAULT_COOKIES_FILE_PATH = '.fb-cookies.pckl'
+DEFAULT_CACHE_FILE_PATH = '.fb-cache.sqlite'
+DEFAULT_SEEN_POSTS_FILE_PATH = '.fb-seen-posts.sqlite'
@@ -1,25 +1,19 @@
 import itertools
 import json
-import demjson3 as demjson
-from demjson3 import JSONDecodeError
 import logging
 import re
+import threading
+import weakref
 from datetime import datetime
 from typing import Any, Dict, Optional
 from urllib.parse import parse_qs, urlparse
-from tqdm.auto import tqdm
 from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 
-from . import utils, exceptions
+from . import utils, exceptions, js_decoder
 from .constants import FB_BASE_URL, FB_MOBILE_BASE_URL, FB_W3_BASE_URL
 from .fb_types import Options, Post, RawPost, RequestFunction, Response, URL
-
-
-try:
-    from youtube_dl import YoutubeDL
-    from youtube_dl.utils import ExtractorError
-except ImportError:
-    YoutubeDL = None
+from .timings import timed
 
 
 logger = logging.getLogger(__name__)
@@ -34,6 +28,14 @@ def extract_post(
     return PostExtractor(raw_post, options, request_fn, full_post_html).extract_post()
 
 
+def extract_post_id(raw_post: RawPost) -> Optional[str]:
+    """The id of a timeline post, read from the element without requesting anything"""
+    extractor = PostExtractor(raw_post, {"allow_extra_requests": False}, None)
+    extractor.post = {}
+    post_id = extractor.extract_post_id()["post_id"]
+    return None if post_id is None else str(post_id)
+
+
 def extract_group_post(
     raw_post: RawPost, options: Options, request_fn: RequestFunction, full_post_html=None
 ) -> Post:
@@ -58,6 +60,55 @@ def extract_hashtag_post(
     return HashtagPostExtractor(raw_post, options, request_fn, full_post_html).extract_post()
 
 
+class JsModIndex:
+    """The JS modules (jsmods) defined in a document, like `["MLiveData","set",[],[...]]` or
+    `["UFIReactionTypes",[],{...},123]`.
+
+    The document is serialised and scanned for module names once, and the payloads are decoded
+    the first time they're asked for. Use `JsModIndex.of(element)` to share the index of a
+    document between extractors.
+    """
+
+    jsmod_regex = re.compile(r'\["(\w+)",(?:"\w+",)?\[\],')
+    payload_regex = re.compile(r'[^{]+({.+?})(?:\]\]|,\d)')
+
+    _indexes = weakref.WeakKeyDictionary()
+    _indexes_lock = threading.Lock()
+
+    def __init__(self, html: str):
+        self.html = html
+        self.positions = {}
+        for match in self.jsmod_regex.finditer(html):
+            self.positions.setdefault(match.group(1), match.start(1))
+        self.modules = {}
+
+    @classmethod
+    def of(cls, element) -> "JsModIndex":
+        with cls._indexes_lock:
+            index = cls._indexes.get(element)
+        if index is None:
+            index = cls(element.html)
+            with cls._indexes_lock:
+                index = cls._indexes.setdefault(element, index)
+        return index
+
+    def get(self, name: str) -> dict:
+        if name in self.modules:
+            return self.modules[name]
+
+        match = None
+        position = self.positions.get(name)
+        if position is not None and self.html.find(name) == position:
+            match = self.payload_regex.match(self.html, position + len(name))
+        if match is None:
+            # Not a module definition, or the name is also used before it
+            match = re.search(name + self.payload_regex.pattern, self.html)
+        # Payloads are JS, with unquoted keys
+        module = js_decoder.decode(match.group(1), "jsmod") if match else {}
+        self.modules[name] = module
+        return module
+
+
 class PostExtractor:
     """Class for Extracting fields from a FacebookPost"""
 
@@ -90,6 +141,83 @@ class PostExtractor:
     has_translation_regex = re.compile(r'<span.*>Rate Translation</span>')
     post_story_regex = re.compile(r'href="(\/story[^"]+)" aria')
 
+    # Fields set by each extract method. With options["fields"], methods setting none of the
+    # requested fields are skipped, along with the requests they would make
+    method_fields = {
+        "extract_post_url": ("post_url",),
+        "extract_post_id": ("post_id",),
+        "extract_text": (
+            "text",
+            "post_text",
+            "shared_text",
+            "original_text",
+            "translated_text",
+            "translated_post_text",
+            "translated_shared_text",
+        ),
+        "extract_time": ("time", "timestamp"),
+        "extract_photo_link": (
+            "image",
+            "images",
+            "images_description",
+            "image_id",
+            "image_ids",
+            "video",
+            "video_id",
+            "video_ids",
+            "videos",
+        ),
+        "extract_image_lq": (
+            "image",
+            "images",
+            "image_lowquality",
+            "image_id",
+            "image_ids",
+            "images_lowquality",
+            "images_lowquality_description",
+        ),
+        "extract_likes": ("likes", "reaction_count"),
+        "extract_comments": ("comments",),
+        "extract_shares": ("shares",),
+        "extract_links": ("link", "links"),
+        "extract_user_id": ("user_id", "page_id"),
+        "extract_username": ("username", "user_url"),
+        "extract_video": (
+            "video",
+            "video_id",
+            "video_duration_seconds",
+            "video_watches",
+            "video_quality",
+            "video_width",
+            "video_height",
+            "video_size_MB",
+        ),
+        "extract_video_thumbnail": ("video_thumbnail",),
+        "extract_video_id": ("video_id",),
+        # Also sets the time of videos, but extract_time is enough when only the time is needed
+        "extract_video_meta": (
+            "video_duration_seconds",
+            "video_watches",
+            "video_quality",
+            "video_width",
+            "video_height",
+            "video_size_MB",
+        ),
+        "extract_is_live": ("is_live", "was_live"),
+        "extract_factcheck": ("factcheck",),
+        "extract_share_information": (
+            "shared_post_id",
+            "shared_time",
+            "shared_user_id",
+            "shared_username",
+            "shared_user_url",
+            "shared_post_url",
+        ),
+        "extract_availability": ("available",),
+        "extract_listing": ("listing_title", "listing_price", "listing_location"),
+        "extract_with": ("with", "header"),
+    }
+
     def __init__(self, element, options, request_fn, full_post_html=None):
         self.element = element
         self.options = options
@@ -99,59 +227,8 @@ class PostExtractor:
         self._full_post_html = full_post_html
         self._live_data = {}
 
-    # TODO: This is getting ugly, create a dataclass for Post
     def make_new_post(self) -> Post:
-        return {
-            'post_id': None,
-            'text': None,
-            'post_text': None,
-            'shared_text': None,
-            'original_text': None,
-            'time': None,
-            'timestamp': None,
-            'image': None,
-            'image_lowquality': None,
-            'images': None,
-            'images_description': None,
-            'images_lowquality': None,
-            'images_lowquality_description': None,
-            'video': None,
-            'video_duration_seconds': None,
-            'video_height': None,
-            'video_id': None,
-            'video_quality': None,
-            'video_size_MB': None,
-            'video_thumbnail': None,
-            'video_watches': None,
-            'video_width': None,
-            'likes': None,
-            'comments': None,
-            'shares': None,
-            'post_url': None,
-            'link': None,
-            'links': None,
-            'user_id': None,
-            'username': None,
-            'user_url': None,
-            'source': None,
-            'is_live': False,
-            'factcheck': None,
-            'shared_post_id': None,
-            'shared_time': None,
-            'shared_user_id': None,
-            'shared_username': None,
-            'shared_user_url': None,
-            'shared_post_url': None,
-            'available': None,
-            'comments_full': None,
-            'reactors': None,
-            'w3_fb_url': None,
-            'reactions': None,
-            'reaction_count': None,
-            'with': None,
-            'page_id': None,
-            'sharers': None,
-        }
+        return Post()
 
     def extract_post(self) -> Post:
         """Parses the element into self.item"""
@@ -181,6 +258,16 @@ class PostExtractor:
             self.extract_with,
         ]
 
+        fields = self.options.get("fields")
+        if fields is not None:
+            # The post id and url are needed to request the full post, reactions and comments
+            fields = set(fields) | {"post_id", "post_url"}
+            methods = [
+                method
+                for method in methods
+                if fields.intersection(self.method_fields.get(method.__name__, fields))
+            ]
+
         post = self.make_new_post()
         post['source'] = self.element
 
@@ -191,29 +278,32 @@ class PostExtractor:
             post_id = self.post.get('post_id', 'unknown post')
             logger.warning(f"[%s] {msg}", post_id, *args)
 
+        timings = self.options.get("timings")
         for method in methods:
             try:
-                partial_post = method()
-                if partial_post is None:
+                with timed(timings, f"extract.{method.__name__}"):
+                    result = method()
+                if result is None:
                     log_warning("Extract method %s didn't return anything", method.__name__)
-                    continue
-
-                post.update(partial_post)
+                elif result is not post:
+                    # Methods of subclasses may still return the fields they found
+                    post.update(result)
             except exceptions.TemporarilyBanned:
                 raise
             except Exception as ex:
                 log_warning("Exception while running %s: %r", method.__name__, ex)
 
         has_more = self.more_url_regex.search(self.element.html)
-        if has_more and self.full_post_html:
+        if has_more and (fields is None or "source" in fields) and self.full_post_html:
             post['source'] = self.full_post_html.find('.story_body_container', first=True)
 
         if self.options.get('reactions') or self.options.get('reactors'):
             try:
-                reactions = self.extract_reactions()
-                if reactions["reactors"] and self.options.get("reactors") != "generator":
-                    # Consume reactor generator to return list
-                    reactions["reactors"] = utils.safe_consume(reactions["reactors"])
+                with timed(timings, "extract.extract_reactions"):
+                    reactions = self.extract_reactions()
+                    if reactions["reactors"] and self.options.get("reactors") != "generator":
+                        # Consume reactor generator to return list
+                        reactions["reactors"] = utils.safe_consume(reactions["reactors"])
             except Exception as ex:
                 log_warning("Exception while extracting reactions: %r", ex)
                 reactions = {}
@@ -225,37 +315,40 @@ class PostExtractor:
 
         if self.options.get("sharers"):
             try:
-                post["sharers"] = self.extract_sharers()
-                if self.options.get("sharers") != "generator":
-                    post["sharers"] = utils.safe_consume(post["sharers"])
+                with timed(timings, "extract.extract_sharers"):
+                    post["sharers"] = self.extract_sharers()
+                    if self.options.get("sharers") != "generator":
+                        post["sharers"] = utils.safe_consume(post["sharers"])
             except Exception as ex:
                 log_warning("Exception while extracting sharers: %r", ex)
 
         if self.options.get('comments'):
             try:
-                post["comments_full"] = self.extract_comments_full()
-                if self.options.get("comments") != "generator":
-                    # Consume both comment generator and reply generator to return lists
-                    post["comments_full"] = utils.safe_consume(post["comments_full"])
-                    for comment in post["comments_full"]:
-                        comment["replies"] = utils.safe_consume(comment["replies"])
-                        for reply in comment["replies"]:
-                            utils.safe_consume(reply["comment_reactors"])
-                        comment["comment_reactors"] = utils.safe_consume(
-                            comment["comment_reactors"]
-                        )
-                    if post.get("comments_full") and not post.get("comments"):
-                        post["comments"] = len(post.get("comments_full"))
+                with timed(timings, "extract.extract_comments_full"):
+                    post["comments_full"] = self.extract_comments_full()
+                    if self.options.get("comments") != "generator":
+                        # Consume both comment generator and reply generator to return lists
+                        post["comments_full"] = utils.safe_consume(post["comments_full"])
+                        for comment in post["comments_full"]:
+                            comment["replies"] = utils.safe_consume(comment["replies"])
+                            for reply in comment["replies"]:
+                                utils.safe_consume(reply["comment_reactors"])
+                            comment["comment_reactors"] = utils.safe_consume(
+                                comment["comment_reactors"]
+                            )
+                        if post.get("comments_full") and not post.get("comments"):
+                            post["comments"] = len(post.get("comments_full"))
 
             except Exception as ex:
                 log_warning("Exception while extracting comments: %r", ex)
         return post
 
     def extract_post_id(self) -> PartialPost:
-        return {
-            'post_id': self.live_data.get("ft_ent_identifier")
-            or self.data_ft.get('top_level_post_id')
-        }
+        post = self.post
+        post['post_id'] = self.live_data.get("ft_ent_identifier") or self.data_ft.get(
+            'top_level_post_id'
+        )
+        return post
 
     def extract_username(self) -> PartialPost:
         elem = self.element.find('h3 strong a,a.actor-link', first=True)
@@ -263,7 +356,10 @@ class PostExtractor:
             url = elem.attrs.get("href")
             if url:
                 url = utils.urljoin(FB_BASE_URL, url)
-            return {'username': elem.text, 'user_url': url}
+            post = self.post
+            post['username'] = elem.text
+            post['user_url'] = url
+            return post
 
     # TODO: this method needs test for the 'has more' case and shared content
     def extract_text(self) -> PartialPost:
@@ -280,7 +376,9 @@ class PostExtractor:
             element = self.full_post_html.find('.story_body_container', first=True)
             if not element and self.full_post_html.find("div.msg", first=True):
                 text = self.full_post_html.find("div.msg", first=True).text
-                return {"text": text, "post_text": text}
+                post = self.post
+                post["text"] = post["post_text"] = text
+                return post
 
         
         texts = defaultdict(str)
@@ -349,14 +447,20 @@ class PostExtractor:
         if texts:
             if texts["translated_text"]:
                 texts["original_text"] = texts["text"]
-            return dict(texts)
+            post = self.post
+            post.update(texts)
+            return post
 
         elif element.find(".story_body_container>div", first=True):
             text = element.find(".story_body_container>div", first=True).text
-            return {'text': text, 'post_text': text}
+            post = self.post
+            post['text'] = post['post_text'] = text
+            return post
         elif len(nodes) == 1:
             text = nodes[0].text
-            return {'text': text, 'post_text': text}
+            post = self.post
+            post['text'] = post['post_text'] = text
+            return post
 
 
                 
@@ -371,27 +475,35 @@ class PostExtractor:
         for page in page_insights.values():
             try:
                 timestamp = page['post_context']['publish_time']
-                logger.debug(
-                    f"Got exact timestamp from publish_time: {datetime.fromtimestamp(timestamp)}"
-                )
-                return {'time': datetime.fromtimestamp(timestamp), 'timestamp': timestamp}
+                time = datetime.fromtimestamp(timestamp)
+                logger.debug(f"Got exact timestamp from publish_time: {time}")
             except (KeyError, ValueError):
                 continue
+            post = self.post
+            post['time'] = time
+            post['timestamp'] = timestamp
+            return post
 
         # Try to extract from the abbr element
         date_element = self.element.find('abbr', first=True)
         if date_element is not None:
-            date = utils.parse_datetime(date_element.text, search=False)
+            date = utils.parse_datetime(
+                date_element.text, search=False, relative_base=self.options.get("relative_base")
+            )
             if date:
-                return {'time': date}
+                self.post['time'] = date
+                return self.post
             logger.debug("Could not parse date: %s", date_element.text)
         else:
             logger.warning("Could not find the abbr element for the date")
 
         # Try to look in the entire text
-        date = utils.parse_datetime(self.element.text)
+        date = utils.parse_datetime(
+            self.element.text, relative_base=self.options.get("relative_base")
+        )
         if date:
-            return {'time': date}
+            self.post['time'] = date
+            return self.post
 
         try:
             date_element = self.full_post_html.find("abbr[data-store*='time']", first=True)
@@ -399,17 +511,39 @@ class PostExtractor:
             logger.debug(
                 f"Got exact timestamp from abbr[data-store]: {datetime.fromtimestamp(time)}"
             )
-            return {'time': datetime.fromtimestamp(time), 'timestamp': time}
+            post = self.post
+            post['time'] = datetime.fromtimestamp(time)
+            post['timestamp'] = time
+            return post
         except:
             return None
 
     def extract_user_id(self) -> PartialPost:
-        return {
-            'user_id': self.data_ft['content_owner_id_new'],
-            'page_id': self.data_ft.get("page_id"),
-        }
+        user_id = self.data_ft['content_owner_id_new']
+        post = self.post
+        post['user_id'] = user_id
+        post['page_id'] = self.data_ft.get("page_id")
+        return post
 
     def extract_image_lq(self) -> PartialPost:
+        images, image_ids, descriptions = self.find_lowquality_images()
+        image = images[0] if images else None
+        post = self.post
+        # Link to high resolution external image embedded in low quality image url
+        if image and "safe_image.php" in image and not post.get("image"):
+            url = parse_qs(urlparse(image).query).get("url")
+            if url:
+                url = url[0]
+                post["image"] = url
+                post["images"] = [url]
+        post["image_lowquality"] = image
+        post["image_id"] = image_ids[0] if image_ids else None
+        post["image_ids"] = image_ids
+        post["images_lowquality"] = images
+        post["images_lowquality_description"] = descriptions
+        return post
+
+    def find_lowquality_images(self):
         elems = self.element.find('div.story_body_container>div .img:not(.profpic)')
         if not elems:
             elems = self.element.find('.img:not(.profpic), img:not(.profpic)')
@@ -430,23 +564,7 @@ class PostExtractor:
             url = elem.element.getparent().getparent().getparent().attrib.get("href")
             if url:
                 image_ids.append(re.search(r'[=/](\d+)', url).group(1))
-
-        image = images[0] if images else None
-        image_id = image_ids[0] if image_ids else None
-        result = {
-            "image_lowquality": image,
-            "image_id": image_id,
-            "image_ids": image_ids,
-            "images_lowquality": images,
-            "images_lowquality_description": descriptions,
-        }
-        # Link to high resolution external image embedded in low quality image url
-        if image and "safe_image.php" in image and not self.post.get("image"):
-            url = parse_qs(urlparse(image).query).get("url")
-            if url:
-                url = url[0]
-                result.update({"image": url, "images": [url]})
-        return result
+        return images, image_ids, descriptions
 
     def extract_links(self) -> PartialPost:
         link = self.link_regex.search(self.element.html)
@@ -454,7 +572,10 @@ class PostExtractor:
             link = utils.unquote(link.groups()[0])
         links = self.element.find(".story_body_container>div a:not([href='#'])")
         links = [{"link": a.attrs["href"], "text": a.text} for a in links]
-        return {"link": link, "links": links}
+        post = self.post
+        post["link"] = link
+        post["links"] = links
+        return post
 
     def extract_post_url(self) -> PartialPost:
 
@@ -490,8 +611,8 @@ class PostExtractor:
         if path is None:
             return None
 
-        url = utils.urljoin(FB_BASE_URL, path)
-        return {'post_url': url}
+        self.post['post_url'] = utils.urljoin(FB_BASE_URL, path)
+        return self.post
 
     # TODO: Remove `or 0` from this methods
     def extract_likes(self) -> PartialPost:
@@ -512,11 +633,13 @@ class PostExtractor:
             or 0
         )
 
-        return {'likes': likes, 'reaction_count': likes}
+        post = self.post
+        post['likes'] = post['reaction_count'] = likes
+        return post
 
     def extract_comments(self) -> PartialPost:
-        return {
-            'comments': utils.find_and_search(
+        self.post['comments'] = (
+            utils.find_and_search(
                 self.element, 'footer', self.comments_regex, utils.convert_numeric_abbr
             )
             or self.live_data.get("comment_count")
@@ -524,17 +647,19 @@ class PostExtractor:
                 self.element.find(".cmt_def", first=True)
                 and utils.parse_int(self.element.find(".cmt_def", first=True).text)
             )
-            or 0,
-        }
+            or 0
+        )
+        return self.post
 
     def extract_shares(self) -> PartialPost:
-        return {
-            'shares': utils.find_and_search(
+        self.post['shares'] = (
+            utils.find_and_search(
                 self.element, 'footer', self.shares_regex, utils.convert_numeric_abbr
             )
             or self.live_data.get("share_count")
-            or 0,
-        }
+            or 0
+        )
+        return self.post
 
     def extract_photo_link_HQ(self, html: str) -> URL:
         # Find a link that says "View Full Size"
@@ -559,14 +684,72 @@ class PostExtractor:
         else:
             return None
 
+    def fetch_photo_page(self, url):
+        logger.debug(f"Fetching {url}")
+        response = self.request(url)
+        return response, self.extract_photo_link_HQ(response.text)
+
+    def next_photo_url(self, response) -> URL:
+        # Follow the left arrow link of the image we are on
+        direction = '{"tn":"+>"}'
+        if response.html.find("a", containing="Photos from", first=True):
+            # Right arrow link
+            direction = '{"tn":"+="}'
+        url = response.html.find(f"a.touchable[data-gt='{direction}']", first=True).attrs["href"]
+        if not url.startswith("http"):
+            url = utils.urljoin(FB_MOBILE_BASE_URL, url)
+        return url
+
+    def fetch_next_photo_page(self, page):
+        response, _ = page.result()
+        url = self.next_photo_url(response)
+        return response, url, self.fetch_photo_page(url)
+
+    def extract_photoset(self, url, executor) -> PartialPost:
+        query = parse_qs(urlparse(url).query)
+        profile_id = query["profileid"][0]
+        token = query["photoset_token"][0]
+        url = f"{profile_id}/posts/{token}"
+        logger.debug(f"Fetching {url}")
+        response = self.request(url)
+        results = self.get_jsmod("mtouch_snowflake_paged_query", response.html)
+        results = list(results["query_results"].values())[0]["media"]
+        video_ids = []
+        videos = []
+        images = []
+        image_ids = []
+        descriptions = []
+        for item in results["edges"]:
+            node = item["node"]
+            if node["is_playable"]:
+                video_ids.append(node["id"])
+                videos.append(node["playable_url_hd"] or node["playable_url"])
+                images.append(node["full_width_image"]["uri"])
+            else:
+                url = node["url"].replace(FB_W3_BASE_URL, FB_MOBILE_BASE_URL)
+                images.append(executor.submit(self.fetch_photo_page, url))
+            image_ids.append(node["id"])
+            descriptions.append(node["accessibility_caption"])
+        images = [
+            image.result()[1] if isinstance(image, Future) else image for image in images
+        ]
+        post = self.post
+        post["image"] = images[0] if images else None
+        post["images"] = images
+        post["images_description"] = descriptions
+        post["image_id"] = image_ids[0] if image_ids else None
+        post["image_ids"] = image_ids
+        post["video"] = videos[0] if videos else None
+        post["video_id"] = video_ids[0] if video_ids else None
+        post["video_ids"] = video_ids
+        post["videos"] = videos
+        return post
+
     def extract_photo_link(self) -> PartialPost:
         if not self.options.get("allow_extra_requests", True) or not self.options.get(
             "HQ_images", True
         ):
             return None
-        images = []
-        descriptions = []
-        image_ids = []
         raw_photo_links = self.element.find(
             "div.story_body_container>div a[href*='photo.php'], "
             "div.story_body_container>div a[href*='/photos/'], "
@@ -584,51 +767,36 @@ class PostExtractor:
             total_photos_in_gallery = len(photo_links) + int(photo_links[-1].text.strip("+")) - 1
             logger.debug(f"{total_photos_in_gallery} total photos in gallery")
 
-        # This gets up to 4 images in gallery
+        # Photo pages are independent of each other, so they are fetched by a pool of workers,
+        # shared by the posts of a crawl
+        executor = self.options.get("photo_executor")
+        if executor is not None:
+            return self.extract_photos(photo_links, total_photos_in_gallery, executor)
+        with ThreadPoolExecutor(max_workers=self.options.get("photo_workers", 4)) as executor:
+            return self.extract_photos(photo_links, total_photos_in_gallery, executor)
+
+    def extract_photos(self, photo_links, total_photos_in_gallery, executor) -> PartialPost:
+        images = []
+        descriptions = []
+        image_ids = []
         for link in photo_links:
             url = link.attrs["href"]
             if "photoset_token" in url:
-                query = parse_qs(urlparse(url).query)
-                profile_id = query["profileid"][0]
-                token = query["photoset_token"][0]
-                url = f"{profile_id}/posts/{token}"
-                logger.debug(f"Fetching {url}")
-                response = self.request(url)
-                results = self.get_jsmod("mtouch_snowflake_paged_query", response.html)
-                results = list(results["query_results"].values())[0]["media"]
-                video_ids = []
-                videos = []
-                for item in results["edges"]:
-                    node = item["node"]
-                    if node["is_playable"]:
-                        video_ids.append(node["id"])
-                        videos.append(node["playable_url_hd"] or node["playable_url"])
-                        images.append(node["full_width_image"]["uri"])
-                        image_ids.append(node["id"])
-                    else:
-                        url = node["url"]
-                        url = url.replace(FB_W3_BASE_URL, FB_MOBILE_BASE_URL)
-                        logger.debug(f"Fetching {url}")
-                        response = self.request(url)
-                        images.append(self.extract_photo_link_HQ(response.text))
-                        image_ids.append(node["id"])
-                    descriptions.append(node["accessibility_caption"])
-                return {
-                    "image": images[0] if images else None,
-                    "images": images,
-                    "images_description": descriptions,
-                    "image_id": image_ids[0] if image_ids else None,
-                    "image_ids": image_ids,
-                    "video": videos[0] if videos else None,
-                    "video_id": video_ids[0] if video_ids else None,
-                    "video_ids": video_ids,
-                    "videos": videos,
-                }
-            url = utils.urljoin(FB_MOBILE_BASE_URL, url)
-            logger.debug(f"Fetching {url}")
+                # The whole photoset is listed in one page, other links aren't needed
+                return self.extract_photoset(url, executor)
+
+        # This gets up to 4 images in gallery
+        urls = [utils.urljoin(FB_MOBILE_BASE_URL, link.attrs["href"]) for link in photo_links]
+        pages = [executor.submit(self.fetch_photo_page, url) for url in urls]
+        next_page = None
+        if pages and total_photos_in_gallery > len(pages):
+            # Start following the arrows as soon as the last linked photo is fetched
+            next_page = executor.submit(self.fetch_next_photo_page, pages[-1])
+
+        for url, page in zip(urls, pages):
             try:
-                response = self.request(url)
-                images.append(self.extract_photo_link_HQ(response.text))
+                response, photo_link = page.result()
+                images.append(photo_link)
                 elem = response.html.find(".img[data-sigil='photo-image']", first=True)
                 descriptions.append(elem.attrs.get("alt") or elem.attrs.get("aria-label"))
                 image_ids.append(re.search(r'[=/](\d+)', url).group(1))
@@ -638,19 +806,17 @@ class PostExtractor:
 
         errors = 0
         while len(images) < total_photos_in_gallery:
-            # More photos to fetch. Follow the left arrow link of the last image we were on
-            direction = '{"tn":"+>"}'
-            if response.html.find("a", containing="Photos from", first=True):
-                # Right arrow link
-                direction = '{"tn":"+="}'
-            url = response.html.find(f"a.touchable[data-gt='{direction}']", first=True).attrs[
-                "href"
-            ]
-            if not url.startswith("http"):
-                url = utils.urljoin(FB_MOBILE_BASE_URL, url)
-            logger.debug(f"Fetching {url}")
-            response = self.request(url)
-            photo_link = self.extract_photo_link_HQ(response.text)
+            # More photos to fetch. Follow the arrow link of the last image we were on
+            if (
+                next_page is not None
+                and next_page.exception() is None
+                and next_page.result()[0] is response
+            ):
+                _, url, (response, photo_link) = next_page.result()
+            else:
+                url = self.next_photo_url(response)
+                response, photo_link = self.fetch_photo_page(url)
+            next_page = None
             if photo_link not in images:
                 images.append(photo_link)
                 elem = response.html.find(".img[data-sigil='photo-image']", first=True)
@@ -661,19 +827,19 @@ class PostExtractor:
                 if errors > 5:
                     logger.error("Reached image error limit")
                     break
-        image = images[0] if images else None
-        image_id = image_ids[0] if image_ids else None
-        return {
-            "image": image,
-            "images": images,
-            "images_description": descriptions,
-            "image_id": image_id,
-            "image_ids": image_ids,
-        }
+        post = self.post
+        post["image"] = images[0] if images else None
+        post["images"] = images
+        post["images_description"] = descriptions
+        post["image_id"] = image_ids[0] if image_ids else None
+        post["image_ids"] = image_ids
+        return post
 
     def extract_reactors(self, response, reaction_lookup=utils.reaction_lookup):
         """Fetch people reacting to an existing post obtained by `get_posts`.
-        Note that this method may raise one more http request per post to get all reactors"""
+        Note that this method may raise one more http request per post to get all reactors.
+        Each page of reactors is requested while the previous one is consumed, and no more than
+        the `reactors` limit are yielded"""
         emoji_url_lookup = {}
         spriteMapCssClass = "sp_LdwxfpG67Bn"
         emoji_class_lookup = utils.emoji_class_lookup
@@ -685,7 +851,7 @@ class PostExtractor:
                     emoji_class_lookup[item["spriteCssClass"]] = name
                     spriteMapCssClass = item["spriteMapCssClass"]
         for sigil in response.html.find("span[data-sigil='reaction_profile_sigil']"):
-            single_reaction = demjson.decode(sigil.attrs.get("data-store"))
+            single_reaction = js_decoder.decode(sigil.attrs.get("data-store"), "reaction")
             if "reactionType" in single_reaction:
                 k = str(single_reaction["reactionType"])
             else:
@@ -701,91 +867,109 @@ class PostExtractor:
         limit = 1e9
         if type(reactors_opt) in [int, float] and reactors_opt < limit:
             limit = reactors_opt
+        limit = int(limit)
         logger.debug(f"Fetching {limit} reactors")
-        elems = list(response.html.find("div[id^='reaction_profile_browser']>div"))
-        for elem in elems:
+        # When resuming, the reactors before the start url were already scraped
+        start_url = self.options.get("reactors_start_url")
+        request_url_callback = self.options.get("reactors_request_url_callback")
+        elems = []
+        if not start_url:
+            elems = list(response.html.find("div[id^='reaction_profile_browser']>div"))
+        more = response.html.find("div[id^=reaction_profile_pager] a", first=True)
+        next_url = start_url
+        if more and not next_url:
+            next_url = utils.urljoin(FB_MOBILE_BASE_URL, more.attrs.get("href"))
+
+        count = 0
+        first_page = True
+        next_page = None
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reactors")
+        try:
+            while True:
+                # The next page is requested while this one is consumed, unless it's not needed
+                if next_url and count + len(elems) < limit:
+                    logger.debug(f"Fetching {next_url}")
+                    next_page = next_url, executor.submit(self.fetch_reactors_page, next_url)
+                for elem in elems[: limit - count]:
+                    if not first_page and not elem.find(f"div>i.{spriteMapCssClass}", first=True):
+                        # Try update spriteMapCssClass
+                        icon = elem.find("div>i.img", first=True)
+                        for c in icon.attrs["class"] if icon else []:
+                            if c.startswith("sp_"):
+                                spriteMapCssClass = c
+                    yield self.parse_reactor(
+                        elem, spriteMapCssClass, emoji_class_lookup, emoji_url_lookup
+                    )
+                    count += 1
+                if next_page is None:
+                    break
+                url, future = next_page
+                next_page = None
+                first_page = False
+                if request_url_callback:
+                    request_url_callback(url)
+                try:
+                    elems, next_url = future.result()
+                except Exception as e:
+                    logger.error(e)
+                    break
+        finally:
+            if next_page:
+                next_page[1].cancel()
+            # Don't wait for a page requested ahead that won't be consumed
+            executor.shutdown(wait=False)
+
+    def fetch_reactors_page(self, url):
+        """Request a page of reactors, returning its rows and the URL of the next page"""
+        response = self.request(url)
+        prefix_length = len('for (;;);')
+        data = json.loads(response.text[prefix_length:])  # Strip 'for (;;);'
+        elems = []
+        more_url = None
+        for action in data['payload']['actions']:
+            if action['cmd'] == 'append':
+                html = utils.make_html_element(
+                    f"<div id='reaction_profile_browser'>{action['html']}</div>",
+                    url=FB_MOBILE_BASE_URL,
+                )
+                elems = html.find(
+                    'div#reaction_profile_browser>div,div#reaction_profile_browser1>div'
+                )
+            elif action['cmd'] == 'replace':
+                html = utils.make_html_element(
+                    f"<div id='reaction_profile_browser'>{action['html']}</div>",
+                    url=FB_MOBILE_BASE_URL,
+                )
+                more = html.find("div#reaction_profile_pager a", first=True)
+                if more:
+                    more_url = utils.urljoin(FB_MOBILE_BASE_URL, more.attrs.get("href"))
+        return elems, more_url
+
+    def parse_reactor(self, elem, sprite_map_css_class, emoji_class_lookup, emoji_url_lookup):
+        """Parse a row of a reactors page into the name and link of the reactor, and the type of
+        their reaction, found by its sprite class or else by its image URL"""
+        try:
+            emoji_class = elem.find(f"div>i.{sprite_map_css_class}", first=True).attrs.get(
+                "class"
+            )[-1]
+            reaction_type = emoji_class_lookup.get(emoji_class)
+            if not reaction_type:
+                logger.error(f"Don't know {emoji_class}")
+        except AttributeError:
             try:
-                emoji_class = elem.find(f"div>i.{spriteMapCssClass}", first=True).attrs.get(
-                    "class"
-                )[-1]
-                reaction_type = emoji_class_lookup.get(emoji_class)
+                emoji_style = elem.find(f"div>i[style]", first=True).attrs.get("style")
+                emoji_url = utils.get_background_image_url(emoji_style)
+                reaction_type = emoji_url_lookup.get(emoji_url)
                 if not reaction_type:
-                    logger.error(f"Don't know {emoji_class}")
+                    logger.error(f"Don't know {emoji_url}")
             except AttributeError:
-                try:
-                    emoji_style = elem.find(f"div>i[style]", first=True).attrs.get("style")
-                    emoji_url = utils.get_background_image_url(emoji_style)
-                    reaction_type = emoji_url_lookup.get(emoji_url)
-                    if not reaction_type:
-                        logger.error(f"Don't know {emoji_url}")
-                except AttributeError:
-                    logger.error(f"No div>i[style] elem in: {elem}")
-                    reaction_type = None
-            yield {
-                "name": elem.find("strong", first=True).text,
-                "link": utils.urljoin(FB_BASE_URL, elem.find("a", first=True).attrs.get("href")),
-                "type": reaction_type,
-            }
-        more = response.html.find("div[id^=reaction_profile_pager] a", first=True)
-        while more and len(elems) < limit:
-            url = utils.urljoin(FB_MOBILE_BASE_URL, more.attrs.get("href"))
-            logger.debug(f"Fetching {url}")
-            try:
-                response = self.request(url)
-            except Exception as e:
-                logger.error(e)
-                break
-            prefix_length = len('for (;;);')
-            data = json.loads(response.text[prefix_length:])  # Strip 'for (;;);'
-            more = None
-            for action in data['payload']['actions']:
-                if action['cmd'] == 'append':
-                    html = utils.make_html_element(
-                        f"<div id='reaction_profile_browser'>{action['html']}</div>",
-                        url=FB_MOBILE_BASE_URL,
-                    )
-                    elems = html.find(
-                        'div#reaction_profile_browser>div,div#reaction_profile_browser1>div'
-                    )
-                    for elem in elems:
-                        if not elem.find(f"div>i.{spriteMapCssClass}", first=True):
-                            # Try update spriteMapCssClass
-                            classes = elem.find("div>i.img", first=True).attrs["class"]
-                            for c in classes:
-                                if c.startswith("sp_"):
-                                    spriteMapCssClass = c
-                        try:
-                            emoji_class = elem.find(
-                                f"div>i.{spriteMapCssClass}", first=True
-                            ).attrs.get("class")[-1]
-                            reaction_type = emoji_class_lookup.get(emoji_class)
-                            if not reaction_type:
-                                logger.error(f"Don't know {emoji_class}")
-                        except AttributeError:
-                            try:
-                                emoji_style = elem.find(f"div>i[style]", first=True).attrs.get(
-                                    "style"
-                                )
-                                emoji_url = utils.get_background_image_url(emoji_style)
-                                reaction_type = emoji_url_lookup.get(emoji_url)
-                                if not reaction_type:
-                                    logger.error(f"Don't know {emoji_url}")
-                            except AttributeError:
-                                logger.error(f"No div>i[style] elem in: {elem.html}")
-                                reaction_type = None
-                        yield {
-                            "name": elem.find("strong", first=True).text,
-                            "link": utils.urljoin(
-                                FB_BASE_URL, elem.find("a", first=True).attrs.get("href")
-                            ),
-                            "type": reaction_type,
-                        }
-                elif action['cmd'] == 'replace':
-                    html = utils.make_html_element(
-                        f"<div id='reaction_profile_browser'>{action['html']}</div>",
-                        url=FB_MOBILE_BASE_URL,
-                    )
-                    more = html.find("div#reaction_profile_pager a", first=True)
+                logger.error(f"No div>i[style] elem in: {elem.html}")
+                reaction_type = None
+        return {
+            "name": elem.find("strong", first=True).text,
+            "link": utils.urljoin(FB_BASE_URL, elem.find("a", first=True).attrs.get("href")),
+            "type": reaction_type,
+        }
 
     def extract_sharers(self):
         """Fetch people sharing an existing post obtained by `get_posts`.
@@ -850,7 +1034,9 @@ class PostExtractor:
                 reactions = {}
                 reaction_count = 0
                 for sigil in response.html.find("span[data-sigil='reaction_profile_sigil']"):
-                    single_reaction = demjson.decode(sigil.attrs.get("data-store"))
+                    single_reaction = js_decoder.decode(
+                        sigil.attrs.get("data-store"), "reaction"
+                    )
                     if "reactionType" in single_reaction:
                         k = str(single_reaction["reactionType"])
                     else:
@@ -910,13 +1096,16 @@ class PostExtractor:
                 video_post = PostExtractor(
                     response.html, self.options, self.request, full_post_html=response.html
                 )
-                video_post.post = {"post_id": video_id}
-                meta = video_post.extract_video_meta() or {}
-                return {
-                    "video_id": video_id,
-                    "video": video_post.extract_video().get("video"),
-                    **meta,
-                }
+                video_post.post = video = {"post_id": video_id}
+                has_meta = video_post.extract_video_meta() is not None
+                video_post.extract_video()
+                post = self.post
+                post["video_id"] = video_id
+                post["video"] = video.get("video")
+                if has_meta:
+                    for field in ("time",) + self.method_fields["extract_video_meta"]:
+                        post[field] = video[field]
+                return post
 
         if video_data_element is None:
             return None
@@ -928,16 +1117,22 @@ class PostExtractor:
 
     def extract_video_lowres(self, video_data_element):
         try:
-            data = demjson.decode(video_data_element.attrs['data-store'].replace("\\\\", "\\"))
-            return {'video': data.get('src').replace("\\/", "/")}
-        except JSONDecodeError as ex:
+            data = js_decoder.decode(
+                video_data_element.attrs['data-store'].replace("\\\\", "\\"), "video"
+            )
+            self.post['video'] = data.get('src').replace("\\/", "/")
+            return self.post
+        except js_decoder.JSDecodeError as ex:
             logger.error("Error parsing data-store JSON: %r", ex)
         except KeyError:
             logger.error("data-store attribute not found")
         return None
 
     def extract_video_highres(self):
-        if not YoutubeDL:
+        try:
+            from youtube_dl import YoutubeDL
+            from youtube_dl.utils import ExtractorError
+        except ImportError:
             raise ModuleNotFoundError(
                 "youtube-dl must be installed to download videos in high resolution."
             )
@@ -952,7 +1147,8 @@ class PostExtractor:
         try:
             with YoutubeDL(ydl_opts) as ydl:
                 url = ydl.extract_info(self.post.get("post_url"), download=False)['url']
-                return {'video': url}
+            self.post['video'] = url
+            return self.post
         except ExtractorError as ex:
             logger.error("Error extracting video with youtube-dl: %r", ex)
 
@@ -965,13 +1161,15 @@ class PostExtractor:
         style = thumbnail_element.attrs.get('style', '')
         match = self.video_thumbnail_regex.search(style)
         if match:
-            return {'video_thumbnail': utils.decode_css_url(match.groups()[0])}
+            self.post['video_thumbnail'] = utils.decode_css_url(match.groups()[0])
+            return self.post
         return None
 
     def extract_video_id(self):
         match = self.video_id_regex.search(self.element.html)
         if match:
-            return {'video_id': match.groups()[0]}
+            self.post['video_id'] = match.groups()[0]
+            return self.post
         return None
 
     def extract_video_meta(self):
@@ -990,22 +1188,28 @@ class PostExtractor:
         if meta.get("contentSize"):
             contentSize = float(meta['contentSize'].strip("kB")) / 1000
 
-        time = utils.parse_datetime(meta["datePublished"])
+        time = utils.parse_datetime(
+            meta["datePublished"], relative_base=self.options.get("relative_base")
+        )
         # Remove the timezone attribute to make it timezone-naive
         time = time.astimezone().replace(tzinfo=None)
-        return {
-            "time": time,
-            'video_duration_seconds': utils.parse_duration(meta.get("duration")),
-            'video_watches': watches,
-            'video_quality': meta.get('videoQuality'),
-            'video_width': meta.get('width'),
-            'video_height': meta.get('height'),
-            'video_size_MB': contentSize,
-        }
+        duration = utils.parse_duration(meta.get("duration"))
+        post = self.post
+        post["time"] = time
+        post['video_duration_seconds'] = duration
+        post['video_watches'] = watches
+        post['video_quality'] = meta.get('videoQuality')
+        post['video_width'] = meta.get('width')
+        post['video_height'] = meta.get('height')
+        post['video_size_MB'] = contentSize
+        return post
 
     def extract_is_live(self):
         header = self.element.find('header')[0].full_text
-        return {'is_live': "is live" in header, 'was_live': "was live" in header}
+        post = self.post
+        post['is_live'] = "is live" in header
+        post['was_live'] = "was live" in header
+        return post
 
     def extract_factcheck(self):
         button = self.element.find('button[value="See Why"]', first=True)
@@ -1017,7 +1221,8 @@ class PostExtractor:
             if text.strip() == "See Why":
                 continue
             factcheck += text + "\n"
-        return {'factcheck': factcheck}
+        self.post['factcheck'] = factcheck
+        return self.post
 
     def extract_share_information(self):
         if not self.data_ft.get("original_content_id"):
@@ -1031,20 +1236,25 @@ class PostExtractor:
         )
         # We can re-use the existing parsers, as a one level deep recursion
         shared_post = PostExtractor(raw_post, self.options, self.request)
+        shared_post.post = {}
         shared_user_info = shared_post.extract_username()
-        return {
-            'shared_post_id': self.data_ft["original_content_id"],
-            'shared_time': shared_post.extract_time().get("time"),
-            'shared_user_id': self.data_ft["original_content_owner_id"],
-            'shared_username': shared_user_info.get("username"),
-            'shared_user_url': shared_user_info.get("user_url"),
-            'shared_post_url': shared_post.extract_post_url().get("post_url"),
-        }
+        shared_time = shared_post.extract_time().get("time")
+        shared_user_id = self.data_ft["original_content_owner_id"]
+        shared_post_url = shared_post.extract_post_url().get("post_url")
+        post = self.post
+        post['shared_post_id'] = self.data_ft["original_content_id"]
+        post['shared_time'] = shared_time
+        post['shared_user_id'] = shared_user_id
+        post['shared_username'] = shared_user_info.get("username")
+        post['shared_user_url'] = shared_user_info.get("user_url")
+        post['shared_post_url'] = shared_post_url
+        return post
 
     def extract_availability(self):
-        return {
-            'available': ">This content isn't available at the moment<" not in self.element.html
-        }
+        self.post['available'] = (
+            ">This content isn't available at the moment<" not in self.element.html
+        )
+        return self.post
 
     def parse_comment(self, comment):
         comment_id = comment.attrs.get("id")
@@ -1088,7 +1298,9 @@ class PostExtractor:
         # Try to extract from the abbr element
         date_element = comment.find('abbr', first=True)
         if date_element:
-            date = utils.parse_datetime(date_element.text, search=True)
+            date = utils.parse_datetime(
+                date_element.text, search=True, relative_base=self.options.get("relative_base")
+            )
             if not date:
                 logger.debug(f"Unable to parse {date_element.text}")
         else:
@@ -1204,7 +1416,24 @@ class PostExtractor:
         except Exception as e:
             logger.error(f"Unable to parse comment {replies_url} replies {replies}: {e}")
 
-    def extract_comment_with_replies(self, comment):
+    def fetch_comment_replies(self, replies_url, banned: threading.Event):
+        """Fetch and parse all the replies of a comment, from a worker thread"""
+        if banned.is_set():
+            # Another worker was banned, don't request anything more
+            raise exceptions.TemporarilyBanned("Banned while fetching other replies")
+        try:
+            return list(self.extract_comment_replies(replies_url))
+        except exceptions.TemporarilyBanned:
+            banned.set()
+            raise
+
+    @staticmethod
+    def prefetched_replies(future: Future):
+        yield from future.result()
+
+    def extract_comment_with_replies(self, comment, reply_fetcher=None):
+        """Parse a comment. Replies that aren't inline are requested when they're consumed, or
+        right away by `reply_fetcher`, a function submitting `fetch_comment_replies`"""
         try:
             result = self.parse_comment(comment)
             result["replies"] = [
@@ -1216,7 +1445,12 @@ class PostExtractor:
                 first=True,
             )
             if replies_url:
-                reply_generator = self.extract_comment_replies(replies_url.attrs["href"])
+                if reply_fetcher is not None:
+                    reply_generator = self.prefetched_replies(
+                        reply_fetcher(replies_url.attrs["href"])
+                    )
+                else:
+                    reply_generator = self.extract_comment_replies(replies_url.attrs["href"])
                 if result["replies"]:
                     result["replies"] = itertools.chain(result["replies"], reply_generator)
                 else:
@@ -1227,9 +1461,40 @@ class PostExtractor:
         except Exception as e:
             logger.error(f"Unable to parse comment {comment}: {e}")
 
+    def iter_page_comments(self, comments, reply_fetcher=None):
+        if reply_fetcher is None:
+            results = (self.extract_comment_with_replies(comment) for comment in comments)
+        else:
+            # The replies of the whole page are requested before the first comment is yielded
+            results = [
+                self.extract_comment_with_replies(comment, reply_fetcher) for comment in comments
+            ]
+        for result in results:
+            if result:
+                yield result
+
     def extract_comments_full(self):
         """Fetch comments for an existing post obtained by `get_posts`.
-        Note that this method may raise multiple http requests per post to get all comments"""
+        Note that this method may raise multiple http requests per post to get all comments.
+        With the `reply_workers` option, the replies of each page of comments are fetched by a
+        pool of that many workers, in the background, and yielded in the same order"""
+        reply_workers = self.options.get("reply_workers")
+        if not reply_workers:
+            yield from self._extract_comments_full()
+            return
+        executor = ThreadPoolExecutor(max_workers=reply_workers, thread_name_prefix="replies")
+        banned = threading.Event()
+
+        def reply_fetcher(replies_url):
+            return executor.submit(self.fetch_comment_replies, replies_url, banned)
+
+        try:
+            yield from self._extract_comments_full(reply_fetcher, banned)
+        finally:
+            # Replies can still be consumed after the comments, let the workers finish
+            executor.shutdown(wait=False)
+
+    def _extract_comments_full(self, reply_fetcher=None, banned=None):
         if not self.full_post_html:
             logger.error("Unable to get comments without full post HTML")
             return
@@ -1246,10 +1511,7 @@ class PostExtractor:
             logger.warning("No comments found on page")
             return
 
-        for comment in comments:
-            result = self.extract_comment_with_replies(comment)
-            if result:
-                yield result
+        yield from self.iter_page_comments(comments, reply_fetcher)
 
         more_selector = f"div#see_next_{self.post.get('post_id')} a"
         more = elem.find(more_selector, first=True)
@@ -1270,6 +1532,8 @@ class PostExtractor:
         logger.debug(f"Fetching up to {limit} comments")
 
         if self.options.get("progress"):
+            from tqdm.auto import tqdm
+
             pbar = tqdm(total=limit)
 
         visited_urls = []
@@ -1289,6 +1553,8 @@ class PostExtractor:
             more_url = self.options.get("comment_start_url")
 
         while more_url and len(comments) <= limit:
+            if banned is not None and banned.is_set():
+                raise exceptions.TemporarilyBanned("Banned while fetching replies")
             if request_url_callback:
                 request_url_callback(utils.urljoin(FB_MOBILE_BASE_URL, more_url))
             if more_url in visited_urls:
@@ -1315,10 +1581,7 @@ class PostExtractor:
             if not more_comments:
                 logger.warning("No comments found on page")
                 break
-            for comment in more_comments:
-                result = self.extract_comment_with_replies(comment)
-                if result:
-                    yield result
+            yield from self.iter_page_comments(more_comments, reply_fetcher)
             more = elem.find(more_selector, first=True)
             if more:
                 if self.options.get("response_url"):
@@ -1343,11 +1606,12 @@ class PostExtractor:
         # Marketplace listings
         divs = self.element.find("div[data-ft='{\"tn\":\"H\"}']>div>div")
         if len(divs) >= 3:
-            return {
-                "listing_title": divs[0].find("span")[-1].text,
-                "listing_price": divs[1].text,
-                "listing_location": divs[2].text,
-            }
+            title = divs[0].find("span")[-1].text
+            post = self.post
+            post["listing_title"] = title
+            post["listing_price"] = divs[1].text
+            post["listing_location"] = divs[2].text
+            return post
 
     def extract_with(self) -> PartialPost:
         # Header is like "user is with other_user and n others"
@@ -1361,7 +1625,11 @@ class PostExtractor:
                 links = response.html.find("#root .item>div>div>a:not(.touchable)")
                 for link in links:
                     people.append({"name": link.text, "link": link.attrs["href"]})
-            return {"with": people, "header": self.element.find("header h3", first=True).text}
+            header = self.element.find("header h3", first=True).text
+            post = self.post
+            post["with"] = people
+            post["header"] = header
+            return post
 
     @property
     def data_ft(self) -> dict:
@@ -1371,8 +1639,8 @@ class PostExtractor:
         self._data_ft = {}
         try:
             data_ft_json = self.element.attrs['data-ft'].replace("\\\\", "\\")
-            self._data_ft = demjson.decode(data_ft_json)
-        except JSONDecodeError as ex:
+            self._data_ft = js_decoder.decode(data_ft_json, "data_ft")
+        except js_decoder.JSDecodeError as ex:
             logger.error("Error parsing data-ft JSON: %r", ex)
         except KeyError:
             logger.error("data-ft attribute not found")
@@ -1416,12 +1684,7 @@ class PostExtractor:
                 element = self.full_post_html
             else:
                 element = self.element
-        match = re.search(name + r'[^{]+({.+?})(?:\]\]|,\d)', element.html)
-        if match:
-            # Use demjson to load JS, as unquoted keys is not valid JSON
-            return demjson.decode(match.group(1))
-        else:
-            return {}
+        return JsModIndex.of(element).get(name)
 
 
 class GroupPostExtractor(PostExtractor):
@@ -1434,31 +1697,39 @@ class GroupPostExtractor(PostExtractor):
 class PhotoPostExtractor(PostExtractor):
     def extract_text(self) -> PartialPost:
         text = self.element.find("div.msg", first=True).text
-        return {"text": text, "post_text": text}
+        post = self.post
+        post["text"] = post["post_text"] = text
+        return post
 
     def extract_photo_link(self) -> PartialPost:
         image = self.extract_photo_link_HQ(self.full_post_html.html)
-        return {
-            "image": image,
-            "images": [image],
-            "images_description": self.extract_image_lq()["images_lowquality_description"],
-        }
+        _, _, descriptions = self.find_lowquality_images()
+        post = self.post
+        post["image"] = image
+        post["images"] = [image]
+        post["images_description"] = descriptions
+        return post
 
     def extract_user_id(self) -> PartialPost:
         match = re.search(r'entity_id:(\d+),', self.element.html)
         if match:
-            return {"user_id": match.group(1)}
+            self.post["user_id"] = match.group(1)
+            return self.post
 
     def extract_post_url(self) -> PartialPost:
-        return {"post_url": utils.urljoin(FB_MOBILE_BASE_URL, self.extract_post_id()["post_id"])}
+        post_id = self.extract_post_id()["post_id"]
+        self.post["post_url"] = utils.urljoin(FB_MOBILE_BASE_URL, post_id)
+        return self.post
 
     def extract_post_id(self) -> PartialPost:
         try:
-            return {"post_id": str(self.live_data["ft_ent_identifier"])}
+            self.post["post_id"] = str(self.live_data["ft_ent_identifier"])
+            return self.post
         except KeyError:
             match = re.search(r'ft_ent_identifier=(\d+)', self.full_post_html.html)
             if match:
-                return {"post_id": match.groups()[0]}
+                self.post["post_id"] = match.groups()[0]
+                return self.post
 
 
 class HashtagPostExtractor(PostExtractor):
@@ -1486,10 +1757,16 @@ class StoryExtractor(PostExtractor):
             url = elem.find("a", first=True).attrs["href"]
             if url:
                 url = utils.urljoin(FB_BASE_URL, url)
-            return {'username': elem.find("div.overflowText", first=True).text, 'user_url': url}
+            post = self.post
+            post['username'] = elem.find("div.overflowText", first=True).text
+            post['user_url'] = url
+            return post
 
     def extract_time(self) -> PartialPost:
         date_element = self.element.find("abbr[data-store*='time']", first=True)
         time = json.loads(date_element.attrs["data-store"])["time"]
         logger.debug(f"Got exact timestamp from abbr[data-store]: {datetime.fromtimestamp(time)}")
-        return {'time': datetime.fromtimestamp(time), 'timestamp': time}
+        post = self.post
+        post['time'] = datetime.fromtimestamp(time)
+        post['timestamp'] = time
+        return post
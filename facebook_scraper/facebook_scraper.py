@@ -3,18 +3,23 @@ import logging
 from urllib.parse import urljoin
 import warnings
 import re
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from typing import Iterator, Union
 import json
-import demjson3 as demjson
 from urllib.parse import parse_qs, urlparse, unquote
 from datetime import datetime
 import os
+import time
 
 from requests import RequestException
-from requests_html import HTMLSession
 
-from . import utils
+from . import js_decoder, utils
+from .cache import ResponseCache
+from .retry import RetryPolicy
+from .seen_posts import SeenPostIndex
+from .checkpoint import Checkpoint
+from .timings import Timings, timed
 from .constants import (
     DEFAULT_PAGE_LIMIT,
     FB_BASE_URL,
@@ -25,6 +30,7 @@ from .constants import (
 from .extractors import (
     extract_group_post,
     extract_post,
+    extract_post_id,
     extract_photo_post,
     extract_story_post,
     PostExtractor,
@@ -58,6 +64,8 @@ class FacebookScraper:
 
     def __init__(self, session=None, requests_kwargs=None):
         if session is None:
+            from requests_html import HTMLSession
+
             session = HTMLSession()
             session.headers.update(self.default_headers)
 
@@ -67,6 +75,12 @@ class FacebookScraper:
         self.session = session
         self.requests_kwargs = requests_kwargs
         self.request_count = 0
+        self.cache = None
+        self.rate_limiter = None
+        self.identities = None
+        self.retry_policy = RetryPolicy()
+        self.seen_posts = None
+        self.timings = None
 
     def set_user_agent(self, user_agent):
         self.session.headers["User-Agent"] = user_agent
@@ -77,6 +91,56 @@ class FacebookScraper:
         else:
             self.session.cookies.set("noscript", "0")
 
+    def set_cache(self, cache):
+        """Cache responses in a `ResponseCache`, or in a new one stored at the given path.
+        Set to None to stop caching"""
+        if isinstance(cache, (str, os.PathLike)):
+            cache = ResponseCache(cache)
+        self.cache = cache
+        for identity in self.identities or []:
+            identity.scraper.cache = cache
+
+    def set_rate_limiter(self, rate_limiter):
+        """Throttle requests with a `RateLimiter`. Set to None to stop throttling"""
+        self.rate_limiter = rate_limiter
+
+    def set_retry_policy(self, retry_policy):
+        """Retry requests that fail with transient errors as set by a `RetryPolicy`.
+        Set to None to never retry"""
+        self.retry_policy = retry_policy
+        for identity in self.identities or []:
+            identity.scraper.retry_policy = retry_policy
+
+    def set_seen_posts(self, seen_posts):
+        """Only scrape the posts of accounts and groups that aren't in a `SeenPostIndex`, or in a
+        new one stored at the given path. Set to None to scrape every post"""
+        if isinstance(seen_posts, (str, os.PathLike)):
+            seen_posts = SeenPostIndex(seen_posts)
+        self.seen_posts = seen_posts
+
+    def set_timings(self, timings):
+        """Time requests, page parsing, post extraction and sink writes in a `Timings`, or in a
+        new one if True. Set to None to stop timing"""
+        if timings is True:
+            timings = Timings()
+        self.timings = timings
+        for identity in self.identities or []:
+            identity.scraper.timings = timings
+
+    def set_identities(self, identities):
+        """Send requests as the identities of an `IdentityPool`, or a list of `Identity`.
+        Identities share the response cache, but have their own rate limiter.
+        Set to None to send requests with this scraper's own session again"""
+        from .identities import IdentityPool
+
+        if identities is not None and not isinstance(identities, IdentityPool):
+            identities = IdentityPool(identities)
+        self.identities = identities
+        for identity in identities or []:
+            identity.scraper.cache = self.cache
+            identity.scraper.retry_policy = self.retry_policy
+            identity.scraper.timings = self.timings
+
     def set_proxy(self, proxy, verify=True):
         self.requests_kwargs.update(
             {'proxies': {'http': proxy, 'https': proxy}, 'verify': verify}
@@ -88,8 +152,11 @@ class FacebookScraper:
 
     def get_posts(self, account: str, **kwargs) -> Iterator[Post]:
         kwargs["scraper"] = self
+        self._use_checkpoint(kwargs)
         iter_pages_fn = partial(iter_pages, account=account, request_fn=self.get, **kwargs)
-        return self._generic_get_posts(extract_post, iter_pages_fn, **kwargs)
+        return self._generic_get_posts(
+            extract_post, iter_pages_fn, seen_key=account, post_id_fn=extract_post_id, **kwargs
+        )
 
     def get_reactors(self, post_id: int, **kwargs) -> Iterator[dict]:
         reaction_url = (
@@ -116,82 +183,85 @@ class FacebookScraper:
         if self.session.cookies.get("noscript") == "1":
             options["noscript"] = True
         for post_url in post_urls:
-            url = str(post_url)
-            if url.startswith(FB_BASE_URL):
-                url = url.replace(FB_BASE_URL, FB_MOBILE_BASE_URL)
-            if url.startswith(FB_W3_BASE_URL):
-                url = url.replace(FB_W3_BASE_URL, FB_MOBILE_BASE_URL)
-            if not url.startswith(FB_MOBILE_BASE_URL):
-                url = utils.urljoin(FB_MOBILE_BASE_URL, url)
-
-            post = {"original_request_url": post_url, "post_url": url}
-            logger.debug(f"Requesting page from: {url}")
-            response = self.get(url)
-            options["response_url"] = response.url
-            photo_post = False
-            if "/stories/" in url or "/story/" in url:
-                elem = response.html.find("#story_viewer_content", first=True)
-            else:
-                elem = response.html.find('[data-ft*="top_level_post_id"]', first=True)
-                if not elem:
-                    elem = response.html.find('div.async_like', first=True)
-                if response.html.find("div.msg", first=True):
-                    photo_post = True
-                    elem = response.html
+            yield self._get_post_by_url(post_url, options, remove_source)
+
+    def _get_post_by_url(self, post_url, options, remove_source=True) -> Post:
+        url = str(post_url)
+        if url.startswith(FB_BASE_URL):
+            url = url.replace(FB_BASE_URL, FB_MOBILE_BASE_URL)
+        if url.startswith(FB_W3_BASE_URL):
+            url = url.replace(FB_W3_BASE_URL, FB_MOBILE_BASE_URL)
+        if not url.startswith(FB_MOBILE_BASE_URL):
+            url = utils.urljoin(FB_MOBILE_BASE_URL, url)
+
+        post = {"original_request_url": post_url, "post_url": url}
+        logger.debug(f"Requesting page from: {url}")
+        response = self.get(url)
+        options["response_url"] = response.url
+        photo_post = False
+        if "/stories/" in url or "/story/" in url:
+            elem = response.html.find("#story_viewer_content", first=True)
+        else:
+            elem = response.html.find('[data-ft*="top_level_post_id"]', first=True)
             if not elem:
-                logger.warning("No raw posts (<article> elements) were found in this page.")
-            else:
-                comments_area = response.html.find('div.ufi', first=True)
-                if comments_area:
-                    # Makes likes/shares regexes work
-                    try:
-                        elem = utils.make_html_element(
-                            elem.html.replace("</footer>", comments_area.html + "</footer>")
-                        )
-                    except ValueError as e:
-                        logger.debug(e)
-
-                if photo_post:
-                    post.update(
-                        extract_photo_post(
-                            elem,
-                            request_fn=self.get,
-                            options=options,
-                            full_post_html=response.html,
-                        )
+                elem = response.html.find('div.async_like', first=True)
+            if response.html.find("div.msg", first=True):
+                photo_post = True
+                elem = response.html
+        if not elem:
+            logger.warning("No raw posts (<article> elements) were found in this page.")
+        else:
+            comments_area = response.html.find('div.ufi', first=True)
+            if comments_area:
+                # Makes likes/shares regexes work
+                try:
+                    elem = utils.make_html_element(
+                        elem.html.replace("</footer>", comments_area.html + "</footer>")
                     )
-                elif url.startswith(utils.urljoin(FB_MOBILE_BASE_URL, "/groups/")):
-                    post.update(
-                        extract_group_post(
-                            elem,
-                            request_fn=self.get,
-                            options=options,
-                            full_post_html=response.html,
-                        )
+                except ValueError as e:
+                    logger.debug(e)
+
+            if photo_post:
+                post.update(
+                    extract_photo_post(
+                        elem,
+                        request_fn=self.get,
+                        options=options,
+                        full_post_html=response.html,
                     )
-                elif "/stories/" in url or "/story/" in url:
-                    post.update(
-                        extract_story_post(
-                            elem,
-                            request_fn=self.get,
-                            options=options,
-                            full_post_html=response.html,
-                        )
+                )
+            elif url.startswith(utils.urljoin(FB_MOBILE_BASE_URL, "/groups/")):
+                post.update(
+                    extract_group_post(
+                        elem,
+                        request_fn=self.get,
+                        options=options,
+                        full_post_html=response.html,
                     )
-                else:
-                    post.update(
-                        extract_post(
-                            elem,
-                            request_fn=self.get,
-                            options=options,
-                            full_post_html=response.html,
-                        )
+                )
+            elif "/stories/" in url or "/story/" in url:
+                post.update(
+                    extract_story_post(
+                        elem,
+                        request_fn=self.get,
+                        options=options,
+                        full_post_html=response.html,
                     )
-                if not post.get("post_url"):
-                    post["post_url"] = url
-                if remove_source:
-                    post.pop('source', None)
-            yield post
+                )
+            else:
+                post.update(
+                    extract_post(
+                        elem,
+                        request_fn=self.get,
+                        options=options,
+                        full_post_html=response.html,
+                    )
+                )
+            if not post.get("post_url"):
+                post["post_url"] = url
+            if remove_source:
+                post.pop('source', None)
+        return post
 
     def get_posts_by_search(self, word: str, **kwargs) -> Iterator[Post]:
         kwargs["scraper"] = self
@@ -667,7 +737,7 @@ class FacebookScraper:
                 except:
                     pass
             if ld_json:
-                meta = demjson.decode(ld_json)
+                meta = js_decoder.decode(ld_json, "ld_json")
                 result.update(meta["author"])
                 result["type"] = result.pop("@type")
                 for interaction in meta.get("interactionStatistic", []):
@@ -842,8 +912,15 @@ class FacebookScraper:
         self.set_user_agent(
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_12_6) AppleWebKit/603.3.8 (KHTML, like Gecko) Version/10.1.2 Safari/603.3.8"
         )
+        self._use_checkpoint(kwargs)
         iter_pages_fn = partial(iter_group_pages, group=group, request_fn=self.get, **kwargs)
-        return self._generic_get_posts(extract_group_post, iter_pages_fn, **kwargs)
+        return self._generic_get_posts(
+            extract_group_post,
+            iter_pages_fn,
+            seen_key=str(group),
+            post_id_fn=extract_post_id,
+            **kwargs,
+        )
 
     def check_locale(self, response):
         if self.have_checked_locale:
@@ -858,94 +935,198 @@ class FacebookScraper:
             self.have_checked_locale = True
 
     def get(self, url, **kwargs):
+        if self.identities is not None:
+            self.request_count += 1
+            return self.identities.get(url, **kwargs)
         try:
             self.request_count += 1
             url = str(url)
             if not url.startswith("http"):
                 url = utils.urljoin(FB_MOBILE_BASE_URL, url)
 
-            if kwargs.get("post"):
-                kwargs.pop("post")
-                response = self.session.post(url=url, **kwargs)
+            # Only plain GET requests are cached, not POSTs or requests with custom headers
+            cacheable = not kwargs
+            response = self.get_cached_response(url) if cacheable else None
+            from_cache = response is not None
+            if from_cache:
+                cacheable = False
             else:
-                response = self.session.get(url=url, **self.requests_kwargs, **kwargs)
+                response = self.send(url, **kwargs)
             DEBUG = False
             if DEBUG:
                 for filename in os.listdir("."):
                     if filename.endswith(".html") and filename.replace(".html", "") in url:
                         logger.debug(f"Replacing {url} content with {filename}")
-                        with open(filename) as f:
-                            response.html.html = f.read()
-            response.html.html = response.html.html.replace('<!--', '').replace('-->', '')
-            response.raise_for_status()
-            self.check_locale(response)
-
-            # Special handling for video posts that redirect to /watch/
-            if response.url == "https://m.facebook.com/watch/?ref=watch_permalink":
-                post_url = re.search("\d+", url).group()
-                if post_url:
-                    url = utils.urljoin(
-                        FB_MOBILE_BASE_URL,
-                        f"story.php?story_fbid={post_url}&id=1&m_entstream_source=timeline",
-                    )
-                    post = {"original_request_url": post_url, "post_url": url}
-                    logger.debug(f"Requesting page from: {url}")
-                    response = self.get(url)
-            if "/watch/" in response.url:
-                video_id = parse_qs(urlparse(response.url).query).get("v")[0]
-                url = f"story.php?story_fbid={video_id}&id={video_id}&m_entstream_source=video_home&player_suborigin=entry_point&player_format=permalink"
-                logger.debug(f"Fetching {url}")
-                response = self.get(url)
-
-            if "cookie/consent-page" in response.url:
+                        with open(filename, "rb") as f:
+                            response._content = f.read()
+            self.prepare_response(response)
+
+            redirect_url = self.get_redirect_url(url, response)
+            if redirect_url:
+                logger.debug(f"Requesting page from: {redirect_url}")
+                response = self.get(redirect_url)
+
+            consent = "cookie/consent-page" in response.url
+            if consent:
                 response = self.submit_form(response)
-            if (
-                response.url.startswith(FB_MOBILE_BASE_URL)
-                and not response.html.find("script", first=True)
-                and "script" not in response.html.html
-                and self.session.cookies.get("noscript") != "1"
-            ):
-                warnings.warn(
-                    f"Facebook served mbasic/noscript content unexpectedly on {response.url}"
-                )
-            if response.html.find("h1,h2", containing="Unsupported Browser"):
-                warnings.warn(f"Facebook says 'Unsupported Browser'")
-            title = response.html.find("title", first=True)
-            not_found_titles = ["page not found", "content not found"]
-            temp_ban_titles = [
-                "you can't use this feature at the moment",
-                "you can't use this feature right now",
-                "you’re temporarily blocked",
-            ]
-            if "checkpoint" in response.url:
-                if response.html.find("h1", containing="We suspended your account"):
-                    raise exceptions.AccountDisabled("Your Account Has Been Disabled")
-            if title:
-                if title.text.lower() in not_found_titles:
-                    raise exceptions.NotFound(title.text)
-                elif title.text.lower() == "error":
-                    raise exceptions.UnexpectedResponse("Your request couldn't be processed")
-                elif title.text.lower() in temp_ban_titles:
-                    raise exceptions.TemporarilyBanned(title.text)
-                elif ">your account has been disabled<" in response.html.html.lower():
-                    raise exceptions.AccountDisabled("Your Account Has Been Disabled")
-                elif (
-                    ">We saw unusual activity on your account. This may mean that someone has used your account without your knowledge.<"
-                    in response.html.html
-                ):
-                    raise exceptions.AccountDisabled("Your Account Has Been Locked")
-                elif (
-                    title.text == "Log in to Facebook | Facebook"
-                    or response.url.startswith(utils.urljoin(FB_MOBILE_BASE_URL, "login"))
-                    or response.url.startswith(utils.urljoin(FB_W3_BASE_URL, "login"))
-                ):
-                    raise exceptions.LoginRequired(
-                        "A login (cookies) is required to see this page"
-                    )
+            # Responses are parsed when they're first searched, which is here
+            with timed(self.timings, "check"):
+                self.check_response(response)
+            if self.rate_limiter is not None and not from_cache:
+                self.rate_limiter.speed_up(url)
+            if cacheable and not consent:
+                self.cache_response(url, response)
             return response
         except RequestException as ex:
             logger.exception("Exception while requesting URL: %s\nException: %r", url, ex)
             raise
+        except (exceptions.TemporarilyBanned, exceptions.UnexpectedResponse):
+            # Error pages and temporary bans are how Facebook says it's getting too many requests
+            self.slow_down(url)
+            raise
+
+    def send(self, url, post=False, **kwargs):
+        """Send a request, retrying it as set by the retry policy when it fails with a
+        transient error"""
+        started = time.monotonic()
+        for attempt in itertools.count(1):
+            with timed(self.timings, "throttle"):
+                self.throttle(url)
+            try:
+                sent = time.perf_counter()
+                if post:
+                    response = self.session.post(url=url, **kwargs)
+                else:
+                    response = self.session.get(url=url, **self.requests_kwargs, **kwargs)
+                if self.timings is not None:
+                    self.timings.add("request.ttfb", response.elapsed.total_seconds())
+                    self.timings.add(
+                        "request", time.perf_counter() - sent, len(response.content)
+                    )
+                response.raise_for_status()
+                return response
+            except RequestException as ex:
+                if ex.response is not None and (
+                    ex.response.status_code >= 500 or ex.response.status_code == 429
+                ):
+                    self.slow_down(url)
+                delay = None
+                if self.retry_policy is not None:
+                    delay = self.retry_policy.get_delay(attempt, ex, started)
+                if delay is None:
+                    raise
+                logger.warning(
+                    "Retrying %s in %.1fs after attempt %s failed: %r", url, delay, attempt, ex
+                )
+                time.sleep(delay)
+
+    def throttle(self, url):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(url)
+
+    def slow_down(self, url):
+        if self.rate_limiter is not None:
+            self.rate_limiter.slow_down(url)
+
+    def cache_identity(self) -> str:
+        """Facebook serves different pages per account, and per noscript and User-Agent"""
+        return "|".join(
+            [
+                self.session.cookies.get("c_user") or "",
+                self.session.cookies.get("noscript") or "",
+                self.session.headers.get("User-Agent", ""),
+            ]
+        )
+
+    def get_cached_response(self, url):
+        if self.cache is None:
+            return None
+        cached = self.cache.get(url, self.cache_identity())
+        if cached is None:
+            return None
+        response_url, status_code, content_type, content = cached
+        return utils.make_response(
+            self.session, response_url, status_code, {"Content-Type": content_type}, content
+        )
+
+    def cache_response(self, url, response):
+        """Store a response that passed `check_response`, so bans and errors are never cached"""
+        if self.cache is None or response.status_code != 200:
+            return
+        self.cache.set(
+            url,
+            self.cache_identity(),
+            response.url,
+            response.status_code,
+            response.headers.get("Content-Type", ""),
+            response.content,
+        )
+
+    def prepare_response(self, response):
+        response._html = utils.response_html(response)
+        response.raise_for_status()
+        self.check_locale(response)
+
+    def get_redirect_url(self, url, response):
+        """Video posts redirect to /watch/, find the story URL to request instead"""
+        if response.url == "https://m.facebook.com/watch/?ref=watch_permalink":
+            post_url = re.search("\d+", url).group()
+            if post_url:
+                return utils.urljoin(
+                    FB_MOBILE_BASE_URL,
+                    f"story.php?story_fbid={post_url}&id=1&m_entstream_source=timeline",
+                )
+        if "/watch/" in response.url:
+            video_id = parse_qs(urlparse(response.url).query).get("v")[0]
+            return f"story.php?story_fbid={video_id}&id={video_id}&m_entstream_source=video_home&player_suborigin=entry_point&player_format=permalink"
+        return None
+
+    def check_response(self, response):
+        """Raise the matching exception if Facebook served an error, ban or login page"""
+        html = response.html
+        if (
+            response.url.startswith(FB_MOBILE_BASE_URL)
+            and not html.find("script", first=True)
+            and "script" not in html.html
+            and self.session.cookies.get("noscript") != "1"
+        ):
+            warnings.warn(
+                f"Facebook served mbasic/noscript content unexpectedly on {response.url}"
+            )
+        if utils.find_containing(html, "h1,h2", "Unsupported Browser"):
+            warnings.warn(f"Facebook says 'Unsupported Browser'")
+        title = html.find("title", first=True)
+        title_text = title.text if title else None
+        not_found_titles = ["page not found", "content not found"]
+        temp_ban_titles = [
+            "you can't use this feature at the moment",
+            "you can't use this feature right now",
+            "you’re temporarily blocked",
+        ]
+        if "checkpoint" in response.url:
+            if utils.find_containing(html, "h1", "We suspended your account"):
+                raise exceptions.AccountDisabled("Your Account Has Been Disabled")
+        if title:
+            page = html.html
+            if title_text.lower() in not_found_titles:
+                raise exceptions.NotFound(title_text)
+            elif title_text.lower() == "error":
+                raise exceptions.UnexpectedResponse("Your request couldn't be processed")
+            elif title_text.lower() in temp_ban_titles:
+                raise exceptions.TemporarilyBanned(title_text)
+            elif ">your account has been disabled<" in page.lower():
+                raise exceptions.AccountDisabled("Your Account Has Been Disabled")
+            elif (
+                ">We saw unusual activity on your account. This may mean that someone has used your account without your knowledge.<"
+                in page
+            ):
+                raise exceptions.AccountDisabled("Your Account Has Been Locked")
+            elif (
+                title_text == "Log in to Facebook | Facebook"
+                or response.url.startswith(utils.urljoin(FB_MOBILE_BASE_URL, "login"))
+                or response.url.startswith(utils.urljoin(FB_W3_BASE_URL, "login"))
+            ):
+                raise exceptions.LoginRequired("A login (cookies) is required to see this page")
 
     def submit_form(self, response, extra_data={}):
         action = response.html.find("form", first=True).attrs.get('action')
@@ -1006,6 +1187,24 @@ class FacebookScraper:
         except exceptions.LoginRequired:
             return False
 
+    @staticmethod
+    def _use_checkpoint(kwargs):
+        """Resume the crawl from the `checkpoint` in kwargs, a `Checkpoint` or the path of one,
+        and record the timeline pages it goes through"""
+        checkpoint = kwargs.get("checkpoint")
+        if checkpoint is None:
+            return
+        if isinstance(checkpoint, (str, os.PathLike)):
+            checkpoint = kwargs["checkpoint"] = Checkpoint.load(checkpoint)
+        if checkpoint.page_url and not kwargs.get("start_url"):
+            kwargs["start_url"] = checkpoint.page_url
+        options = checkpoint.use_options(kwargs.get("options"))
+        if options is not None:
+            kwargs["options"] = options
+        kwargs["request_url_callback"] = checkpoint.page_callback(
+            kwargs.get("request_url_callback")
+        )
+
     def _generic_get_posts(
         self,
         extract_post_fn,
@@ -1015,6 +1214,11 @@ class FacebookScraper:
         remove_source=True,
         latest_date=None,
         max_past_limit=5,
+        seen_key=None,
+        post_id_fn=None,
+        max_known_posts=5,
+        checkpoint=None,
+        after_flush=None,
         **kwargs,
     ):
 
@@ -1025,6 +1229,8 @@ class FacebookScraper:
             options = {k: True for k in options}
         if self.session.cookies.get("noscript") == "1":
             options["noscript"] = True
+        if self.timings is not None:
+            options.setdefault("timings", self.timings)
 
         if page_limit and page_limit <= 2:
             warnings.warn(
@@ -1032,93 +1238,157 @@ class FacebookScraper:
                 stacklevel=3,
             )
 
-        # if latest_date is specified, iterate until the date is reached n times in a row (recurrent_past_posts)
-        if latest_date is not None:
-
-            # Pinned posts repeat themselves over time, so ignore them
-            pinned_posts = []
-
-            # Stats
-            null_date_posts = 0
-            total_scraped_posts = 0
-
-            # Helpers
-            recurrent_past_posts = 0
-            show_every = 50
-            done = False
-
-            for page in iter_pages_fn():
-
-                for post_element in page:
-                    try:
-                        post = extract_post_fn(post_element, options=options, request_fn=self.get)
-
-                        if remove_source:
-                            post.pop("source", None)
-
-                        # date is None, no way to check latest_date, yield it
-                        if post["time"] is None:
-                            null_date_posts += 1
-
-                        # date is above latest_date, yield it
-                        if post["time"] > latest_date:
-                            recurrent_past_posts = 0
-
-                        # if any of above, yield the post and continue
-                        if post["time"] is None or post["time"] > latest_date:
-                            total_scraped_posts += 1
-                            if total_scraped_posts % show_every == 0:
-                                logger.info("Posts scraped: %s", total_scraped_posts)
+        if checkpoint is not None:
+            if checkpoint.finished:
+                logger.info("The checkpoint is of a finished crawl, nothing to resume")
+                return
+            iter_pages_fn = partial(checkpoint.resume_pages, iter_pages_fn())
 
-                            yield post
-                            continue
+        # In incremental mode, posts that were already scraped are skipped before extracting them
+        seen_posts = self.seen_posts if seen_key is not None else None
+        if seen_posts is not None:
+            iter_pages_fn = partial(
+                seen_posts.skip_known, iter_pages_fn(), seen_key, post_id_fn, max_known_posts
+            )
 
-                        # else, the date is behind the date limit
-                        recurrent_past_posts += 1
+        def post_options(post_element):
+            # Interrupted posts resume their comments and reactors from the checkpoint
+            if checkpoint is None or post_id_fn is None:
+                return options
+            return checkpoint.post_options(options, post_id_fn(post_element))
+
+        def post_yielded():
+            if checkpoint is not None:
+                checkpoint.post_yielded()
+
+        def mark_done(post):
+            if seen_posts is not None and post.get("post_id"):
+                seen_posts.add(seen_key, post["post_id"])
+            if checkpoint is not None:
+                checkpoint.post_done(post)
+
+        def post_done(post):
+            # Posts written to a sink are only done once the sink has flushed them
+            if after_flush is None:
+                mark_done(post)
+            else:
+                after_flush(partial(mark_done, post))
 
-                        # and it has reached the max_past_limit posts
-                        if recurrent_past_posts >= max_past_limit:
-                            done = True
-                            logger.info(
-                                "Sequential posts behind latest_date reached. Stopping scraping."
-                            )
-                            logger.info(
-                                "Posts with null date: %s",
-                                null_date_posts,
-                            )
-                            break
-
-                        # or the text is not banned (repeated)
-                        if post["text"] is not None and post["text"] not in pinned_posts:
-                            pinned_posts.append(post["text"])
-                            logger.warning(
-                                "Sequential post #%s behind the date limit: %s. Ignored (in logs) from now on.",
-                                recurrent_past_posts,
-                                post["time"],
+        # Photo pages are fetched by one pool of workers for the whole crawl
+        executor = ThreadPoolExecutor(
+            max_workers=options.get("photo_workers", 4), thread_name_prefix="photos"
+        )
+        options = dict(options, photo_executor=executor)
+        # Relative dates are parsed from the day the crawl started
+        options.setdefault("relative_base", utils.start_of_today())
+        try:
+            # if latest_date is specified, iterate until the date is reached n times in a row
+            # (recurrent_past_posts)
+            if latest_date is not None:
+
+                # The time and text of each post are needed to know when to stop
+                if options.get("fields") is not None:
+                    options["fields"] = set(options["fields"]) | {"time", "text"}
+
+                # Pinned posts repeat themselves over time, so ignore them
+                pinned_posts = []
+
+                # Stats
+                null_date_posts = 0
+                total_scraped_posts = 0
+
+                # Helpers
+                recurrent_past_posts = 0
+                show_every = 50
+                done = False
+
+                for page in iter_pages_fn():
+
+                    for post_element in page:
+                        try:
+                            post = extract_post_fn(
+                                post_element,
+                                options=post_options(post_element),
+                                request_fn=self.get,
                             )
 
-                    except Exception as e:
-                        logger.exception(
-                            "An exception has occured during scraping: %s. Omitting the post...",
-                            e,
-                        )
+                            if remove_source:
+                                post.pop("source", None)
+
+                            # date is None, no way to check latest_date, yield it
+                            if post["time"] is None:
+                                null_date_posts += 1
+
+                            # date is above latest_date, yield it
+                            if post["time"] > latest_date:
+                                recurrent_past_posts = 0
+
+                            # if any of above, yield the post and continue
+                            if post["time"] is None or post["time"] > latest_date:
+                                total_scraped_posts += 1
+                                if total_scraped_posts % show_every == 0:
+                                    logger.info("Posts scraped: %s", total_scraped_posts)
+
+                                post_yielded()
+                                yield post
+                                post_done(post)
+                                continue
+
+                            # else, the date is behind the date limit
+                            recurrent_past_posts += 1
+
+                            # and it has reached the max_past_limit posts
+                            if recurrent_past_posts >= max_past_limit:
+                                done = True
+                                logger.info(
+                                    "Sequential posts behind latest_date reached. "
+                                    "Stopping scraping."
+                                )
+                                logger.info(
+                                    "Posts with null date: %s",
+                                    null_date_posts,
+                                )
+                                break
+
+                            # or the text is not banned (repeated)
+                            if post["text"] is not None and post["text"] not in pinned_posts:
+                                pinned_posts.append(post["text"])
+                                logger.warning(
+                                    "Sequential post #%s behind the date limit: %s. "
+                                    "Ignored (in logs) from now on.",
+                                    recurrent_past_posts,
+                                    post["time"],
+                                )
+
+                        except Exception as e:
+                            logger.exception(
+                                "An exception has occured during scraping: %s. "
+                                "Omitting the post...",
+                                e,
+                            )
 
-                # if max_past_limit, stop
-                if done:
-                    break
+                    # if max_past_limit, stop
+                    if done:
+                        break
 
-        # else, iterate over pages as usual
-        else:
-            counter = itertools.count(0) if page_limit is None else range(page_limit)
-
-            logger.debug("Starting to iterate pages")
-            for i, page in zip(counter, iter_pages_fn()):
-                logger.debug("Extracting posts from page %s", i)
-                for post_element in page:
-                    post = extract_post_fn(post_element, options=options, request_fn=self.get)
-                    if remove_source:
-                        post.pop('source', None)
-                    yield post
+            # else, iterate over pages as usual
+            else:
+                counter = itertools.count(0) if page_limit is None else range(page_limit)
+
+                logger.debug("Starting to iterate pages")
+                for i, page in zip(counter, iter_pages_fn()):
+                    logger.debug("Extracting posts from page %s", i)
+                    for post_element in page:
+                        post = extract_post_fn(
+                            post_element, options=post_options(post_element), request_fn=self.get
+                        )
+                        if remove_source:
+                            post.pop('source', None)
+                        post_yielded()
+                        yield post
+                        post_done(post)
+        finally:
+            executor.shutdown(wait=False)
 
     def get_groups_by_search(self, word: str, **kwargs):
         group_search_url = utils.urljoin(FB_MOBILE_BASE_URL, f"search/groups/?q={word}")
@@ -1,15 +1,169 @@
-from typing import Any, Callable, Dict, Iterable, Tuple
+import itertools
+from collections.abc import MutableMapping
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Tuple
 
 from requests import Response
-from requests_html import Element
+
+if TYPE_CHECKING:
+    # requests_html is slow to import, and only needed once a page is requested
+    from requests_html import Element
 
 
 URL = str
 Options = Dict[str, Any]
-Post = Dict[str, Any]
 Profile = Dict[str, Any]
 RequestFunction = Callable[[URL], Response]
-RawPage = Element
-RawPost = Element
+RawPage = "Element"
+RawPost = "Element"
 Page = Iterable[RawPost]
 Credentials = Tuple[str, str]
+
+
+_missing = object()
+
+
+class Post(MutableMapping):
+    """A scraped post, which can be used like a dict.
+
+    The fields every post has are stored in slots rather than in a dict of their own, as most
+    of them stay `None`. Other fields set by the extractors are kept in a dict, in the order
+    they were set, like a dict would.
+    """
+
+    fields = (
+        'post_id',
+        'text',
+        'post_text',
+        'shared_text',
+        'original_text',
+        'time',
+        'timestamp',
+        'image',
+        'image_lowquality',
+        'images',
+        'images_description',
+        'images_lowquality',
+        'images_lowquality_description',
+        'video',
+        'video_duration_seconds',
+        'video_height',
+        'video_id',
+        'video_quality',
+        'video_size_MB',
+        'video_thumbnail',
+        'video_watches',
+        'video_width',
+        'likes',
+        'comments',
+        'shares',
+        'post_url',
+        'link',
+        'links',
+        'user_id',
+        'username',
+        'user_url',
+        'source',
+        'is_live',
+        'factcheck',
+        'shared_post_id',
+        'shared_time',
+        'shared_user_id',
+        'shared_username',
+        'shared_user_url',
+        'shared_post_url',
+        'available',
+        'comments_full',
+        'reactors',
+        'w3_fb_url',
+        'reactions',
+        'reaction_count',
+        'with',
+        'page_id',
+        'sharers',
+    )
+    __slots__ = fields + ('_extra',)
+    _field_set = frozenset(fields)
+
+    def __init__(self, *args, **kwargs):
+        for field in self.fields:
+            setattr(self, field, None)
+        self.is_live = False
+        self._extra = None
+        if args or kwargs:
+            self.update(*args, **kwargs)
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            value = getattr(self, key)
+            if value is not _missing:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._field_set:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._field_set and getattr(self, key) is not _missing:
+            setattr(self, key, _missing)
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for field in self.fields:
+            if getattr(self, field) is not _missing:
+                yield field
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def update(self, other=(), **kwargs):
+        # Extractors return dicts of fields, which are written straight into the slots
+        if isinstance(other, dict):
+            other = other.items()
+        elif hasattr(other, 'keys'):
+            other = ((key, other[key]) for key in other.keys())
+        for key, value in itertools.chain(other, kwargs.items()):
+            self[key] = value
+
+    def copy(self) -> 'Post':
+        return _unpickle_post(dict(self))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __reduce__(self):
+        # Fields removed with pop or del must stay removed in the copy
+        return _unpickle_post, (dict(self),)
+
+
+def _unpickle_post(items: Dict[str, Any]) -> Post:
+    post = Post.__new__(Post)
+    for field in Post.fields:
+        setattr(post, field, _missing)
+    post._extra = None
+    post.update(items)
+    return post
+
+
+def json_default(value: Any) -> Any:
+    """`default` for `json.dumps`, writing posts as objects and other values as strings.
+
+    `Post` isn't a `dict` subclass, so `json.dumps(post)` raises a `TypeError`, and
+    `json.dumps(post, default=str)` would write the post as a single string"""
+    if isinstance(value, Post):
+        return dict(value)
+    return str(value)
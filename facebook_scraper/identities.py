@@ -0,0 +1,180 @@
+import itertools
+import logging
+import threading
+import time
+from typing import Iterable, List, Optional, Union
+
+from requests.cookies import RequestsCookieJar, cookiejar_from_dict
+
+from . import exceptions, utils
+from .facebook_scraper import FacebookScraper
+
+
+logger = logging.getLogger(__name__)
+
+
+class Identity:
+    """A session with its own cookies, proxy and user agent, to request pages as.
+
+    Args:
+        cookies: A cookie jar, a dict, or the path of a cookies file. Leave out for an anonymous
+            identity.
+        proxy: Proxy URL to send the requests of this identity through.
+        user_agent: User agent of this identity.
+        name: Name used in logs and stats, defaults to the account id or the proxy.
+        requests_kwargs: Extra arguments for requests, like a timeout.
+        rate_limiter: A `RateLimiter` for the requests of this identity only.
+    """
+
+    _counter = itertools.count(1)
+
+    def __init__(
+        self,
+        cookies: Union[RequestsCookieJar, dict, str, None] = None,
+        proxy: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        name: Optional[str] = None,
+        requests_kwargs: Optional[dict] = None,
+        rate_limiter=None,
+    ):
+        self.scraper = FacebookScraper(requests_kwargs=dict(requests_kwargs or {}))
+        if isinstance(cookies, str):
+            cookies = utils.parse_cookie_file(cookies)
+        elif isinstance(cookies, dict):
+            cookies = cookiejar_from_dict(cookies)
+        if cookies is not None:
+            self.scraper.session.cookies.update(cookies)
+        if proxy:
+            self.scraper.requests_kwargs['proxies'] = {'http': proxy, 'https': proxy}
+        if user_agent:
+            self.scraper.set_user_agent(user_agent)
+        self.scraper.set_rate_limiter(rate_limiter)
+
+        self.name = (
+            name
+            or self.scraper.session.cookies.get("c_user")
+            or proxy
+            or f"identity-{next(self._counter)}"
+        )
+        # Between 0 and 1, halved on each ban and raised on each successful request
+        self.score = 1.0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.quarantined_until = 0.0
+        self.last_used = 0.0
+
+    def __repr__(self):
+        return f"<Identity {self.name}>"
+
+    def is_available(self, now: float) -> bool:
+        return self.quarantined_until <= now
+
+
+class IdentityPool:
+    """Spreads the requests of a `FacebookScraper` over several identities.
+
+    Each request is sent with the identity that has been idle the longest, weighted by its
+    health score, among the identities that aren't in quarantine. An identity that gets
+    banned, disabled or logged out is quarantined for `cooldown` seconds, doubled for each
+    consecutive failure, and the request is retried with another identity, up to
+    `max_attempts` times, and no more than once per identity that isn't in quarantine. When
+    every identity is in quarantine, new requests wait for the first one to come back.
+    """
+
+    quarantine_exceptions = (
+        exceptions.TemporarilyBanned,
+        exceptions.AccountDisabled,
+        exceptions.LoginRequired,
+    )
+
+    def __init__(
+        self,
+        identities: Iterable[Identity],
+        cooldown: float = 15 * 60,
+        max_cooldown: float = 24 * 3600,
+        max_attempts: Optional[int] = None,
+    ):
+        self.identities: List[Identity] = list(identities)
+        if not self.identities:
+            raise ValueError("An IdentityPool needs at least one identity")
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_attempts = max_attempts or len(self.identities)
+
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return iter(self.identities)
+
+    def __len__(self):
+        return len(self.identities)
+
+    def any_available(self) -> bool:
+        with self._lock:
+            now = time.time()
+            return any(identity.is_available(now) for identity in self.identities)
+
+    def acquire(self) -> Identity:
+        """Take the next identity to use, waiting if they're all in quarantine"""
+        while True:
+            with self._lock:
+                now = time.time()
+                available = [
+                    identity for identity in self.identities if identity.is_available(now)
+                ]
+                if available:
+                    # Identities that were banned recently are used less often
+                    identity = max(available, key=lambda i: (now - i.last_used) * i.score)
+                    identity.last_used = now
+                    identity.requests += 1
+                    return identity
+                wait = min(identity.quarantined_until for identity in self.identities) - now
+            logger.warning("All identities are in quarantine, waiting %.0fs", wait)
+            time.sleep(wait)
+
+    def report_success(self, identity: Identity):
+        with self._lock:
+            identity.consecutive_failures = 0
+            identity.score = min(1.0, identity.score + 0.1)
+
+    def quarantine(self, identity: Identity, reason: Exception):
+        with self._lock:
+            identity.failures += 1
+            identity.consecutive_failures += 1
+            identity.score /= 2
+            duration = min(
+                self.max_cooldown, self.cooldown * 2 ** (identity.consecutive_failures - 1)
+            )
+            identity.quarantined_until = time.time() + duration
+        logger.warning(
+            "Quarantining identity %s for %.0fs after %r", identity.name, duration, reason
+        )
+
+    def get(self, url, **kwargs):
+        for attempt in range(1, self.max_attempts + 1):
+            identity = self.acquire()
+            try:
+                response = identity.scraper.get(url, **kwargs)
+            except self.quarantine_exceptions as ex:
+                self.quarantine(identity, ex)
+                # A page failing for every identity, like a login wall, doesn't wait for them
+                # to come out of quarantine
+                if attempt == self.max_attempts or not self.any_available():
+                    raise
+                continue
+            self.report_success(identity)
+            return response
+
+    def stats(self) -> List[dict]:
+        now = time.time()
+        return [
+            {
+                "name": identity.name,
+                "score": identity.score,
+                "requests": identity.requests,
+                "failures": identity.failures,
+                "quarantined_for": max(0.0, identity.quarantined_until - now),
+            }
+            for identity in self.identities
+        ]
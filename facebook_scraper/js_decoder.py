@@ -0,0 +1,142 @@
+import json
+import logging
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict
+
+
+logger = logging.getLogger(__name__)
+
+
+# Ways a document can be decoded, from fastest to slowest
+PATHS = ("json", "tokenizer", "demjson", "failed")
+
+_json = json.JSONDecoder(strict=False)
+
+# Strings, numbers, keys and trailing commas of a JS literal. Strings and numbers are matched
+# first, so nothing inside them is taken for a key
+_token_regex = re.compile(
+    r"""
+    (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+    | (?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+    | (?P<key>[A-Za-z_$][\w$]*)(?=\s*:)
+    | (?P<comma>,)(?=\s*[}\]])
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+# Escapes that JS strings allow but JSON strings don't, and quotes to escape for JSON
+_escape_regex = re.compile(r"""\\(?:x([0-9a-fA-F]{2})|(.))|(")""", re.DOTALL)
+_needs_escaping_regex = re.compile(r"""\\[^"\\/bfnrtu]""")
+_escapes = {"'": "'", "v": "\\u000b", "0": "\\u0000", "\n": "", "\r": ""}
+
+
+class JSDecodeError(ValueError):
+    pass
+
+
+def _fix_escape(match) -> str:
+    hex_code, char, quote = match.groups()
+    if quote:
+        return '\\"'
+    if hex_code:
+        return "\\u00" + hex_code
+    if char in '"\\/bfnrtu':
+        return "\\" + char
+    # Like JS, unknown escapes are the character itself
+    return _escapes.get(char, char)
+
+
+def _json_string(token: str) -> str:
+    body = token[1:-1]
+    if token[0] == '"' and not _needs_escaping_regex.search(body):
+        return token
+    return '"' + _escape_regex.sub(_fix_escape, body) + '"'
+
+
+def _json_token(match) -> str:
+    kind = match.lastgroup
+    if kind == "string":
+        return _json_string(match.group())
+    if kind == "key":
+        return '"' + match.group() + '"'
+    if kind == "comma":
+        return ""
+    return match.group()
+
+
+def js_to_json(text: str) -> str:
+    """Rewrite the JS object literals Facebook sends as JSON: unquoted keys are quoted, single
+    quoted strings and JS escapes are converted, and trailing commas are removed. Anything else
+    that isn't JSON, like `undefined` or comments, is left as is"""
+    return _token_regex.sub(_json_token, text)
+
+
+class JSDecoder:
+    """Decodes the JS objects found in Facebook pages, like the `data-ft` and `data-store`
+    attributes and the payloads of JS modules.
+
+    The C JSON parser is tried first, then the document is rewritten as JSON by `js_to_json`,
+    and only if that fails too is it decoded by demjson, which handles any JS literal but is
+    much slower. How many documents took each path is counted by call site.
+    """
+
+    def __init__(self):
+        self.counters: Dict[str, Counter] = defaultdict(Counter)
+
+        # Extractors decode from worker threads
+        self._lock = threading.Lock()
+
+    def decode(self, text: str, site: str = "other") -> Any:
+        path, value, error = "json", None, None
+        try:
+            value = _json.decode(text)
+        except ValueError:
+            path = "tokenizer"
+            try:
+                value = _json.decode(js_to_json(text))
+            except ValueError:
+                path = "demjson"
+                try:
+                    value = self._demjson_decode(text)
+                except ValueError as ex:
+                    path, error = "failed", ex
+        with self._lock:
+            self.counters[site][path] += 1
+        if error is not None:
+            raise JSDecodeError(f"Can't decode {text[:100]!r}: {error}") from error
+        if path == "demjson":
+            logger.debug("Decoded %s with demjson: %r", site, text[:100])
+        return value
+
+    def _demjson_decode(self, text: str) -> Any:
+        import demjson3
+
+        try:
+            return demjson3.decode(text)
+        except demjson3.JSONDecodeError as ex:
+            raise ValueError(str(ex)) from ex
+
+    def reset(self):
+        with self._lock:
+            self.counters = defaultdict(Counter)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """How many documents took each path, by call site"""
+        with self._lock:
+            return {
+                site: {path: counter[path] for path in PATHS}
+                for site, counter in sorted(self.counters.items())
+            }
+
+
+decoder = JSDecoder()
+
+
+def decode(text: str, site: str = "other") -> Any:
+    """Decode a JS object literal with the shared `JSDecoder`"""
+    return decoder.decode(text, site)
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    return decoder.stats()
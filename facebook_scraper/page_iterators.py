@@ -1,17 +1,19 @@
 import json
 import logging
+import queue
 import re
 import textwrap
+import threading
 from typing import Iterator, Optional, Union
-import time
 
 from requests.exceptions import HTTPError
 import warnings
 
 from . import utils
-from .constants import FB_MOBILE_BASE_URL, FB_MBASIC_BASE_URL
+from .constants import DEFAULT_PAGE_LIMIT, FB_MOBILE_BASE_URL, FB_MBASIC_BASE_URL
 
 from .fb_types import URL, Page, RawPage, RequestFunction, Response
+from .timings import timed
 from . import exceptions
 
 
@@ -71,53 +73,152 @@ def iter_photos(account: str, request_fn: RequestFunction, **kwargs) -> Iterator
 def generic_iter_pages(
     start_url, page_parser_cls, request_fn: RequestFunction, **kwargs
 ) -> Iterator[Page]:
+    prefetch_pages = kwargs.get("options", {}).get("prefetch_pages")
+    if prefetch_pages:
+        yield from prefetch_iter_pages(
+            start_url, page_parser_cls, request_fn, prefetch_pages, **kwargs
+        )
+        return
+
     next_url = start_url
 
-    base_url = kwargs.get('base_url', FB_MOBILE_BASE_URL)
     request_url_callback = kwargs.get('request_url_callback')
     while next_url:
         # Execute callback of starting a new URL request
         if request_url_callback:
             request_url_callback(next_url)
 
-        RETRY_LIMIT = 6
-        for retry in range(1, RETRY_LIMIT + 1):
-            try:
-                logger.debug("Requesting page from: %s", next_url)
-                response = request_fn(next_url)
-                break
-            except HTTPError as e:
-                if e.response.status_code == 500 and retry < RETRY_LIMIT:
-                    sleep_duration = retry * 2
-                    logger.debug(
-                        f"Caught exception, retry number {retry}. Sleeping for {sleep_duration}s"
-                    )
-                    if retry == (RETRY_LIMIT / 2):
-                        logger.debug("Requesting noscript")
-                        kwargs["scraper"].set_noscript(True)
-                    time.sleep(sleep_duration)
-                else:
-                    raise
-
-        logger.debug("Parsing page response")
-        parser = page_parser_cls(response)
-
+        parser = fetch_page(next_url, page_parser_cls, request_fn, **kwargs)
         page = parser.get_page()
 
         # TODO: If page is actually an iterable calling len(page) might consume it
         logger.debug("Got %s raw posts from page", len(page))
         yield page
 
-        logger.debug("Looking for next page URL")
-        next_page = parser.get_next_page()
-        if next_page:
-            posts_per_page = kwargs.get("options", {}).get("posts_per_page")
-            if posts_per_page:
-                next_page = next_page.replace("num_to_fetch=4", f"num_to_fetch={posts_per_page}")
-            next_url = utils.urljoin(base_url, next_page)
-        else:
-            logger.info("Page parser did not find next page URL")
-            next_url = None
+        next_url = next_page_url(parser, **kwargs)
+
+
+def prefetch_iter_pages(
+    start_url, page_parser_cls, request_fn: RequestFunction, prefetch_pages: int, **kwargs
+) -> Iterator[Page]:
+    """Like `generic_iter_pages`, but requests up to `prefetch_pages` pages ahead of the one
+    being consumed in a background thread, as soon as their URL is known.
+
+    The background thread requests pages with the session of the scraper, which the
+    extractors are using at the same time. It never changes the session: when a page keeps
+    failing with HTTP 500, the switch to noscript is made here, once the pages before it were
+    consumed, and the rest of the pages are prefetched again from that one"""
+    pages = queue.Queue(maxsize=prefetch_pages)
+    stopped = threading.Event()
+    # Don't fetch pages that `_generic_get_posts` won't consume
+    page_limit = None
+    if kwargs.get("latest_date") is None:
+        page_limit = kwargs.get("page_limit", DEFAULT_PAGE_LIMIT)
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetch_pages():
+        next_url = start_url
+        fetched = 0
+        try:
+            while next_url and (page_limit is None or fetched < page_limit):
+                parser = fetch_page(
+                    next_url, page_parser_cls, request_fn, **dict(kwargs, scraper=None)
+                )
+                page = parser.get_page()
+                fetched += 1
+                if not put((next_url, page, None)):
+                    return
+                next_url = next_page_url(parser, **kwargs)
+        except Exception as e:
+            put((next_url, None, e))
+            return
+        put(None)
+
+    thread = threading.Thread(target=fetch_pages, name="prefetch_pages", daemon=True)
+    thread.start()
+
+    request_url_callback = kwargs.get('request_url_callback')
+    consumed = 0
+    try:
+        while True:
+            item = pages.get()
+            if item is None:
+                return
+            url, page, error = item
+            if error is not None:
+                scraper = kwargs.get("scraper")
+                if not use_noscript(error, scraper):
+                    raise error
+                logger.debug("Requesting noscript")
+                scraper.set_noscript(True)
+                if page_limit is not None:
+                    kwargs["page_limit"] = page_limit - consumed
+                yield from prefetch_iter_pages(
+                    url, page_parser_cls, request_fn, prefetch_pages, **kwargs
+                )
+                return
+            # The callback gets the URL of the page being consumed, not the one being fetched,
+            # so a resume starts from the first page that wasn't fully consumed
+            if request_url_callback:
+                request_url_callback(url)
+            logger.debug("Got %s raw posts from page", len(page))
+            yield page
+            consumed += 1
+    finally:
+        stopped.set()
+
+
+def use_noscript(error: Exception, scraper) -> bool:
+    """Whether a page should be requested again as noscript after `error`: Facebook keeps
+    failing with HTTP 500, and the scraper isn't using noscript yet"""
+    return (
+        isinstance(error, HTTPError)
+        and error.response.status_code == 500
+        and scraper is not None
+        and scraper.session.cookies.get("noscript") != "1"
+    )
+
+
+def fetch_page(url, page_parser_cls, request_fn: RequestFunction, **kwargs):
+    """Request and parse a single page. Transient errors are retried by the scraper's retry
+    policy, and if Facebook keeps failing with HTTP 500, the page is requested again as
+    noscript"""
+    logger.debug("Requesting page from: %s", url)
+    try:
+        response = request_fn(url)
+    except HTTPError as e:
+        scraper = kwargs.get("scraper")
+        if not use_noscript(e, scraper):
+            raise
+        logger.debug("Requesting noscript")
+        scraper.set_noscript(True)
+        response = request_fn(url)
+
+    logger.debug("Parsing page response")
+    with timed(kwargs.get("options", {}).get("timings"), "parse"):
+        return page_parser_cls(response)
+
+
+def next_page_url(parser, **kwargs) -> Optional[URL]:
+    """Returns the absolute URL of the page following the one `parser` parsed"""
+    logger.debug("Looking for next page URL")
+    next_page = parser.get_next_page()
+    if not next_page:
+        logger.info("Page parser did not find next page URL")
+        return None
+
+    posts_per_page = kwargs.get("options", {}).get("posts_per_page")
+    if posts_per_page:
+        next_page = next_page.replace("num_to_fetch=4", f"num_to_fetch={posts_per_page}")
+    return utils.urljoin(kwargs.get('base_url', FB_MOBILE_BASE_URL), next_page)
 
 
 class PageParser:
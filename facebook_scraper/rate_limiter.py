@@ -0,0 +1,122 @@
+import logging
+import re
+import threading
+import time
+from typing import List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# Kinds of pages with their own budget, as (name, URL pattern, requests per second, burst).
+# The first matching pattern is used, the last one matches every URL
+DEFAULT_RATE_LIMITS = [
+    ("www", r"^https?://(www\.)?facebook\.com/", 0.2, 1),
+    ("reactions", r"/ufi/reaction/profile/browser/", 0.5, 2),
+    ("photos", r"/photo\.php|/photos/|/photo/view_full_size/", 2, 8),
+    # Timeline pages, including the first page of an account (/{account}/) or a group
+    # (/groups/{id}/)
+    (
+        "timeline",
+        r"cursor=|/page_content|bacr=|^https?://[^/]+/(?:groups/)?[^/?]+/(?:\?|$)",
+        0.5,
+        2,
+    ),
+    ("permalinks", r"/story\.php|/permalink/|/posts/", 1, 4),
+    ("other", r"", 1, 4),
+]
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        # Fraction of the rate currently used, lowered when Facebook starts refusing requests
+        self.factor = 1.0
+
+    def reserve(self) -> float:
+        """Take a token, returning how many seconds to wait before it can be used"""
+        now = time.monotonic()
+        rate = self.rate * self.factor
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        # Tokens can go negative, so concurrent requests queue up behind each other
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0
+        return -self.tokens / rate
+
+
+class RateLimiter:
+    """Token bucket rate limiter used by `FacebookScraper.get`.
+
+    Each kind of page in `limits` has its own budget of requests per second, with bursts of up
+    to `burst` requests. When Facebook answers with an error, a server error or a temporary ban,
+    the rate for that kind of page is halved (down to `min_factor` of the configured rate), and
+    it goes back up by `recovery` of the configured rate with each healthy response.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[List[Tuple[str, str, float, int]]] = None,
+        min_factor: float = 1 / 16,
+        recovery: float = 0.05,
+    ):
+        if limits is None:
+            limits = DEFAULT_RATE_LIMITS
+        self.limits = [(name, re.compile(pattern)) for name, pattern, _, _ in limits]
+        self.buckets = {name: TokenBucket(rate, burst) for name, _, rate, burst in limits}
+        self.min_factor = min_factor
+        self.recovery = recovery
+        self.waited = 0.0
+        self.slowdowns = 0
+
+        # Extractors request pages from worker threads
+        self._lock = threading.Lock()
+
+    def endpoint(self, url: str) -> str:
+        for name, pattern in self.limits:
+            if pattern.search(url):
+                return name
+        return self.limits[-1][0]
+
+    def reserve(self, url: str) -> float:
+        """Reserve a request to `url`, returning how many seconds to wait before sending it"""
+        with self._lock:
+            delay = self.buckets[self.endpoint(url)].reserve()
+            self.waited += delay
+        return delay
+
+    def acquire(self, url: str):
+        """Wait until a request to `url` can be sent"""
+        delay = self.reserve(url)
+        if delay:
+            logger.debug("Waiting %.2fs before requesting %s", delay, url)
+            time.sleep(delay)
+
+    def slow_down(self, url: str):
+        endpoint = self.endpoint(url)
+        with self._lock:
+            bucket = self.buckets[endpoint]
+            bucket.factor = max(self.min_factor, bucket.factor / 2)
+            bucket.tokens = min(bucket.tokens, 0)
+            self.slowdowns += 1
+        logger.warning(
+            "Slowing down %s requests to %.3f per second",
+            endpoint,
+            bucket.rate * bucket.factor,
+        )
+
+    def speed_up(self, url: str):
+        with self._lock:
+            bucket = self.buckets[self.endpoint(url)]
+            bucket.factor = min(1.0, bucket.factor + self.recovery)
+
+    def stats(self) -> dict:
+        return {
+            "waited": self.waited,
+            "slowdowns": self.slowdowns,
+            "rates": {name: bucket.rate * bucket.factor for name, bucket in self.buckets.items()},
+        }
@@ -0,0 +1,93 @@
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Optional, Tuple, Type
+
+from requests import exceptions as requests_exceptions
+
+
+logger = logging.getLogger(__name__)
+
+
+# Exceptions worth retrying, with how many attempts a request gets in total when it fails with
+# them. The first matching rule is used. HTTP errors are only retried for `RETRY_STATUSES`
+DEFAULT_RETRY_RULES = [
+    (requests_exceptions.HTTPError, 5),
+    (requests_exceptions.Timeout, 3),
+    (requests_exceptions.ConnectionError, 5),
+    (requests_exceptions.ChunkedEncodingError, 3),
+]
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RetryPolicy:
+    """How `FacebookScraper.get` retries requests that failed with a transient error.
+
+    Requests are retried with exponential backoff: the n-th retry waits between half and all
+    of `base_delay * 2 ** (n - 1)` seconds, up to `max_delay`, or as long as the server asks
+    with a `Retry-After` header. A request gives up when it runs out of attempts for the
+    exception it failed with (see `rules`), or when the next attempt would start more than
+    `deadline` seconds after the first one.
+    """
+
+    def __init__(
+        self,
+        rules: Optional[List[Tuple[Type[Exception], int]]] = None,
+        statuses=RETRY_STATUSES,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        deadline: Optional[float] = 300.0,
+    ):
+        if rules is None:
+            rules = DEFAULT_RETRY_RULES
+        self.rules = rules
+        self.statuses = statuses
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retries = 0
+
+    def max_attempts(self, exception: Exception) -> int:
+        response = getattr(exception, "response", None)
+        if isinstance(exception, requests_exceptions.HTTPError) and (
+            response is None or response.status_code not in self.statuses
+        ):
+            return 1
+        for exception_type, attempts in self.rules:
+            if isinstance(exception, exception_type):
+                return attempts
+        return 1
+
+    @staticmethod
+    def retry_after(exception: Exception) -> Optional[float]:
+        """Seconds to wait from the `Retry-After` header of the failed response"""
+        response = getattr(exception, "response", None)
+        value = response is not None and response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            date = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+    def get_delay(self, attempt: int, exception: Exception, started: float) -> Optional[float]:
+        """Seconds to wait before retrying after `attempt` failed, or None to give up.
+        `started` is the `time.monotonic()` of the first attempt"""
+        if attempt >= self.max_attempts(exception):
+            return None
+        delay = self.retry_after(exception)
+        if delay is None:
+            delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+            delay *= random.uniform(0.5, 1)
+        if self.deadline is not None and time.monotonic() + delay - started > self.deadline:
+            return None
+        self.retries += 1
+        return delay
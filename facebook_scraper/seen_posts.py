@@ -0,0 +1,108 @@
+import logging
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from .constants import DEFAULT_SEEN_POSTS_FILE_PATH
+from .fb_types import Page, RawPost
+
+
+logger = logging.getLogger(__name__)
+
+
+class SeenPostIndex:
+    """The ids of the posts already scraped from each account or group, stored in a SQLite
+    database, used by `FacebookScraper.get_posts` and `get_group_posts` to only scrape new posts.
+
+    Posts are recorded once they have been yielded. On later crawls, posts already in the index
+    are skipped before they are extracted, so none of their pages are requested again, and the
+    timeline stops being walked once `max_known_posts` known posts in a row turn up.
+    """
+
+    def __init__(self, path: str = DEFAULT_SEEN_POSTS_FILE_PATH):
+        self.path = path
+        self.skipped = 0
+        self.added = 0
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("""CREATE TABLE IF NOT EXISTS seen_posts (
+                    account TEXT,
+                    post_id TEXT,
+                    seen REAL,
+                    PRIMARY KEY (account, post_id)
+                )""")
+
+    def __contains__(self, item) -> bool:
+        account, post_id = item
+        return self.is_known(account, post_id)
+
+    def is_known(self, account: str, post_id: str) -> bool:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM seen_posts WHERE account = ? AND post_id = ?",
+                (str(account), str(post_id)),
+            ).fetchone()
+        return row is not None
+
+    def add(self, account: str, post_id: str):
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO seen_posts VALUES (?, ?, ?)",
+                (str(account), str(post_id), time.time()),
+            )
+            self.added += cursor.rowcount
+
+    def clear(self, account: Optional[str] = None):
+        """Forget the posts of an account, or of every account"""
+        with self._lock, self._connection:
+            if account is None:
+                self._connection.execute("DELETE FROM seen_posts")
+            else:
+                self._connection.execute(
+                    "DELETE FROM seen_posts WHERE account = ?", (str(account),)
+                )
+
+    def skip_known(
+        self,
+        pages: Iterable[Page],
+        account: str,
+        post_id_fn: Callable[[RawPost], Optional[str]],
+        max_known_posts: int = 5,
+    ) -> Iterator[Iterator[RawPost]]:
+        """Remove the known posts from each page, and stop after `max_known_posts` known posts
+        in a row, without requesting the next page"""
+        # Pages are filtered lazily, so a checkpoint knows which posts were done
+        known_in_a_row = 0
+        stop = False
+
+        def new_posts(page):
+            nonlocal known_in_a_row, stop
+            for post_element in page:
+                post_id = post_id_fn(post_element)
+                if post_id is None or not self.is_known(account, post_id):
+                    known_in_a_row = 0
+                    yield post_element
+                    continue
+                self.skipped += 1
+                known_in_a_row += 1
+                if known_in_a_row >= max_known_posts:
+                    logger.info(
+                        "Found %s known posts in a row, stopping at post %s",
+                        known_in_a_row,
+                        post_id,
+                    )
+                    stop = True
+                    return
+
+        for page in pages:
+            yield new_posts(page)
+            if stop:
+                return
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._connection.execute("SELECT COUNT(*) FROM seen_posts").fetchone()[0]
+        return {"posts": size, "skipped": self.skipped, "added": self.added}
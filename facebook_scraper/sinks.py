@@ -0,0 +1,772 @@
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import abc
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from .fb_types import json_default
+from .timings import Timings, timed
+
+
+logger = logging.getLogger(__name__)
+
+
+# Optional dependencies, slow to import, so they're imported when first used
+zstandard = None
+pyarrow = None
+
+
+def _import_zstandard():
+    global zstandard
+    if zstandard is None:
+        try:
+            import zstandard
+        except ImportError:
+            raise ModuleNotFoundError(
+                "zstandard must be installed to use zstd compression "
+                "(pip install facebook-scraper[zstd])"
+            )
+    return zstandard
+
+
+def _import_pyarrow():
+    global pyarrow
+    if pyarrow is None:
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            raise ModuleNotFoundError(
+                "pyarrow must be installed to write Parquet files "
+                "(pip install facebook-scraper[parquet])"
+            )
+    return pyarrow
+
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def infer_compression(filename: str) -> Optional[str]:
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if filename.endswith(suffix):
+            return compression
+    return None
+
+
+def open_output(
+    filename: str,
+    encoding: Optional[str] = None,
+    compression: Optional[str] = None,
+    buffer_size: int = 1 << 20,
+):
+    """Open a text file to write to, compressed with gzip or zstd if asked to, or if the filename
+    ends with .gz or .zst. The filename "-" is stdout"""
+    if filename == "-":
+        return sys.stdout
+    if compression is None:
+        compression = infer_compression(filename)
+    if compression is None:
+        return open(filename, 'w', newline='', encoding=encoding, buffering=buffer_size)
+    if compression == "gzip":
+        raw = io.BufferedWriter(gzip.open(filename, 'wb'), buffer_size)
+        return io.TextIOWrapper(raw, encoding=encoding, newline='')
+    if compression == "zstd":
+        return _import_zstandard().open(filename, 'wt', encoding=encoding, newline='')
+    raise ValueError(f"Unknown compression {compression!r}")
+
+
+class Sink:
+    """Where `write_posts_to_csv` writes posts to.
+
+    Subclasses implement `write_many`, which is given posts in batches, and may buffer them
+    until `flush` is called. `close` flushes the sink and releases its file. Sinks that add to
+    an existing file rather than replacing it set `appends`.
+    """
+
+    appends = False
+
+    def write(self, post: Mapping[str, Any]):
+        self.write_many([post])
+
+    def write_many(self, posts: Sequence[Mapping[str, Any]]):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FileSink(Sink):
+    """A sink writing text to a file, optionally compressed"""
+
+    def __init__(
+        self,
+        filename: str,
+        encoding: Optional[str] = None,
+        keys: Optional[List[str]] = None,
+        compression: Optional[str] = None,
+    ):
+        self.filename = filename
+        self.keys = keys
+        self.file = open_output(filename, encoding=encoding, compression=compression)
+
+    def select(self, post: Mapping[str, Any]) -> Dict[str, Any]:
+        if self.keys:
+            return {key: value for key, value in post.items() if key in self.keys}
+        return dict(post)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+class JsonLinesSink(FileSink):
+    """Writes one JSON object per line"""
+
+    def write_many(self, posts):
+        self.file.write(
+            "".join(json.dumps(self.select(post), default=json_default) + "\n" for post in posts)
+        )
+
+
+class JsonSink(FileSink):
+    """Writes a JSON array of posts, indented like `json.dump(..., indent=4)`"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.empty = True
+        self.file.write("[\n")
+
+    def write_many(self, posts):
+        if not posts:
+            return
+        separator = "" if self.empty else ","
+        self.file.write(
+            separator
+            + ",".join(json.dumps(self.select(post), default=json_default, indent=4) for post in posts)
+        )
+        self.empty = False
+
+    def close(self):
+        self.file.write("\n]")
+        super().close()
+
+
+class CsvSink(FileSink):
+    """Writes posts as rows of a CSV file. The columns are `keys`, or the keys of the first
+    post"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer = None
+
+    def write_many(self, posts):
+        if not posts:
+            return
+        if self.writer is None:
+            keys = self.keys or list(posts[0].keys())
+            self.writer = csv.DictWriter(self.file, keys, extrasaction='ignore')
+            self.writer.writeheader()
+        self.writer.writerows(posts)
+
+
+def parquet_types() -> Dict[str, Any]:
+    """Arrow types of the post fields that aren't strings"""
+    pa = _import_pyarrow()
+    timestamp = pa.timestamp("us")
+    strings = pa.list_(pa.string())
+    counts = pa.map_(pa.string(), pa.int64())
+    reactors = pa.list_(
+        pa.struct([("name", pa.string()), ("link", pa.string()), ("type", pa.string())])
+    )
+    reply_fields = [
+        ("comment_id", pa.string()),
+        ("comment_url", pa.string()),
+        ("commenter_id", pa.string()),
+        ("commenter_url", pa.string()),
+        ("commenter_name", pa.string()),
+        ("commenter_meta", pa.string()),
+        ("comment_text", pa.string()),
+        ("comment_time", timestamp),
+        ("comment_image", pa.string()),
+        ("comment_reactors", reactors),
+        ("comment_reactions", counts),
+        ("comment_reaction_count", pa.int64()),
+    ]
+    comment = pa.struct(reply_fields + [("replies", pa.list_(pa.struct(reply_fields)))])
+    types = {
+        "time": timestamp,
+        "shared_time": timestamp,
+        "fetched_time": timestamp,
+        "video_size_MB": pa.float64(),
+        "is_live": pa.bool_(),
+        "available": pa.bool_(),
+        "links": pa.list_(pa.struct([("link", pa.string()), ("text", pa.string())])),
+        "with": pa.list_(pa.struct([("name", pa.string()), ("link", pa.string())])),
+        "reactions": counts,
+        "reactors": reactors,
+        "comments_full": pa.list_(comment),
+    }
+    for field in (
+        "timestamp",
+        "likes",
+        "comments",
+        "shares",
+        "reaction_count",
+        "video_duration_seconds",
+        "video_height",
+        "video_width",
+        "video_watches",
+    ):
+        types[field] = pa.int64()
+    for field in (
+        "images",
+        "images_description",
+        "images_lowquality",
+        "images_lowquality_description",
+        "image_ids",
+    ):
+        types[field] = strings
+    return types
+
+
+def to_arrow_value(value, arrow_type):
+    """Convert `value` to what pyarrow expects for `arrow_type`, or None if it doesn't fit"""
+    types = pyarrow.types
+    if value is None:
+        return None
+    if types.is_string(arrow_type):
+        return value if isinstance(value, str) else json.dumps(value, default=json_default)
+    if types.is_integer(arrow_type):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    if types.is_floating(arrow_type):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    if types.is_boolean(arrow_type):
+        return bool(value)
+    if types.is_timestamp(arrow_type):
+        return value if isinstance(value, datetime) else None
+    if types.is_map(arrow_type):
+        if not isinstance(value, abc.Mapping):
+            return None
+        return [(str(k), to_arrow_value(v, arrow_type.item_type)) for k, v in value.items()]
+    if types.is_list(arrow_type):
+        if isinstance(value, (str, bytes, abc.Mapping)) or not isinstance(value, abc.Iterable):
+            return None
+        return [to_arrow_value(item, arrow_type.value_type) for item in value]
+    if types.is_struct(arrow_type):
+        if not isinstance(value, abc.Mapping):
+            return None
+        return {
+            field.name: to_arrow_value(value.get(field.name), field.type) for field in arrow_type
+        }
+    return value
+
+
+class ParquetSink(Sink):
+    """Writes posts to a Parquet file, in row groups of `row_group_size` posts.
+
+    Counts are int64 columns, times are timestamps, and lists of images, links, comments and
+    reactors are list columns rather than strings. The columns are `keys`, or the keys of the
+    first post, and fields without a known type are stored as strings, JSON encoded if needed.
+    `compression` is the Parquet codec, defaults to snappy.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        encoding: Optional[str] = None,
+        keys: Optional[List[str]] = None,
+        compression: Optional[str] = None,
+        row_group_size: int = 10000,
+    ):
+        _import_pyarrow()
+        if filename == "-":
+            raise ValueError("Parquet output can't be written to stdout")
+        self.filename = filename
+        self.keys = keys
+        self.compression = compression or "snappy"
+        self.row_group_size = row_group_size
+        self.schema = None
+        self.writer = None
+        self.rows = []
+
+    def make_schema(self, keys: List[str]):
+        types = parquet_types()
+        return pyarrow.schema([(key, types.get(key, pyarrow.string())) for key in keys])
+
+    def write_many(self, posts):
+        if not posts:
+            return
+        if self.schema is None:
+            self.schema = self.make_schema(self.keys or list(posts[0].keys()))
+        self.rows.extend(posts)
+        while len(self.rows) >= self.row_group_size:
+            self.write_row_group(self.rows[: self.row_group_size])
+            del self.rows[: self.row_group_size]
+
+    def write_row_group(self, posts):
+        columns = [
+            pyarrow.array(
+                [to_arrow_value(post.get(field.name), field.type) for post in posts],
+                type=field.type,
+            )
+            for field in self.schema
+        ]
+        if self.writer is None:
+            self.writer = pyarrow.parquet.ParquetWriter(
+                self.filename, self.schema, compression=self.compression
+            )
+        self.writer.write_table(pyarrow.Table.from_arrays(columns, schema=self.schema))
+
+    def close(self):
+        if self.rows:
+            self.write_row_group(self.rows)
+            self.rows = []
+        if self.writer is None and self.schema is not None:
+            self.writer = pyarrow.parquet.ParquetWriter(
+                self.filename, self.schema, compression=self.compression
+            )
+        if self.writer is not None:
+            self.writer.close()
+
+
+def to_int(value) -> Optional[int]:
+    if value is None or isinstance(value, int):
+        return value
+    try:
+        return int(str(value).replace(",", ""))
+    except ValueError:
+        return None
+
+
+def to_text(value) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    # Sorted, so the same reactions are stored as the same text on every run
+    return json.dumps(value, default=json_default, sort_keys=True)
+
+
+class SqliteSink(Sink):
+    """Writes posts to a SQLite database, updating the posts that are already in it.
+
+    Posts are upserted by `post_id`, so crawling the same pages again updates their text and
+    engagement counts (`likes`, `comments`, `shares`, `reaction_count` and `reactions`) in
+    place, and the remaining fields are stored as JSON in `data`. Comments and replies go in
+    the `comments` table keyed by `comment_id`, and the reactors of posts and comments in the
+    `reactors` table. Each sink is a new row of the `runs` table: `first_run` is the run a post
+    was first written in, and `changed_run` the last run its text or engagement changed in.
+    """
+
+    post_columns = (
+        "post_id",
+        "post_url",
+        "user_id",
+        "username",
+        "time",
+        "timestamp",
+        "text",
+        "likes",
+        "comments",
+        "shares",
+        "reaction_count",
+        "reactions",
+    )
+    # Columns that mark a post as changed, and that keep their value when a run doesn't have it
+    tracked_columns = ("text", "likes", "comments", "shares", "reaction_count", "reactions")
+    count_columns = ("timestamp", "likes", "comments", "shares", "reaction_count")
+    appends = True
+
+    def __init__(
+        self,
+        filename: str,
+        encoding: Optional[str] = None,
+        keys: Optional[List[str]] = None,
+        compression: Optional[str] = None,
+    ):
+        if filename == "-":
+            raise ValueError("SQLite output can't be written to stdout")
+        self.filename = filename
+        self.keys = keys
+        # Posts are written from the thread of a QueuedSink
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY,
+                    started REAL,
+                    finished REAL
+                )""")
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS posts (
+                    post_id TEXT PRIMARY KEY,
+                    post_url TEXT,
+                    user_id TEXT,
+                    username TEXT,
+                    time TEXT,
+                    timestamp INTEGER,
+                    text TEXT,
+                    likes INTEGER,
+                    comments INTEGER,
+                    shares INTEGER,
+                    reaction_count INTEGER,
+                    reactions TEXT,
+                    data TEXT,
+                    first_run INTEGER,
+                    changed_run INTEGER,
+                    seen_run INTEGER
+                )""")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS posts_changed_run ON posts (changed_run)"
+            )
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS comments (
+                    comment_id TEXT PRIMARY KEY,
+                    post_id TEXT,
+                    parent_id TEXT,
+                    commenter_id TEXT,
+                    commenter_name TEXT,
+                    commenter_url TEXT,
+                    comment_text TEXT,
+                    comment_time TEXT,
+                    comment_image TEXT,
+                    reaction_count INTEGER,
+                    reactions TEXT,
+                    seen_run INTEGER
+                )""")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS comments_post_id ON comments (post_id)"
+            )
+            # comment_id is empty for the reactors of the post itself
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS reactors (
+                    post_id TEXT,
+                    comment_id TEXT NOT NULL DEFAULT '',
+                    link TEXT,
+                    name TEXT,
+                    type TEXT,
+                    seen_run INTEGER,
+                    PRIMARY KEY (post_id, comment_id, link)
+                )""")
+            self.run = self.connection.execute(
+                "INSERT INTO runs (started) VALUES (?)", (time.time(),)
+            ).lastrowid
+
+        updates = ", ".join(
+            (
+                f"{column} = COALESCE(excluded.{column}, {column})"
+                if column in self.tracked_columns
+                else f"{column} = excluded.{column}"
+            )
+            for column in self.post_columns[1:]
+        )
+        changed = " OR ".join(
+            f"(excluded.{column} IS NOT NULL AND excluded.{column} IS NOT {column})"
+            for column in self.tracked_columns
+        )
+        columns = ", ".join(self.post_columns)
+        placeholders = ", ".join("?" * len(self.post_columns))
+        self.upsert_post = f"""
+            INSERT INTO posts ({columns}, data, first_run, changed_run, seen_run)
+            VALUES ({placeholders}, ?, ?, ?, ?)
+            ON CONFLICT (post_id) DO UPDATE SET {updates},
+                data = excluded.data,
+                seen_run = excluded.seen_run,
+                changed_run = CASE WHEN {changed} THEN excluded.changed_run ELSE changed_run END
+        """
+
+    def post_row(self, post: Mapping[str, Any]) -> tuple:
+        values = []
+        for column in self.post_columns:
+            value = post.get(column)
+            values.append(to_int(value) if column in self.count_columns else to_text(value))
+        if self.keys:
+            post = {key: value for key, value in post.items() if key in self.keys}
+        data = {
+            key: value
+            for key, value in post.items()
+            if key not in self.post_columns and key not in ("comments_full", "reactors")
+        }
+        return (*values, json.dumps(data, default=json_default), self.run, self.run, self.run)
+
+    def comment_rows(self, post_id, comments, reactors, parent_id=None):
+        """Rows of the comments and their replies, adding the rows of their reactors to
+        `reactors`"""
+        for comment in comments:
+            comment_id = to_text(comment.get("comment_id"))
+            yield (
+                comment_id,
+                post_id,
+                parent_id,
+                to_text(comment.get("commenter_id")),
+                to_text(comment.get("commenter_name")),
+                to_text(comment.get("commenter_url")),
+                to_text(comment.get("comment_text")),
+                to_text(comment.get("comment_time")),
+                to_text(comment.get("comment_image")),
+                to_int(comment.get("comment_reaction_count")),
+                to_text(comment.get("comment_reactions")),
+                self.run,
+            )
+            reactors.extend(
+                self.reactor_rows(post_id, comment_id, comment.get("comment_reactors") or [])
+            )
+            yield from self.comment_rows(
+                post_id, comment.get("replies") or [], reactors, comment_id
+            )
+
+    def reactor_rows(self, post_id, comment_id, reactors):
+        for reactor in reactors:
+            yield (
+                post_id,
+                comment_id or '',
+                reactor.get("link"),
+                reactor.get("name"),
+                reactor.get("type"),
+                self.run,
+            )
+
+    def write_many(self, posts):
+        posts_rows = []
+        comments = []
+        reactors = []
+        for post in posts:
+            post_id = to_text(post.get("post_id"))
+            if not post_id:
+                continue
+            posts_rows.append(self.post_row(post))
+            reactors.extend(self.reactor_rows(post_id, None, post.get("reactors") or []))
+            comments.extend(self.comment_rows(post_id, post.get("comments_full") or [], reactors))
+
+        # A single transaction per batch
+        with self.connection:
+            self.connection.executemany(self.upsert_post, posts_rows)
+            self.connection.executemany(
+                """INSERT INTO comments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (comment_id) DO UPDATE SET
+                    comment_text = excluded.comment_text,
+                    comment_image = excluded.comment_image,
+                    reaction_count = COALESCE(excluded.reaction_count, reaction_count),
+                    reactions = COALESCE(excluded.reactions, reactions),
+                    seen_run = excluded.seen_run""",
+                comments,
+            )
+            self.connection.executemany(
+                """INSERT INTO reactors VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (post_id, comment_id, link) DO UPDATE SET
+                    name = excluded.name,
+                    type = excluded.type,
+                    seen_run = excluded.seen_run""",
+                reactors,
+            )
+
+    def close(self):
+        with self.connection:
+            self.connection.execute(
+                "UPDATE runs SET finished = ? WHERE id = ?", (time.time(), self.run)
+            )
+        self.connection.close()
+
+
+SINKS = {
+    "csv": CsvSink,
+    "json": JsonSink,
+    "jsonl": JsonLinesSink,
+    "parquet": ParquetSink,
+    "sqlite": SqliteSink,
+}
+
+
+def default_filename(name: str, format: str, compression: Optional[str] = None) -> str:
+    filename = f"{name}_posts.{format}"
+    # Parquet files are compressed internally
+    if issubclass(SINKS.get(format, FileSink), FileSink):
+        filename += COMPRESSION_SUFFIXES.get(compression, "")
+    return filename
+
+
+def numbered_filename(filename: str) -> str:
+    """`filename`, or the first numbered file after it that doesn't exist yet
+    (`nike_posts.2.jsonl.gz`)"""
+    root, extension = os.path.splitext(filename)
+    if extension in COMPRESSION_SUFFIXES.values():
+        root, inner_extension = os.path.splitext(root)
+        extension = inner_extension + extension
+    path = filename
+    part = 1
+    while os.path.exists(path):
+        part += 1
+        path = f"{root}.{part}{extension}"
+    return path
+
+
+def make_sink(format: str, filename: str, **kwargs) -> Sink:
+    """Create the sink for `format` ("csv", "json", "jsonl", "parquet" or "sqlite") writing to
+    `filename`"""
+    try:
+        sink_class = SINKS[format]
+    except KeyError:
+        raise ValueError(f"Unknown output format {format!r}, use one of {', '.join(SINKS)}")
+    return sink_class(filename, **kwargs)
+
+
+_closed = object()
+
+
+class _AfterFlush:
+    __slots__ = ("fn",)
+
+    def __init__(self, fn: Callable[[], Any]):
+        self.fn = fn
+
+
+class QueuedSink(Sink):
+    """Writes posts to another sink from a background thread, so scraping doesn't wait on disk.
+
+    Posts are handed over through a queue of at most `max_queued` posts: when the sink can't
+    keep up, `write` blocks until there's room rather than holding more posts in memory. The
+    writer thread passes posts to the sink in batches of up to `batch_size`, and flushes it at
+    least every `flush_interval` seconds. Batch writes are timed as `sink.write` in `timings`.
+    `call_after_flush` runs a function once the posts written before it are flushed.
+    """
+
+    def __init__(
+        self,
+        sink: Sink,
+        batch_size: int = 500,
+        flush_interval: float = 5.0,
+        max_queued: int = 5000,
+        timings: Optional[Timings] = None,
+    ):
+        self.sink = sink
+        self.timings = timings
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queued)
+        self.error: Optional[BaseException] = None
+        self._error_raised = False
+        self.written = 0
+        self.batches = 0
+        self.thread = threading.Thread(target=self._run, name="sink-writer", daemon=True)
+        self.thread.start()
+
+    def write(self, post):
+        if self.error is not None:
+            self._error_raised = True
+            raise self.error
+        self.queue.put(post)
+
+    def write_many(self, posts: Iterable[Mapping[str, Any]]):
+        for post in posts:
+            self.write(post)
+
+    def call_after_flush(self, fn: Callable[[], Any]):
+        """Call `fn` from the writer thread once every post written so far has been flushed or
+        the sink closed. It's never called if writing them fails"""
+        if self.error is not None:
+            return
+        self.queue.put(_AfterFlush(fn))
+
+    def close(self):
+        self.queue.put(_closed)
+        self.thread.join()
+        self._raise_error()
+
+    def stats(self) -> dict:
+        return {"written": self.written, "batches": self.batches, "queued": self.queue.qsize()}
+
+    def _raise_error(self):
+        if self.error is not None and not self._error_raised:
+            self._error_raised = True
+            raise self.error
+
+    def _run(self):
+        last_flush = time.monotonic()
+        closed = False
+        # Functions to call after the next flush
+        after_flush = []
+        while not closed:
+            batch = []
+            # Wait for the first post, then take whatever else is already queued. After an
+            # error, there's nothing to flush anymore
+            timeout = None
+            if self.error is None:
+                timeout = max(0.0, last_flush + self.flush_interval - time.monotonic())
+            try:
+                item = self.queue.get(timeout=timeout)
+                while True:
+                    if item is _closed:
+                        closed = True
+                        break
+                    if isinstance(item, _AfterFlush):
+                        after_flush.append(item.fn)
+                    else:
+                        batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    item = self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            if self.error is not None:
+                # Keep draining the queue so writers don't block, they'll get the error
+                if closed:
+                    self._close_quietly()
+                continue
+            try:
+                if batch:
+                    with timed(self.timings, "sink.write"):
+                        self.sink.write_many(batch)
+                    self.written += len(batch)
+                    self.batches += 1
+                flushed = False
+                if closed:
+                    self.sink.close()
+                    flushed = True
+                elif time.monotonic() - last_flush >= self.flush_interval:
+                    self.sink.flush()
+                    last_flush = time.monotonic()
+                    flushed = True
+            except BaseException as ex:
+                logger.exception("Error writing posts")
+                self.error = ex
+                if closed:
+                    self._close_quietly()
+                continue
+            if flushed:
+                for fn in after_flush:
+                    try:
+                        fn()
+                    except Exception:
+                        logger.exception("Error after flushing posts")
+                after_flush = []
+
+    def _close_quietly(self):
+        try:
+            self.sink.close()
+        except Exception:
+            logger.exception("Error closing sink")
@@ -0,0 +1,141 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+# Upper bounds of the histogram buckets, in seconds. Slower stages go to a last, unbounded bucket
+DEFAULT_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 30)
+
+
+class StageTimings:
+    """Durations of one stage, kept as a histogram so long crawls use constant memory"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.bytes = 0
+
+    def add(self, seconds: float, size: int = 0):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        self.bytes += size
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the `q` quantile, or the maximum for the last one"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+            "bytes": self.bytes,
+            "histogram": {
+                **{f"<={bound}s": count for bound, count in zip(self.buckets, self.counts)},
+                f">{self.buckets[-1]}s": self.counts[-1],
+            },
+        }
+
+
+class Timings:
+    """Time spent in each stage of a crawl, set with `FacebookScraper.set_timings`.
+
+    Stages are named by what they time:
+    - `request`: sending a request and reading its response, with the bytes received
+    - `request.ttfb`: time until the response headers were received
+    - `throttle`: waiting for the rate limiter
+    - `check`: parsing each response and checking it for error, ban and login pages
+    - `parse`: parsing a timeline page with its `PageParser`
+    - `extract.<method>`: each `PostExtractor` method, like `extract.extract_time`
+    - `sink.write`: writing a batch of posts to a sink
+
+    `stats()` returns the count, total, quantiles and histogram of each stage as a dict, and
+    `report()` as a text table. Name resolution isn't exposed by requests, so it's part of
+    `request.ttfb`.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.stages: Dict[str, StageTimings] = {}
+
+        # Stages are timed from worker threads too
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float, size: int = 0):
+        with self._lock:
+            timings = self.stages.get(stage)
+            if timings is None:
+                timings = self.stages[stage] = StageTimings(self.buckets)
+            timings.add(seconds, size)
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - started)
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {stage: timings.stats() for stage, timings in sorted(self.stages.items())}
+
+    def report(self) -> str:
+        row = "{:40} {:>7} {:>9} {:>8} {:>8} {:>8} {:>8} {:>10}"
+        lines: List[str] = [
+            row.format("stage", "count", "total", "mean", "p50", "p90", "max", "bytes")
+        ]
+        for stage, stats in self.stats().items():
+            lines.append(
+                row.format(
+                    stage,
+                    stats["count"],
+                    f"{stats['total']:.2f}s",
+                    f"{stats['mean'] * 1000:.1f}ms",
+                    f"{stats['p50'] * 1000:.1f}ms",
+                    f"{stats['p90'] * 1000:.1f}ms",
+                    f"{stats['max'] * 1000:.1f}ms",
+                    stats["bytes"] or "",
+                )
+            )
+        return "\n".join(lines)
+
+
+@contextmanager
+def timed(timings: Optional[Timings], stage: str) -> Iterator[None]:
+    """Time a stage if `timings` is set"""
+    if timings is None:
+        yield
+    else:
+        with timings.time(stage):
+            yield
@@ -2,14 +2,14 @@ import codecs
 import re
 from datetime import datetime, timedelta
 import calendar
-from typing import Optional
+import functools
+from typing import TYPE_CHECKING, Optional
 from urllib.parse import parse_qsl, unquote, urlencode, urljoin, urlparse, urlunparse
 
-import dateparser
-import lxml.html
-from bs4 import BeautifulSoup
+from dateutil.relativedelta import relativedelta
 from requests.cookies import RequestsCookieJar
-from requests_html import DEFAULT_URL, Element, PyQuery
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
 import json
 import traceback
 
@@ -17,6 +17,11 @@ from . import exceptions
 import logging
 import time
 
+# requests_html (which imports pyppeteer), dateparser, lxml and bs4 are slow to import, so
+# they're imported when first used
+if TYPE_CHECKING:
+    from requests_html import HTML, Element, HTMLResponse
+
 logger = logging.getLogger(__name__)
 
 
@@ -87,6 +92,29 @@ def combine_url_params(url1, url2) -> str:
     return urlunparse(parsed_url._replace(query=query_string))
 
 
+# Character references to the invalid XML characters listed below, e.g. "&#11;" or "&#xFFFE;"
+illegal_decimal_reference_regex = re.compile(
+    r"&#0*(?:[0-8]|1[124-9]|2[0-9]|3[01]"
+    r"|5529[6-9]|55[3-9][0-9]{2}|56[0-9]{3}|57[0-2][0-9]{2}|573[0-3][0-9]|5734[0-3]"
+    r"|6553[45])(?![0-9]);?"
+)
+illegal_hex_reference_regex = re.compile(
+    r"&#[xX]0*(?:[0-8bBcCeEfF]|1[0-9a-fA-F]|[dD][89a-fA-F][0-9a-fA-F]{2}|[fF]{3}[eEfF])"
+    r"(?![0-9a-fA-F]);?"
+)
+control_characters = bytes([*range(0x0, 0x9), 0xB, 0xC, *range(0xE, 0x20)])
+
+
+if hasattr(str, "isascii"):
+    is_ascii = str.isascii
+else:
+    # str.isascii needs Python 3.7, and is much faster as strings know if they're ASCII
+    non_ascii_regex = re.compile(r"[^\x00-\x7f]")
+
+    def is_ascii(text: str) -> bool:
+        return not non_ascii_regex.search(text)
+
+
 def remove_control_characters(html):
     # type: (t.Text) -> t.Text
     """
@@ -103,38 +131,87 @@ def remove_control_characters(html):
     # Sources:
     # https://www.w3.org/TR/REC-xml/#charsets,
     # https://lsimons.wordpress.com/2011/03/17/stripping-illegal-characters-out-of-xml-in-python/
-    def strip_illegal_xml_characters(s, default, base=10):
-        # Compare the "invalid XML character range" numerically
-        n = int(s, base)
-        if (
-            n in (0xB, 0xC, 0xFFFE, 0xFFFF)
-            or 0x0 <= n <= 0x8
-            or 0xE <= n <= 0x1F
-            or 0xD800 <= n <= 0xDFFF
-        ):
-            return ""
-        return default
-
-    # We encode all non-ascii characters to XML char-refs, so for example "💖" becomes: "&#x1F496;"
+    if "&#" in html:
+        html = illegal_decimal_reference_regex.sub("", html)
+    if not is_ascii(html) and (
+        "\ufffe" in html or "\uffff" in html or not is_encodable(html, "utf-8")
+    ):
+        # Surrogates, U+FFFE and U+FFFF are invalid too, once encoded as character references
+        html = re.sub("[\ud800-\udfff\ufffe\uffff]", "", html)
+    # Removing characters can join new references together
+    if "&#" in html:
+        html = illegal_hex_reference_regex.sub("", html)
+
+    # We encode all non-ascii characters to XML char-refs, so for example "💖" becomes: "&#128150;"
     # Otherwise we'd remove emojis by mistake on narrow-unicode builds of Python
-    html = html.encode("ascii", "xmlcharrefreplace").decode("utf-8")
-    html = re.sub(
-        r"&#(\d+);?", lambda c: strip_illegal_xml_characters(c.group(1), c.group(0)), html
-    )
-    html = re.sub(
-        r"&#[xX]([0-9a-fA-F]+);?",
-        lambda c: strip_illegal_xml_characters(c.group(1), c.group(0), base=16),
-        html,
-    )
-    # A regex matching the "invalid XML character range"
-    html = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1F\uD800-\uDFFF\uFFFE\uFFFF]").sub("", html)
-    return html
+    html = html.encode("ascii", "xmlcharrefreplace")
+    return html.translate(None, control_characters).decode("ascii")
+
+
+def is_encodable(text: str, encoding: str) -> bool:
+    try:
+        text.encode(encoding)
+    except UnicodeEncodeError:
+        return False
+    return True
 
 
-def make_html_element(html: str, url=DEFAULT_URL) -> Element:
+def make_html_element(html: str, url=None) -> "Element":
+    from requests_html import DEFAULT_URL, Element, PyQuery
+
     html = remove_control_characters(html)
     pq_element = PyQuery(html)[0]  # PyQuery is a list, so we take the first element
-    return Element(element=pq_element, url=url)
+    return Element(element=pq_element, url=url or DEFAULT_URL)
+
+
+@functools.lru_cache(maxsize=None)
+def _response_html_class():
+    from requests_html import DEFAULT_ENCODING, DEFAULT_NEXT_SYMBOL, HTML, BaseParser
+
+    class ResponseHTML(HTML):
+        def __init__(self, response: "HTMLResponse"):
+            content = response.content.replace(b'<!--', b'').replace(b'-->', b'')
+            BaseParser.__init__(
+                self,
+                element=None,
+                html=content,
+                url=response.url,
+                default_encoding=response.encoding or DEFAULT_ENCODING,
+            )
+            self.session = getattr(response, "session", None)
+            self.page = None
+            self.next_symbol = DEFAULT_NEXT_SYMBOL
+
+    return ResponseHTML
+
+
+def response_html(response: "HTMLResponse") -> "HTML":
+    """The `HTML` of a response, without the comment markers Facebook hides part of its pages
+    in. Unlike `HTML`, the content isn't parsed until the document is first searched, so
+    every response is only parsed once"""
+    return _response_html_class()(response)
+
+
+def find_containing(html: "HTML", selector: str, text: str) -> bool:
+    """Whether any element matching `selector` contains `text`, like
+    `html.find(selector, containing=text)` without parsing every matching element again"""
+    text = text.lower()
+    return any(text in element.text_content().lower() for element in html.pq(selector))
+
+
+def make_response(session, url, status_code, headers, content, reason=None) -> "HTMLResponse":
+    """Build a requests_html response out of a response that didn't come from `session`,
+    so it can go through the same checks and parsers as the ones that did"""
+    from requests_html import DEFAULT_ENCODING, HTMLResponse
+
+    response = HTMLResponse(session=session)
+    response.url = url
+    response.status_code = status_code
+    response.reason = reason
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = content
+    response.encoding = get_encoding_from_headers(response.headers) or DEFAULT_ENCODING
+    return response
 
 
 month = (
@@ -174,22 +251,83 @@ datetime_regex = re.compile(fr"({exact_time}|{relative_time})", re.IGNORECASE)
 day_of_week_regex = re.compile(fr"({day_of_week})", re.IGNORECASE)
 
 
-def parse_datetime(text: str, search=True) -> Optional[datetime]:
-    """Looks for a string that looks like a date and parses it into a datetime object.
+# The same formats as `datetime_regex`, with groups to parse them without dateparser
+exact_time_parts_regex = re.compile(
+    f"(?:(?:(?P<month>{month}) (?P<day>[0-9]{{1,2}})"
+    f"|(?P<day_dm>[0-9]{{1,2}}) (?P<month_dm>{month}))(?:,? (?P<year>[0-9]{{4}}))?"
+    f"|(?P<relative_day>Today|Yesterday))"
+    f" at (?P<hour>[0-9]{{1,2}}):(?P<minute>[0-9]{{2}}) ?(?P<period>AM|PM)?",
+    re.IGNORECASE,
+)
+relative_time_parts_regex = re.compile(
+    r"(?P<amount>[0-9]{1,2}) ?(?P<unit>yr|month|mo|wk|h|hrs?|mins?)", re.IGNORECASE
+)
+relative_time_units = {
+    "yr": "years",
+    "month": "months",
+    "mo": "months",
+    "wk": "weeks",
+    "h": "hours",
+    "hr": "hours",
+    "hrs": "hours",
+    "min": "minutes",
+    "mins": "minutes",
+}
+month_numbers = {
+    "Jan": 1,
+    "Feb": 2,
+    "Mar": 3,
+    "Apr": 4,
+    "May": 5,
+    "Jun": 6,
+    "Jul": 7,
+    "Aug": 8,
+    "Sep": 9,
+    "Oct": 10,
+    "Nov": 11,
+    "Dec": 12,
+}
+day_of_week_numbers = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
 
-    Uses a regex to look for the date in the string.
-    Uses dateparser to parse the date (not thread safe).
 
-    Args:
-        text: The text where the date should be.
-        search: If false, skip the regex search and try to parse the complete string.
+def parse_exact_or_relative_time(text: str, relative_base: datetime) -> Optional[datetime]:
+    """Parse the dates matched by `datetime_regex` the way dateparser would.
+    Returns None for dates it doesn't handle, which should be left to dateparser"""
+    match = exact_time_parts_regex.fullmatch(text.strip())
+    if match:
+        hour = int(match.group("hour"))
+        minute = int(match.group("minute"))
+        period = (match.group("period") or "").upper()
+        if period and 1 <= hour <= 12:
+            hour = hour % 12 + (12 if period == "PM" else 0)
+        if hour > 23 or minute > 59:
+            return None
+        relative_day = match.group("relative_day")
+        if relative_day:
+            date = relative_base
+            if relative_day.lower() == "yesterday":
+                date -= timedelta(days=1)
+            return date.replace(hour=hour, minute=minute)
+        month = (match.group("month") or match.group("month_dm"))[:3].title()
+        day = int(match.group("day") or match.group("day_dm"))
+        year = int(match.group("year") or relative_base.year)
+        try:
+            return datetime(year, month_numbers[month], day, hour, minute)
+        except ValueError:
+            # Like February 29th without a year, which dateparser moves to a leap year
+            return None
+
+    match = relative_time_parts_regex.fullmatch(text.strip())
+    if match:
+        unit = relative_time_units[match.group("unit").lower()]
+        return relative_base - relativedelta(**{unit: int(match.group("amount"))})
 
-    Returns:
-        The datetime object, or None if it couldn't find a date.
-    """
-    settings = {
-        'RELATIVE_BASE': datetime.today().replace(minute=0, hour=0, second=0, microsecond=0)
-    }
+    return None
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_datetime(text: str, search: bool, relative_base: datetime) -> Optional[datetime]:
+    settings = {'RELATIVE_BASE': relative_base}
     if search:
         time_match = datetime_regex.search(text)
         dow_match = day_of_week_regex.search(text)
@@ -197,20 +335,59 @@ def parse_datetime(text: str, search=True) -> Optional[datetime]:
             text = time_match.group(0).replace("mth", "month")
         elif dow_match:
             text = dow_match.group(0)
-            today = calendar.day_abbr[datetime.today().weekday()]
+            # dateparser parses a day of the week as the last one, or today
+            days = (relative_base.weekday() - day_of_week_numbers[text.lower()]) % 7
+            today = calendar.day_abbr[relative_base.weekday()]
             if text == today:
                 # Fix for dateparser misinterpreting "last Monday" as today if today is Monday
-                return dateparser.parse(text, settings=settings) - timedelta(days=7)
+                days = 7
+            return relative_base - timedelta(days=days)
+
+    result = parse_exact_or_relative_time(text, relative_base)
+    if result is None:
+        import dateparser
 
-    result = dateparser.parse(text, settings=settings)
+        result = dateparser.parse(text, settings=settings)
     if result:
         return result.replace(microsecond=0)
     return None
 
 
-def html_element_to_string(element: Element, pretty=False) -> str:
+def start_of_today() -> datetime:
+    """The base of relative dates, like "2 hrs" or "Yesterday at 3:04 PM", the start of today"""
+    return datetime.today().replace(minute=0, hour=0, second=0, microsecond=0)
+
+
+def parse_datetime(
+    text: str, search=True, relative_base: Optional[datetime] = None
+) -> Optional[datetime]:
+    """Looks for a string that looks like a date and parses it into a datetime object.
+
+    Uses a regex to look for the date in the string.
+    Dates in the formats found by the regex are parsed directly, others are parsed with
+    dateparser (not thread safe). Results are cached by `relative_base`.
+
+    Args:
+        text: The text where the date should be.
+        search: If false, skip the regex search and try to parse the complete string.
+        relative_base: The date relative dates are parsed from, defaults to the start of today.
+            Crawls pass the one they started with, so their posts share the cached results.
+
+    Returns:
+        The datetime object, or None if it couldn't find a date.
+    """
+    if relative_base is None:
+        relative_base = start_of_today()
+    return _parse_datetime(text, search, relative_base)
+
+
+def html_element_to_string(element: "Element", pretty=False) -> str:
+    import lxml.html
+
     html = lxml.html.tostring(element.element, encoding='unicode')
     if pretty:
+        from bs4 import BeautifulSoup
+
         html = BeautifulSoup(html, features='html.parser').prettify()
     return html
 
@@ -0,0 +1,58 @@
+from urllib.parse import urlparse
+
+import pytest
+from requests.exceptions import ConnectionError
+
+from facebook_scraper import utils
+
+
+class FakeSession:
+    """A requests session answering with canned pages.
+
+    `pages` maps URL paths to page contents, other URLs get a page titled `title`. When
+    `status_codes` are given, each request is answered with the next one, and None resets the
+    connection instead.
+    """
+
+    def __init__(self, title="Nintendo", pages=None, status_codes=None, response_headers=None):
+        self.title = title
+        self.pages = pages or {}
+        self.status_codes = None if status_codes is None else list(status_codes)
+        self.response_headers = response_headers or {}
+        self.cookies = {}
+        self.headers = {}
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        status_code = 200
+        if self.status_codes is not None:
+            status_code = self.status_codes.pop(0)
+            if status_code is None:
+                raise ConnectionError("Connection reset by peer")
+        content = self.pages.get(urlparse(url).path)
+        if content is None:
+            content = f"<html><head><title>{self.title}</title><script></script></head></html>"
+        return utils.make_response(
+            self, url, status_code, dict(self.response_headers), content.encode()
+        )
+
+
+@pytest.fixture
+def fake_session():
+    """Makes `FakeSession`s"""
+    return FakeSession
+
+
+@pytest.fixture
+def post_element():
+    """Makes the element of a timeline post with the given id"""
+
+    def post_element(post_id):
+        html = (
+            f"""<article data-ft='{{"top_level_post_id":"{post_id}"}}'>"""
+            f"<p>Post {post_id}</p></article>"
+        )
+        return utils.make_html_element(html).find("article", first=True)
+
+    return post_element
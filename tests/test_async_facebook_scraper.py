@@ -0,0 +1,187 @@
+import asyncio
+import threading
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlparse
+
+import pytest
+
+from facebook_scraper.async_facebook_scraper import AsyncFacebookScraper
+from facebook_scraper.fb_types import Post
+from facebook_scraper.identities import Identity
+from facebook_scraper.seen_posts import SeenPostIndex
+from facebook_scraper.page_iterators import PageParser
+
+pytest.importorskip("aiohttp")
+
+
+def timeline_page(post_ids, next_page=None):
+    articles = "".join(
+        f"""<article data-ft='{{"top_level_post_id":"{post_id}"}}'>
+          <p>Post {post_id}</p><footer></footer></article>"""
+        for post_id in post_ids
+    )
+    more = f'<a href="{next_page}">See more</a>' if next_page else ""
+    return f"<html><head><title>Nintendo</title></head><body>{articles}{more}</body></html>"
+
+
+class FakeResponse:
+    def __init__(self, url, content, set_cookie=None):
+        self.url = url
+        self.status = 200
+        self.reason = "OK"
+        self.headers = {"Content-Type": "text/html; charset=utf-8"}
+        self.history = ()
+        self.cookies = SimpleCookie(set_cookie or "")
+        self.content = content.encode()
+
+    async def read(self):
+        return self.content
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+
+class FakeClientSession:
+    """Answers requests with canned pages by path, like aiohttp.ClientSession"""
+
+    def __init__(self, pages, cookies=None):
+        self.pages = pages
+        self.cookies = cookies or {}
+        self.requested = []
+
+    def request(self, method, url, **kwargs):
+        path = urlparse(url).path
+        self.requested.append((path, dict(kwargs.get("cookies") or {})))
+        return FakeResponse(url, self.pages[path], self.cookies.get(path))
+
+    async def close(self):
+        pass
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def collect(posts):
+    return [post async for post in posts]
+
+
+PAGES = {
+    "/Nintendo/": timeline_page(["1", "2", "3"], "/page_content_list_view/more/?page=2"),
+    "/page_content_list_view/more/": timeline_page(["4", "5"]),
+}
+
+
+def make_scraper(pages=PAGES, cookies=None):
+    scraper = AsyncFacebookScraper()
+    scraper.have_checked_locale = True
+    scraper.set_retry_policy(None)
+    scraper._client = FakeClientSession(pages, cookies)
+    return scraper
+
+
+class TestAsyncFacebookScraper:
+    def test_posts_keep_their_order_and_own_options(self):
+        scraper = make_scraper()
+        options = {"comments": False}
+        seen_options = []
+        lock = threading.Lock()
+
+        def extract_post(element, options, request_fn):
+            post_id = element.attrs["data-ft"].split('"')[3]
+            # Later posts are extracted first
+            time.sleep(0.01 * (6 - int(post_id)))
+            options["post_id"] = post_id
+            with lock:
+                seen_options.append(options)
+            time.sleep(0.01)
+            return Post(post_id=post_id, text=options["post_id"])
+
+        posts = run(
+            collect(
+                scraper._generic_get_posts(
+                    extract_post,
+                    "https://m.facebook.com/Nintendo/",
+                    PageParser,
+                    options=options,
+                )
+            )
+        )
+        assert [post["post_id"] for post in posts] == ["1", "2", "3", "4", "5"]
+        assert all(post["text"] == post["post_id"] for post in posts)
+        assert options == {"comments": False}
+        assert len({id(options) for options in seen_options}) == 5
+
+    def test_pages_are_parsed_in_worker_threads(self, monkeypatch):
+        scraper = make_scraper()
+        threads = set()
+
+        def check_response(response):
+            threads.add(threading.get_ident())
+
+        monkeypatch.setattr(scraper, "check_response", check_response)
+        run(collect(scraper.get_posts("Nintendo", options={"allow_extra_requests": False})))
+        assert threads and threading.get_ident() not in threads
+
+    def test_unsupported_arguments(self):
+        scraper = make_scraper()
+        with pytest.raises(TypeError, match="latest_date, checkpoint"):
+            run(collect(scraper.get_posts("Nintendo", latest_date=1, checkpoint="c.json")))
+        assert scraper._client.requested == []
+
+    def test_get_posts(self):
+        scraper = make_scraper()
+        posts = run(
+            collect(scraper.get_posts("Nintendo", options={"allow_extra_requests": False}))
+        )
+        assert [post["post_id"] for post in posts] == ["1", "2", "3", "4", "5"]
+        assert [path for path, _ in scraper._client.requested] == list(PAGES)
+
+    def test_response_cookies_are_kept(self):
+        scraper = make_scraper(cookies={"/Nintendo/": "datr=abc; Domain=.facebook.com; Path=/"})
+        run(collect(scraper.get_posts("Nintendo", options={"allow_extra_requests": False})))
+        assert scraper.session.cookies.get("datr") == "abc"
+        # And sent with the next requests
+        assert scraper._client.requested[1][1].get("datr") == "abc"
+
+    def test_identities(self, fake_session):
+        identities = []
+        for name in "ab":
+            identity = Identity(name=name)
+            identity.scraper.session = fake_session(pages=PAGES)
+            identities.append(identity)
+        scraper = make_scraper()
+        scraper.set_identities(identities)
+        posts = run(
+            collect(scraper.get_posts("Nintendo", options={"allow_extra_requests": False}))
+        )
+        assert [post["post_id"] for post in posts] == ["1", "2", "3", "4", "5"]
+        assert scraper._client.requested == []
+        assert [len(identity.scraper.session.requested) for identity in identities] == [1, 1]
+
+    def test_seen_posts(self, tmp_path):
+        seen_posts = SeenPostIndex(str(tmp_path / "seen.sqlite"))
+        seen_posts.add("Nintendo", "1")
+        seen_posts.add("Nintendo", "3")
+        seen_posts.add("Nintendo", "4")
+        scraper = make_scraper()
+        scraper.set_seen_posts(seen_posts)
+        posts = run(
+            collect(
+                scraper.get_posts(
+                    "Nintendo", max_known_posts=2, options={"allow_extra_requests": False}
+                )
+            )
+        )
+        # Stops at the second known post in a row, before post 5
+        assert [post["post_id"] for post in posts] == ["2"]
+        assert seen_posts.is_known("Nintendo", "2")
+        assert [path for path, _ in scraper._client.requested] == list(PAGES)
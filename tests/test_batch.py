@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+
+from facebook_scraper import exceptions
+from facebook_scraper.batch import BatchScraper, read_accounts, share_scraper
+from facebook_scraper.facebook_scraper import FacebookScraper
+from facebook_scraper.fb_types import Post
+
+
+class FakeTimelines:
+    """Stands in for FacebookScraper.get_posts and get_group_posts"""
+
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+        self.scraped = []
+
+    def get_posts(self, scraper, account, checkpoint, options, **kwargs):
+        self.scraped.append(account)
+        for i in range(3):
+            scraper.request_count += 1
+            if account in self.broken and i == 1:
+                raise ValueError("Unexpected page")
+            yield Post(post_id=f"{account}-{i}", text=options["account"])
+        checkpoint.finish()
+
+
+class TestBatchScraper:
+    def test_read_accounts(self, tmp_path):
+        path = tmp_path / "accounts.txt"
+        path.write_text("nintendo\n\n# Comment\n  group:123  \n")
+        assert read_accounts(str(path)) == ["nintendo", "group:123"]
+
+    def test_workers_have_their_own_session(self, tmp_path):
+        batch = BatchScraper(str(tmp_path), workers=2, scraper=FacebookScraper())
+        batch.scraper.session.cookies.set("c_user", "42")
+        first, second = share_scraper(batch.scraper), share_scraper(batch.scraper)
+        first.set_user_agent("First")
+        first.set_noscript(True)
+        second.set_noscript(False)
+        assert first.session.cookies.get("noscript") == "1"
+        assert second.session.cookies.get("c_user") == "42"
+        assert second.session.headers["User-Agent"] == batch.scraper.session.headers["User-Agent"]
+        assert "noscript" not in batch.scraper.session.cookies
+        # Connections are still pooled across workers
+        adapter = batch.scraper.session.get_adapter("https://m.facebook.com/")
+        assert first.session.get_adapter("https://m.facebook.com/") is adapter
+        assert second.session.get_adapter("https://m.facebook.com/") is adapter
+
+    def test_restart(self, tmp_path, monkeypatch):
+        timelines = FakeTimelines(broken={"nike"})
+
+        def get_posts(scraper, account, **kwargs):
+            return timelines.get_posts(scraper, account, **kwargs)
+
+        monkeypatch.setattr(FacebookScraper, "get_posts", get_posts)
+        monkeypatch.setattr(FacebookScraper, "get_group_posts", get_posts)
+        out = str(tmp_path / "out")
+
+        batch = BatchScraper(out, workers=2, scraper=FacebookScraper())
+        summary = batch.run(["nintendo", "nike", "group:123"])
+        assert summary["nintendo"]["status"] == "finished"
+        assert summary["nintendo"]["posts"] == 3
+        assert summary["nintendo"]["requests"] == 3
+        assert summary["group:123"]["status"] == "finished"
+        assert summary["nike"]["status"] == "failed"
+        assert summary["nike"]["errors"] == 1
+        with open(os.path.join(out, "nintendo_posts.jsonl")) as f:
+            assert [json.loads(line)["text"] for line in f] == ["nintendo"] * 3
+        assert os.path.exists(os.path.join(out, "group_123_posts.jsonl"))
+
+        # Running the batch again only retries the account that failed, in a new file
+        timelines.broken.clear()
+        timelines.scraped.clear()
+        batch = BatchScraper(out, workers=2, scraper=FacebookScraper())
+        summary = batch.run(["nintendo", "nike", "group:123"])
+        assert timelines.scraped == ["nike"]
+        assert summary["nike"]["status"] == "finished"
+        assert summary["nike"]["files"] == ["nike_posts.jsonl", "nike_posts.2.jsonl"]
+        assert summary["nike"]["requests"] == 5
+        with open(os.path.join(out, "summary.json")) as f:
+            assert json.load(f)["nike"]["status"] == "finished"
+        assert "nintendo" in batch.report()
+
+    def test_ban_cancels_pending_accounts(self, tmp_path, monkeypatch):
+        released = threading.Event()
+        scraped = []
+
+        def get_posts(scraper, account, checkpoint, **kwargs):
+            scraped.append(account)
+            if account == "banned":
+                raise exceptions.TemporarilyBanned("Temporarily blocked")
+            released.wait(5)
+            checkpoint.finish()
+            return iter(())
+
+        monkeypatch.setattr(FacebookScraper, "get_posts", get_posts)
+        timer = threading.Timer(0.2, released.set)
+        timer.start()
+        try:
+            batch = BatchScraper(str(tmp_path), workers=2, scraper=FacebookScraper())
+            summary = batch.run(["slow", "banned", "next", "last"])
+        finally:
+            timer.cancel()
+        # The ban is seen while "slow" is still running, before "last" could start
+        assert summary["banned"]["status"] == "banned"
+        assert "last" not in scraped
+        assert "last" not in summary
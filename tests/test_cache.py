@@ -0,0 +1,60 @@
+from facebook_scraper.cache import ResponseCache
+
+
+class TestResponseCache:
+    def test_identity_and_normalization(self):
+        cache = ResponseCache(":memory:")
+        url = "https://m.facebook.com/story.php?story_fbid=1&id=2&refid=52#footer"
+        cache.set(url, "a", url, 200, "text/html", b"<html></html>")
+        assert cache.get("https://m.facebook.com/story.php?id=2&story_fbid=1", "a") == (
+            url,
+            200,
+            "text/html",
+            b"<html></html>",
+        )
+        assert cache.get(url, "b") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_uncacheable_urls(self):
+        cache = ResponseCache(":memory:")
+        urls = [
+            "https://m.facebook.com/Nintendo/posts/",
+            "https://m.facebook.com/page_content_list_view/more/?page_id=1&cursor=abc",
+            "https://m.facebook.com/photo.php?fbid=1",
+        ]
+        for url in urls[:2]:
+            cache.set(url, "a", url, 200, "text/html", b"page")
+            assert cache.get(url, "a") is None
+        cache.set(urls[2], "a", "https://m.facebook.com/checkpoint/", 200, "text/html", b"page")
+        assert cache.get(urls[2], "a") is None
+        assert cache.stats()["stores"] == 0
+
+    def test_photo_ttls(self):
+        cache = ResponseCache(":memory:")
+        for url in [
+            "https://m.facebook.com/photo.php?fbid=1&id=2",
+            "https://m.facebook.com/Nintendo/photos/a.123/456/",
+            "https://m.facebook.com/Nintendo/photos/456/",
+        ]:
+            assert cache.get_ttl(url) == 30 * 24 * 3600
+        # The photos timeline and its pager change as photos are added
+        for url in [
+            "https://m.facebook.com/Nintendo/photos/",
+            "https://m.facebook.com/Nintendo/photos/?ref=page_internal",
+            "https://m.facebook.com/photos/pandora/?album_token=abc&cursor_mode=1",
+            "https://m.facebook.com/photos/pandora/123/?album_token=abc",
+        ]:
+            assert cache.get_ttl(url) is None
+
+    def test_expiry_and_eviction(self):
+        cache = ResponseCache(":memory:", ttls=[("/photos/", 60), ("/posts/", -1)], max_size=10)
+        cache.set("https://m.facebook.com/posts/1", "a", "", 200, "", b"old")
+        assert cache.get("https://m.facebook.com/posts/1", "a") is None
+        for i in range(3):
+            url = f"https://m.facebook.com/photos/{i}"
+            cache.set(url, "a", url, 200, "text/html", b"12345")
+        assert cache.get("https://m.facebook.com/photos/0", "a") is None
+        assert cache.get("https://m.facebook.com/photos/2", "a") is not None
+        assert cache.stats()["evictions"] == 1
+        assert cache.size == 10
@@ -0,0 +1,145 @@
+import json
+
+import pytest
+
+from facebook_scraper.checkpoint import Checkpoint
+from facebook_scraper.extractors import extract_post_id
+from facebook_scraper.facebook_scraper import FacebookScraper
+from facebook_scraper.fb_types import Post
+
+
+# Timeline pages by URL, with the post ids and the URL of the next page
+TIMELINE = {
+    "https://m.facebook.com/page/1": (["1", "2", "3"], "https://m.facebook.com/page/2"),
+    "https://m.facebook.com/page/2": (["4", "5", "6"], None),
+}
+
+
+@pytest.fixture
+def crawl(post_element):
+    def crawl(checkpoint, **kwargs):
+        requested = []
+        extracted = []
+        kwargs["checkpoint"] = checkpoint
+        FacebookScraper._use_checkpoint(kwargs)
+
+        def iter_pages():
+            url = kwargs.get("start_url") or "https://m.facebook.com/page/1"
+            while url:
+                kwargs["request_url_callback"](url)
+                requested.append(url)
+                post_ids, url = TIMELINE[url]
+                yield [post_element(post_id) for post_id in post_ids]
+
+        def extract_post(element, options, request_fn):
+            post_id = extract_post_id(element)
+            extracted.append(post_id)
+            # Comments are scraped a page at a time
+            record_cursor = options.get("comment_request_url_callback")
+            if record_cursor:
+                record_cursor(f"https://m.facebook.com/comments/{post_id}")
+            return Post(post_id=post_id, comments_full=options.get("comment_start_url"))
+
+        posts = FacebookScraper()._generic_get_posts(
+            extract_post,
+            iter_pages,
+            post_id_fn=extract_post_id,
+            page_limit=None,
+            checkpoint=kwargs["checkpoint"],
+            options=kwargs.get("options"),
+            after_flush=kwargs.get("after_flush"),
+        )
+        return posts, requested, extracted
+
+    return crawl
+
+
+class TestCheckpoint:
+    def test_resume(self, tmp_path, crawl):
+        path = str(tmp_path / "checkpoint.json")
+        posts, requested, _ = crawl(
+            Checkpoint.load(path, save_every=1), options={"comments": True}
+        )
+        assert [next(posts)["post_id"] for _ in range(4)] == ["1", "2", "3", "4"]
+        posts.close()
+
+        with open(path) as f:
+            state = json.load(f)
+        # Post 4 is only done once the next post is asked for
+        assert state["page_url"] == "https://m.facebook.com/page/2"
+        assert state["page_index"] == 0
+        assert state["posts"] == 3
+        assert state["options"] == {"comments": True}
+
+        # The crawl starts again from the second page, at the post that wasn't done
+        posts, requested, extracted = crawl(path)
+        posts = list(posts)
+        assert [post["post_id"] for post in posts] == ["4", "5", "6"]
+        # Post 4 was never written, so its comments are scraped again from the first page
+        assert posts[0]["comments_full"] is None
+        assert requested == ["https://m.facebook.com/page/2"]
+        assert extracted == ["4", "5", "6"]
+        checkpoint = Checkpoint.load(path)
+        assert checkpoint.finished
+        assert checkpoint.posts == 6
+
+        # A finished crawl has nothing left to do
+        posts, requested, _ = crawl(path)
+        assert list(posts) == []
+        assert requested == []
+
+    def test_interrupted_post_resumes_its_comments(self, tmp_path, crawl):
+        path = str(tmp_path / "checkpoint.json")
+        checkpoint = Checkpoint.load(path, save_every=1)
+        posts, _, _ = crawl(checkpoint, options={"comments": "generator"})
+        next(posts)
+        next(posts)
+        # Post 2 was interrupted while scraping its comments
+        posts.close()
+        checkpoint.set_cursor("2", "comments", "https://m.facebook.com/comments/2?page=3")
+        checkpoint.save()
+
+        posts, _, _ = crawl(path)
+        post = next(posts)
+        assert post["post_id"] == "2"
+        assert post["comments_full"] == "https://m.facebook.com/comments/2?page=3"
+        assert next(posts)["comments_full"] is None
+
+    def test_posts_are_done_once_flushed(self, tmp_path, crawl):
+        path = str(tmp_path / "checkpoint.json")
+        flushed = []
+        posts, _, _ = crawl(Checkpoint.load(path, save_every=1), after_flush=flushed.append)
+        assert [next(posts)["post_id"] for _ in range(5)] == ["1", "2", "3", "4", "5"]
+        # The sink flushed the first two posts before the crawl stopped
+        for fn in flushed[:2]:
+            fn()
+        posts.close()
+        with open(path) as f:
+            state = json.load(f)
+        assert state["page_url"] == "https://m.facebook.com/page/1"
+        assert state["page_index"] == 2
+        assert state["posts"] == 2
+
+        # Posts flushed after the crawl stopped are saved too
+        flushed[2]()
+        with open(path) as f:
+            state = json.load(f)
+        assert state["page_url"] == "https://m.facebook.com/page/2"
+        assert state["page_index"] == 0
+        assert state["posts"] == 3
+
+        posts, _, extracted = crawl(path)
+        assert [post["post_id"] for post in posts] == ["4", "5", "6"]
+        assert extracted == ["4", "5", "6"]
+
+    def test_crawl_without_options(self, tmp_path, fake_session):
+        path = str(tmp_path / "checkpoint.json")
+        scraper = FacebookScraper(session=fake_session())
+        assert list(scraper.get_posts("nintendo", checkpoint=path, pages=1)) == []
+        assert Checkpoint.load(path).finished
+
+    def test_set_options_are_saved(self, tmp_path):
+        checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"))
+        checkpoint.use_options({"fields": {"text", "time"}, "request_url_callback": print})
+        checkpoint.save()
+        assert Checkpoint.load(checkpoint.path).options == {"fields": ["text", "time"]}
@@ -0,0 +1,327 @@
+import json
+import pickle
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from requests_html import HTML
+
+from facebook_scraper import exceptions, utils
+from facebook_scraper.extractors import JsModIndex, PostExtractor
+from facebook_scraper.fb_types import Post, json_default
+
+
+POST_HTML = """
+<article data-ft='{"top_level_post_id":"123","content_owner_id_new":"42"}'>
+  <header><h3>
+    <strong><a href="/nintendo">Nintendo</a></strong> is with <a href="/alice">Alice</a>
+    and <a href="/browse/users/?ids=1,2">2 others</a>
+  </h3></header>
+  <div class="story_body_container"><div>
+    <p>Hello world</p>
+    <a href="/photo.php?fbid=1&id=42"><i class="img" style="background: url('1.jpg')"></i></a>
+    <a href="/photo.php?fbid=2&id=42"><i class="img" style="background: url('2.jpg')"></i></a>
+  </div></div>
+  <footer><abbr>Yesterday at 3:04 PM</abbr><span>12 Comments</span></footer>
+</article>
+"""
+
+
+class TestFields:
+    def extract_post(self, options):
+        requested = []
+
+        def request_fn(url):
+            requested.append(url)
+            raise ValueError(f"Unexpected request for {url}")
+
+        element = HTML(html=POST_HTML).find("article", first=True)
+        post = PostExtractor(element, dict(options, account="nintendo"), request_fn).extract_post()
+        return post, requested
+
+    def test_all_fields_by_default(self):
+        post, requested = self.extract_post({})
+        assert any("/browse/users/" in url for url in requested)
+        assert any("photo.php" in url for url in requested)
+
+    def test_skips_fields_not_requested(self):
+        post, requested = self.extract_post({"fields": ["time", "text", "comments"]})
+        assert requested == []
+        assert post["post_id"] == "123"
+        assert post["text"] == "Hello world"
+        assert post["comments"] == 12
+        assert post["time"] is not None
+        assert post["with"] is None
+        assert post["images"] is None
+
+    def test_relative_dates_from_the_options(self):
+        post, _ = self.extract_post({"fields": ["time"], "relative_base": datetime(2024, 2, 29)})
+        assert post["time"] == datetime(2024, 2, 28, 15, 4)
+
+
+class TestPost:
+    def test_dict_compatible(self):
+        post, _ = TestFields().extract_post({"fields": ["text"]})
+        assert isinstance(post, Post)
+        assert list(post)[:2] == ["post_id", "text"]
+        assert post["is_live"] is False
+        assert post.get("was_live") is None
+        post["extra"] = 1
+        assert post.pop("source") is not None
+        assert "source" not in post
+        assert list(post)[-1] == "extra"
+        assert dict(post) == post
+        copy = pickle.loads(pickle.dumps(post))
+        assert copy == post and list(copy) == list(post)
+
+    def test_json(self):
+        post, _ = TestFields().extract_post({"fields": ["time", "text"]})
+        with pytest.raises(TypeError):
+            json.dumps(post)
+        data = json.loads(json.dumps({"shared": post}, default=json_default))
+        assert data["shared"]["text"] == "Hello world"
+        assert data["shared"]["time"] == str(post["time"])
+
+    def test_extractors_write_into_the_post(self):
+        element = HTML(html=POST_HTML).find("article", first=True)
+        extractor = PostExtractor(element, {}, None)
+        extractor.post = post = Post()
+        assert extractor.extract_text() is post
+        assert extractor.extract_comments() is post
+        assert (post["text"], post["post_text"], post["comments"]) == ("Hello world",) * 2 + (12,)
+
+    def test_subclasses_can_return_fields(self):
+        class Extractor(PostExtractor):
+            def extract_text(self):
+                return {"text": "Overridden"}
+
+        element = HTML(html=POST_HTML).find("article", first=True)
+        post = Extractor(element, {"fields": ["text"]}, None).extract_post()
+        assert post["text"] == "Overridden"
+
+
+class TestJsModIndex:
+    html = (
+        '<script>s.handle({jsmods:{define:[["UFIReactionTypes",[],{LIKE:1,ordering:[1,2]},3504]],'
+        ' require:[["MLiveData","set",[],["1",{ft_ent_identifier:1,comment_count:2}]]]}});'
+        '</script>'
+    )
+
+    def test_get(self):
+        index = JsModIndex(self.html)
+        assert index.get("UFIReactionTypes") == {"LIKE": 1, "ordering": [1, 2]}
+        assert index.get("MLiveData") == {"ft_ent_identifier": 1, "comment_count": 2}
+        assert index.get("MissingModule") == {}
+
+    def test_shared_per_document(self):
+        document = HTML(html=self.html)
+        assert JsModIndex.of(document) is JsModIndex.of(document)
+
+
+def comment_html(comment_id, replies_url=None):
+    more = ""
+    if replies_url:
+        more = f"""<div class="async_elem" data-sigil="replies-see-more">
+          <a href="{replies_url}">More replies</a></div>"""
+    return f"""<div data-sigil="comment" id="{comment_id}"><h3>{comment_id}</h3>
+      <div data-sigil="comment-body">Comment {comment_id}</div>{more}</div>"""
+
+
+class TestReplyWorkers:
+    def extract_comments(self, options, banned=()):
+        comments = "".join(comment_html(f"c{i}", f"/replies/c{i}") for i in range(6))
+        full_post_html = HTML(html=f'<div id="ufi_1">{comments}</div>')
+        running = []
+        concurrency = []
+        lock = threading.Lock()
+
+        def request_fn(url, **kwargs):
+            comment_id = url.rsplit("/", 1)[1]
+            with lock:
+                running.append(url)
+                concurrency.append(len(running))
+            # Later comments are answered first
+            time.sleep(0.05 * (6 - int(comment_id[1:])))
+            with lock:
+                running.remove(url)
+            if comment_id in banned:
+                raise exceptions.TemporarilyBanned("Temporarily blocked")
+            html = comment_html(comment_id) + comment_html(f"{comment_id}r1")
+            html += comment_html(f"{comment_id}r2")
+            return utils.make_response(
+                None, "https://m.facebook.com" + url, 200, {}, html.encode()
+            )
+
+        extractor = PostExtractor(None, options, request_fn, full_post_html)
+        extractor.post = Post(post_id="1")
+        comments = []
+        for comment in extractor.extract_comments_full():
+            try:
+                replies = [reply["comment_id"] for reply in comment["replies"]]
+            except exceptions.TemporarilyBanned:
+                replies = "banned"
+            comments.append((comment["comment_id"], replies))
+        return comments, max(concurrency)
+
+    def test_replies_keep_their_order(self):
+        serial, max_concurrency = self.extract_comments({"comments": True})
+        assert max_concurrency == 1
+        assert serial[1] == ("c1", ["c1r1", "c1r2"])
+
+        comments, max_concurrency = self.extract_comments({"comments": True, "reply_workers": 4})
+        assert max_concurrency == 4
+        assert comments == serial
+
+    def test_bans_propagate(self):
+        comments, _ = self.extract_comments({"comments": True, "reply_workers": 4}, banned={"c2"})
+        assert comments[1] == ("c1", ["c1r1", "c1r2"])
+        assert comments[2] == ("c2", "banned")
+
+
+def photo_page(photo_id, next_id=None):
+    html = (
+        f'<a href="https://scontent.xx.fbcdn.net/{photo_id}.jpg" target="_blank" class="sec">'
+        f'View Full Size</a><i class="img" data-sigil="photo-image" alt="Photo {photo_id}"></i>'
+    )
+    if next_id:
+        html += (
+            f"""<a class="touchable" data-gt='{{"tn":"+>"}}' """
+            f'href="/photo.php?fbid={next_id}"></a>'
+        )
+    return html
+
+
+class TestPhotos:
+    def request_fn(self, pages):
+        requested = []
+
+        def request_fn(url):
+            requested.append(url)
+            page_id = re.search(r"(\d+)/?$", url).group(1)
+            # Earlier photos are answered last
+            time.sleep(0.01 * (30 - int(page_id) % 10 * 5))
+            html = pages[page_id]
+            return utils.make_response(None, url, 200, {}, html.encode())
+
+        return request_fn, requested
+
+    def extract_gallery(self, options):
+        pages = {str(i): photo_page(i, i + 1 if i < 15 else None) for i in range(11, 16)}
+        request_fn, requested = self.request_fn(pages)
+        links = "".join(
+            f'<a href="/nintendo/photos/a.1/{i}/">{"+2" if i == 14 else ""}</a>'
+            for i in range(11, 15)
+        )
+        html = f'<article><div class="story_body_container"><div>{links}</div></div></article>'
+        element = HTML(html=html).find("article", first=True)
+        extractor = PostExtractor(element, options, request_fn)
+        extractor.post = Post()
+        return extractor.extract_photo_link(), requested
+
+    @pytest.mark.parametrize("shared", [False, True])
+    def test_gallery_keeps_its_order(self, shared):
+        options = {}
+        if shared:
+            options["photo_executor"] = ThreadPoolExecutor(max_workers=4)
+        post, requested = self.extract_gallery(options)
+        assert post["images"] == [f"https://scontent.xx.fbcdn.net/{i}.jpg" for i in range(11, 16)]
+        assert post["image_ids"] == [str(i) for i in range(11, 16)]
+        assert post["images_description"] == [f"Photo {i}" for i in range(11, 16)]
+        # The fifth photo is only linked from the fourth one
+        assert requested[-1].endswith("/photo.php?fbid=15")
+        assert len(requested) == 5
+        if shared:
+            options["photo_executor"].shutdown()
+
+    def test_photoset_keeps_its_order(self):
+        nodes = [
+            {
+                "id": "21",
+                "is_playable": False,
+                "url": "https://www.facebook.com/photo.php?fbid=21",
+                "accessibility_caption": "Photo 21",
+            },
+            {
+                "id": "22",
+                "is_playable": True,
+                "playable_url_hd": "https://video.xx.fbcdn.net/22.mp4",
+                "full_width_image": {"uri": "https://scontent.xx.fbcdn.net/22.jpg"},
+                "accessibility_caption": "Video 22",
+            },
+            {
+                "id": "23",
+                "is_playable": False,
+                "url": "https://www.facebook.com/photo.php?fbid=23",
+                "accessibility_caption": "Photo 23",
+            },
+        ]
+        media = {"query_results": {"1": {"media": {"edges": [{"node": n} for n in nodes]}}}}
+        snowflake = json.dumps(media)
+        pages = {
+            "10": f'<script>["mtouch_snowflake_paged_query",[],{snowflake},1]</script>',
+            "21": photo_page(21),
+            "23": photo_page(23),
+        }
+        request_fn, requested = self.request_fn(pages)
+        extractor = PostExtractor(None, {}, request_fn)
+        extractor.post = Post()
+        url = "/media/set/?profileid=42&photoset_token=10"
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            post = extractor.extract_photoset(url, executor)
+        assert post["images"] == [f"https://scontent.xx.fbcdn.net/{i}.jpg" for i in (21, 22, 23)]
+        assert post["image_ids"] == ["21", "22", "23"]
+        assert post["images_description"] == ["Photo 21", "Video 22", "Photo 23"]
+        assert post["video_ids"] == ["22"]
+        assert requested[0] == "42/posts/10"
+
+
+def reactor_rows(page):
+    return "".join(
+        f'<div><a href="/p{page}{i}"><strong>Person {page}{i}</strong></a></div>'
+        for i in range(3)
+    )
+
+
+def reactors_pager(page):
+    url = f"/ufi/reaction/profile/browser/fetch/?page={page}"
+    return f'<div id="reaction_profile_pager"><a href="{url}">More</a></div>'
+
+
+class TestReactors:
+    def extract_reactors(self, options, pages=4):
+        requested = []
+        prefetched = threading.Event()
+
+        def request_fn(url, **kwargs):
+            page = int(url.rsplit("=", 1)[1])
+            requested.append(page)
+            prefetched.set()
+            actions = [{"cmd": "append", "html": reactor_rows(page)}]
+            if page < pages:
+                actions.append({"cmd": "replace", "html": reactors_pager(page + 1)})
+            content = "for (;;);" + json.dumps({"payload": {"actions": actions}})
+            return utils.make_response(None, url, 200, {}, content.encode())
+
+        html = f'<div id="reaction_profile_browser">{reactor_rows(1)}</div>{reactors_pager(2)}'
+        response = utils.make_response(None, "https://m.facebook.com/", 200, {}, html.encode())
+        extractor = PostExtractor(None, options, request_fn, HTML(html="<div></div>"))
+        reactors = extractor.extract_reactors(response)
+        first = next(reactors)
+        # The second page is requested while the first one is consumed
+        assert prefetched.wait(1)
+        return [first["name"]] + [reactor["name"] for reactor in reactors], requested
+
+    def test_all_pages(self):
+        names, requested = self.extract_reactors({"reactors": True})
+        assert names == [f"Person {page}{i}" for page in range(1, 5) for i in range(3)]
+        assert requested == [2, 3, 4]
+
+    def test_limit_is_exact(self):
+        names, requested = self.extract_reactors({"reactors": 7})
+        assert names == [f"Person {page}{i}" for page in range(1, 4) for i in range(3)][:7]
+        # The fourth page isn't needed
+        assert requested == [2, 3]
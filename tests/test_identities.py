@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+from facebook_scraper import exceptions
+from facebook_scraper.facebook_scraper import FacebookScraper
+from facebook_scraper.identities import Identity, IdentityPool
+
+
+@pytest.fixture
+def make_identity(fake_session):
+    def make_identity(name, title="Nintendo"):
+        identity = Identity(name=name)
+        identity.scraper.session = fake_session(title)
+        return identity
+
+    return make_identity
+
+
+class TestIdentityPool:
+    def test_spreads_requests(self, make_identity):
+        identities = [make_identity("a"), make_identity("b")]
+        scraper = FacebookScraper()
+        scraper.set_identities(identities)
+        for i in range(4):
+            scraper.get(f"https://m.facebook.com/{i}")
+        assert [len(identity.scraper.session.requested) for identity in identities] == [2, 2]
+
+    def test_quarantines_banned_identity(self, make_identity):
+        banned = make_identity("banned", "You can't use this feature at the moment")
+        healthy = make_identity("healthy")
+        pool = IdentityPool([banned, healthy], cooldown=60)
+        scraper = FacebookScraper()
+        scraper.set_identities(pool)
+
+        for i in range(3):
+            assert scraper.get(f"https://m.facebook.com/{i}").url.endswith(str(i))
+        assert len(banned.scraper.session.requested) == 1
+        assert len(healthy.scraper.session.requested) == 3
+        stats = {s["name"]: s for s in pool.stats()}
+        assert stats["banned"]["failures"] == 1
+        assert stats["banned"]["score"] == 0.5
+        assert 0 < stats["banned"]["quarantined_for"] <= 60
+
+    def test_raises_after_max_attempts(self, make_identity):
+        banned = make_identity("a", "You can't use this feature at the moment")
+        pool = IdentityPool([banned], cooldown=0, max_attempts=2)
+        with pytest.raises(exceptions.TemporarilyBanned):
+            pool.get("https://m.facebook.com/1")
+        assert len(banned.scraper.session.requested) == 2
+        # Other errors aren't the identity's fault
+        pool = IdentityPool([make_identity("a", "Page Not Found")])
+        with pytest.raises(exceptions.NotFound):
+            pool.get("https://m.facebook.com/1")
+        assert pool.stats()[0]["failures"] == 0
+
+    def test_raises_once_every_identity_failed(self, make_identity):
+        identities = [make_identity(name, "Log in to Facebook | Facebook") for name in "abc"]
+        pool = IdentityPool(identities, cooldown=60)
+        started = time.time()
+        with pytest.raises(exceptions.LoginRequired):
+            pool.get("https://m.facebook.com/1")
+        assert time.time() - started < 5
+        assert [len(identity.scraper.session.requested) for identity in identities] == [1, 1, 1]
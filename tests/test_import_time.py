@@ -0,0 +1,52 @@
+import json
+import subprocess
+import sys
+
+
+# Generous, importing the package took about a second when these were imported eagerly
+IMPORT_TIME_BUDGET = 0.6
+
+LAZY_MODULES = [
+    "aiohttp",
+    "bs4",
+    "dateparser",
+    "demjson3",
+    "lxml",
+    "pyarrow",
+    "pyppeteer",
+    "requests_html",
+    "tqdm",
+    "youtube_dl",
+    "zstandard",
+]
+
+SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import facebook_scraper
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "elapsed": elapsed,
+    "modules": sorted(name for name in sys.modules if name.split(".")[0] in %r),
+    "scraper_created": facebook_scraper._scraper._instance is not None,
+}))
+"""
+
+
+def import_package():
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT % LAZY_MODULES], check=True, stdout=subprocess.PIPE
+    ).stdout
+    return json.loads(output)
+
+
+class TestImportTime:
+    def test_heavy_dependencies_are_imported_lazily(self):
+        result = import_package()
+        assert result["modules"] == []
+        assert not result["scraper_created"]
+
+    def test_import_time_budget(self):
+        # The best of a few runs, so a busy machine doesn't fail the test
+        elapsed = min(import_package()["elapsed"] for _ in range(3))
+        assert elapsed < IMPORT_TIME_BUDGET
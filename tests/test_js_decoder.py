@@ -0,0 +1,31 @@
+import pytest
+
+from facebook_scraper.js_decoder import JSDecodeError, JSDecoder, js_to_json
+
+
+class TestJSDecoder:
+    def test_paths(self):
+        decoder = JSDecoder()
+        assert decoder.decode('{"top_level_post_id":"123"}', "data_ft") == {
+            "top_level_post_id": "123"
+        }
+        assert decoder.decode("{a:1,b:'it\\'s',c:[1e3,-2,],}", "jsmod") == {
+            "a": 1,
+            "b": "it's",
+            "c": [1000.0, -2],
+        }
+        # Not handled by the tokenizer, left to demjson
+        assert decoder.decode("{a:0x10}", "jsmod") == {"a": 16}
+        with pytest.raises(JSDecodeError):
+            decoder.decode("{a:", "jsmod")
+        assert decoder.stats() == {
+            "data_ft": {"json": 1, "tokenizer": 0, "demjson": 0, "failed": 0},
+            "jsmod": {"json": 0, "tokenizer": 1, "demjson": 1, "failed": 1},
+        }
+
+    def test_js_to_json(self):
+        assert js_to_json("{key:'a\"b\\x41',url:\"a\\/b\",t:true}") == (
+            '{"key":"a\\"b\\u0041","url":"a\\/b","t":true}'
+        )
+        # Nothing inside strings is taken for a key or a trailing comma
+        assert js_to_json('{"a:b, ]":\'c:d,}\'}') == '{"a:b, ]":"c:d,}"}'
@@ -0,0 +1,92 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from requests.exceptions import HTTPError
+
+from facebook_scraper.page_iterators import generic_iter_pages
+
+
+class FakePageParser:
+    def __init__(self, response):
+        self.response = response
+
+    def get_page(self):
+        if self.response == "error":
+            raise ValueError("Can't parse page")
+        return [self.response]
+
+    def get_next_page(self):
+        return self.response.get("next") if isinstance(self.response, dict) else None
+
+
+class TestPrefetchPages:
+    def iter_pages(self, urls, **kwargs):
+        requested = []
+
+        def request_fn(url):
+            requested.append(url)
+            if isinstance(urls[url], Exception):
+                raise urls[url]
+            return urls[url]
+
+        pages = generic_iter_pages(
+            "https://m.facebook.com/1", FakePageParser, request_fn, **kwargs
+        )
+        return pages, requested
+
+    def test_pages_are_yielded_in_order(self):
+        urls = {
+            "https://m.facebook.com/1": {"next": "/2"},
+            "https://m.facebook.com/2": {"next": "/3"},
+            "https://m.facebook.com/3": {},
+        }
+        callback_urls = []
+        pages, requested = self.iter_pages(
+            urls, options={"prefetch_pages": 2}, request_url_callback=callback_urls.append
+        )
+        expected = [[urls[url]] for url in urls]
+        assert list(pages) == expected
+        assert requested == list(urls)
+        assert callback_urls == list(urls)
+
+    def test_page_limit(self):
+        urls = {f"https://m.facebook.com/{i}": {"next": f"/{i + 1}"} for i in range(1, 10)}
+        pages, requested = self.iter_pages(urls, options={"prefetch_pages": 1}, page_limit=3)
+        assert len(list(pages)) == 3
+        assert len(requested) == 3
+
+    def test_errors_are_raised_in_order(self):
+        urls = {
+            "https://m.facebook.com/1": {"next": "/2"},
+            "https://m.facebook.com/2": "error",
+        }
+        pages, _ = self.iter_pages(urls, options={"prefetch_pages": 2})
+        assert next(pages) == [urls["https://m.facebook.com/1"]]
+        with pytest.raises(ValueError):
+            next(pages)
+
+    def test_noscript_is_switched_by_the_consumer(self):
+        error = HTTPError("500 Server Error", response=SimpleNamespace(status_code=500))
+        urls = {
+            "https://m.facebook.com/1": {"next": "/2"},
+            "https://m.facebook.com/2": error,
+            "https://m.facebook.com/3": {},
+        }
+        switched = []
+
+        class Scraper:
+            session = SimpleNamespace(cookies={})
+
+            def set_noscript(self, noscript):
+                switched.append(threading.current_thread())
+                # Facebook answers the noscript page
+                urls["https://m.facebook.com/2"] = {"next": "/3"}
+                self.session.cookies["noscript"] = "1"
+
+        pages, requested = self.iter_pages(
+            urls, options={"prefetch_pages": 2}, scraper=Scraper(), page_limit=3
+        )
+        assert len(list(pages)) == 3
+        assert switched == [threading.current_thread()]
+        assert requested[-2:] == ["https://m.facebook.com/2", "https://m.facebook.com/3"]
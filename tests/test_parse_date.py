@@ -52,3 +52,34 @@ class TestParseDate:
             except AssertionError as e:
                 print(f'Failed to parse {date}')
                 raise e
+
+    def test_fast_path_matches_dateparser(self):
+        import dateparser
+        from datetime import datetime
+
+        from facebook_scraper.utils import _parse_datetime
+
+        base = datetime(2024, 2, 29)
+        for date in self.dates + ['Feb 29 at 1:00 PM', 'Feb 30 at 1:00 PM', '1 yr', '25:00']:
+            expected = dateparser.parse(date, settings={'RELATIVE_BASE': base})
+            if expected is not None:
+                expected = expected.replace(microsecond=0)
+            assert _parse_datetime(date, False, base) == expected, date
+
+    def test_day_of_week(self):
+        from datetime import datetime
+
+        from facebook_scraper.utils import _parse_datetime
+
+        base = datetime(2024, 2, 29)  # Thursday
+        assert _parse_datetime('on Mon', True, base) == datetime(2024, 2, 26)
+        assert _parse_datetime('Thu', True, base) == datetime(2024, 2, 22)
+
+    def test_relative_base(self):
+        from datetime import datetime
+
+        base = datetime(2024, 2, 29)
+        assert parse_datetime('2 hrs', relative_base=base) == datetime(2024, 2, 28, 22)
+        assert parse_datetime('Yesterday at 3:04 PM', relative_base=base) == datetime(
+            2024, 2, 28, 15, 4
+        )
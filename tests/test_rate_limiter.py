@@ -0,0 +1,81 @@
+import pytest
+
+from facebook_scraper import exceptions
+from facebook_scraper.facebook_scraper import FacebookScraper
+from facebook_scraper.rate_limiter import RateLimiter
+
+
+LIMITS = [("photos", r"/photo\.php", 1, 2), ("other", r"", 10, 1)]
+
+
+class TestRateLimiter:
+    def test_endpoints(self):
+        limiter = RateLimiter()
+        assert limiter.endpoint("https://m.facebook.com/photo.php?fbid=1") == "photos"
+        assert limiter.endpoint("https://m.facebook.com/story.php?story_fbid=1") == "permalinks"
+        assert limiter.endpoint("https://www.facebook.com/1") == "www"
+        assert limiter.endpoint("https://m.facebook.com/nintendo/about/") == "other"
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "https://m.facebook.com/nintendo/",
+            "https://m.facebook.com/nintendo/?v=timeline",
+            "https://m.facebook.com/groups/117507531664134/",
+            "https://m.facebook.com/page_content_list_view/more/?page_id=1&cursor=abc",
+            "https://m.facebook.com/groups/117507531664134?bacr=1",
+        ],
+    )
+    def test_timeline_pages(self, url):
+        assert RateLimiter().endpoint(url) == "timeline"
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "https://m.facebook.com/3065154550235644",
+            "https://m.facebook.com/nintendo/posts/3065154550235644",
+            "https://m.facebook.com/groups/117507531664134/permalink/1/",
+            "https://m.facebook.com/story.php?story_fbid=1&id=2",
+        ],
+    )
+    def test_permalinks_are_not_timeline_pages(self, url):
+        assert RateLimiter().endpoint(url) != "timeline"
+
+    def test_burst_then_wait(self):
+        limiter = RateLimiter(LIMITS)
+        url = "https://m.facebook.com/photo.php?fbid=1"
+        assert limiter.reserve(url) == 0
+        assert limiter.reserve(url) == 0
+        assert limiter.reserve(url) == pytest.approx(1, abs=0.01)
+        assert limiter.reserve(url) == pytest.approx(2, abs=0.01)
+        # Other endpoints have their own budget
+        assert limiter.reserve("https://m.facebook.com/nintendo/") == 0
+
+    def test_slow_down_and_recover(self):
+        limiter = RateLimiter(LIMITS, recovery=0.25)
+        url = "https://m.facebook.com/photo.php?fbid=1"
+        limiter.slow_down(url)
+        assert limiter.stats()["rates"]["photos"] == 0.5
+        assert limiter.reserve(url) == pytest.approx(2, abs=0.01)
+        limiter.speed_up(url)
+        limiter.speed_up(url)
+        limiter.speed_up(url)
+        assert limiter.stats()["rates"] == {"photos": 1, "other": 10}
+
+
+class TestFacebookScraperRateLimiting:
+    def test_slows_down_on_temporary_ban(self, fake_session):
+        session = fake_session("You can't use this feature at the moment")
+        scraper = FacebookScraper(session=session)
+        scraper.set_rate_limiter(RateLimiter(LIMITS))
+        with pytest.raises(exceptions.TemporarilyBanned):
+            scraper.get("https://m.facebook.com/photo.php?fbid=1")
+        assert scraper.rate_limiter.stats()["slowdowns"] == 1
+        assert scraper.rate_limiter.stats()["rates"]["photos"] == 0.5
+
+    def test_speeds_up_on_healthy_responses(self, fake_session):
+        scraper = FacebookScraper(session=fake_session())
+        scraper.set_rate_limiter(RateLimiter(LIMITS))
+        scraper.rate_limiter.slow_down("https://m.facebook.com/nintendo/")
+        scraper.get("https://m.facebook.com/nintendo/")
+        assert scraper.rate_limiter.stats()["rates"]["other"] == pytest.approx(5.5)
@@ -0,0 +1,90 @@
+import glob
+import gzip
+import json
+import os
+import re
+
+import pytest
+import yaml
+
+from facebook_scraper.utils import remove_control_characters
+
+
+def reference_remove_control_characters(html):
+    """The original implementation, which encoded every non-ascii character before
+    checking every character reference in Python"""
+
+    def strip_illegal_xml_characters(s, default, base=10):
+        n = int(s, base)
+        if (
+            n in (0xB, 0xC, 0xFFFE, 0xFFFF)
+            or 0x0 <= n <= 0x8
+            or 0xE <= n <= 0x1F
+            or 0xD800 <= n <= 0xDFFF
+        ):
+            return ""
+        return default
+
+    html = html.encode("ascii", "xmlcharrefreplace").decode("utf-8")
+    html = re.sub(
+        r"&#(\d+);?", lambda c: strip_illegal_xml_characters(c.group(1), c.group(0)), html
+    )
+    html = re.sub(
+        r"&#[xX]([0-9a-fA-F]+);?",
+        lambda c: strip_illegal_xml_characters(c.group(1), c.group(0), base=16),
+        html,
+    )
+    html = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1F\uD800-\uDFFF￾￿]").sub("", html)
+    return html
+
+
+def cassette_bodies():
+    pattern = os.path.join(os.path.dirname(__file__), "cassettes", "*.yaml")
+    for filename in sorted(glob.glob(pattern)):
+        with open(filename) as f:
+            cassette = yaml.safe_load(f)
+        for interaction in cassette["interactions"]:
+            body = interaction["response"]["body"]["string"]
+            if isinstance(body, str):
+                body = body.encode()
+            if body.startswith(b"\x1f\x8b"):
+                body = gzip.decompress(body)
+            text = body.decode("utf-8", errors="replace")
+            yield text
+            if text.startswith("for (;;);"):
+                # The HTML of AJAX payloads, as PageParser passes it to make_html_element
+                data = json.loads(text[len("for (;;);") :])
+                for action in data.get("payload", data).get("actions", []):
+                    if action.get("html"):
+                        yield action["html"]
+
+
+class TestRemoveControlCharacters:
+    @pytest.mark.parametrize(
+        "html",
+        [
+            "",
+            "plain ascii",
+            "emoji 💖 and accents é",
+            "controls \x00\x08\x0b\x0c\x0e\x1f kept \t\n\r",
+            "refs &#11; &#x0B; &#65; &#x41 &#128150; &#xd83d; &#55357;",
+            "lone surrogate \ud83d and ￾￿",
+            "&#\ud83dx1; &#\ud83d12; &#1\ud83d &#65\ud83d;",
+            "&\ud83d#x1; &#x1é &#12é &#x&#11;",
+            "arabic digits &#٣; &#x٣;",
+        ],
+    )
+    def test_edge_cases(self, html):
+        assert remove_control_characters(html) == reference_remove_control_characters(html)
+
+    def test_references(self):
+        for n in [*range(0x10000), 0x10FFFF, 0x110000]:
+            for reference in [f"&#{n};", f"&#00{n}", f"&#x{n:x};", f"&#X{n:X}"]:
+                html = f"a{reference}b"
+                assert remove_control_characters(html) == reference_remove_control_characters(
+                    html
+                )
+
+    def test_cassettes(self):
+        for body in cassette_bodies():
+            assert remove_control_characters(body) == reference_remove_control_characters(body)
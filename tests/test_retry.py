@@ -0,0 +1,59 @@
+import time
+
+import pytest
+from requests.exceptions import ConnectionError, HTTPError
+
+from facebook_scraper import utils
+from facebook_scraper.facebook_scraper import FacebookScraper
+from facebook_scraper.retry import RetryPolicy
+
+
+def http_error(status_code, headers=None):
+    response = utils.make_response(
+        None, "https://m.facebook.com/", status_code, headers or {}, b""
+    )
+    return HTTPError(f"{status_code} Error", response=response)
+
+
+class TestRetryPolicy:
+    def test_backoff(self):
+        policy = RetryPolicy(base_delay=1, max_delay=3)
+        started = time.monotonic()
+        delays = [policy.get_delay(attempt, http_error(503), started) for attempt in range(1, 6)]
+        assert 0.5 <= delays[0] <= 1
+        assert 1 <= delays[1] <= 2
+        assert 1.5 <= delays[2] <= 3
+        assert 1.5 <= delays[3] <= 3
+        assert delays[4] is None
+
+    def test_rules(self):
+        policy = RetryPolicy(rules=[(ConnectionError, 2)])
+        started = time.monotonic()
+        assert policy.get_delay(1, ConnectionError(), started) is not None
+        assert policy.get_delay(2, ConnectionError(), started) is None
+        assert policy.get_delay(1, http_error(404), started) is None
+        assert policy.get_delay(1, ValueError(), started) is None
+
+    def test_retry_after_and_deadline(self):
+        policy = RetryPolicy(deadline=10)
+        started = time.monotonic()
+        assert policy.get_delay(1, http_error(429, {"Retry-After": "7"}), started) == 7
+        assert policy.get_delay(1, http_error(429, {"Retry-After": "11"}), started) is None
+        assert policy.get_delay(1, http_error(503), started - 10) is None
+
+
+class TestFacebookScraperRetries:
+    def test_retries_transient_errors(self, fake_session):
+        session = fake_session(
+            status_codes=[None, 503, 200], response_headers={"Retry-After": "0"}
+        )
+        scraper = FacebookScraper(session=session)
+        scraper.set_retry_policy(RetryPolicy(base_delay=0.01))
+        assert scraper.get("https://m.facebook.com/nintendo/").status_code == 200
+        assert len(session.requested) == 3
+
+    def test_no_retry_policy(self, fake_session):
+        scraper = FacebookScraper(session=fake_session(status_codes=[503, 200]))
+        scraper.set_retry_policy(None)
+        with pytest.raises(HTTPError):
+            scraper.get("https://m.facebook.com/nintendo/")
@@ -0,0 +1,57 @@
+from facebook_scraper.extractors import extract_post_id
+from facebook_scraper.facebook_scraper import FacebookScraper
+from facebook_scraper.fb_types import Post
+
+
+class Crawl:
+    """A timeline with the given pages of post ids, recording what was requested"""
+
+    def __init__(self, post_element, *pages):
+        self.post_element = post_element
+        self.pages = pages
+        self.requested_pages = 0
+        self.extracted = []
+
+    def iter_pages(self):
+        for page in self.pages:
+            self.requested_pages += 1
+            yield [self.post_element(post_id) for post_id in page]
+
+    def extract_post(self, element, options, request_fn):
+        post_id = extract_post_id(element)
+        self.extracted.append(post_id)
+        return Post(post_id=post_id, text=element.text)
+
+    def run(self, scraper, **kwargs):
+        posts = scraper._generic_get_posts(
+            self.extract_post,
+            self.iter_pages,
+            seen_key="nintendo",
+            post_id_fn=extract_post_id,
+            **kwargs,
+        )
+        return [post["post_id"] for post in posts]
+
+
+class TestSeenPostIndex:
+    def test_extract_post_id(self, post_element):
+        assert extract_post_id(post_element("123")) == "123"
+
+    def test_incremental_crawl(self, tmp_path, post_element):
+        scraper = FacebookScraper()
+        scraper.set_seen_posts(str(tmp_path / "seen.sqlite"))
+
+        first = Crawl(post_element, ["3", "2"], ["1"])
+        assert first.run(scraper) == ["3", "2", "1"]
+
+        # The new post is scraped, the pinned post 1 and the known posts are skipped without
+        # being extracted, and the timeline isn't walked past max_known_posts known posts
+        second = Crawl(post_element, ["1", "5", "4", "3"], ["2", "0"], ["-1"])
+        assert second.run(scraper, max_known_posts=2) == ["5", "4"]
+        assert second.extracted == ["5", "4"]
+        assert second.requested_pages == 2
+        assert scraper.seen_posts.stats() == {"posts": 5, "skipped": 3, "added": 5}
+
+        # Other accounts have their own posts
+        assert scraper.seen_posts.is_known("nintendo", "5")
+        assert not scraper.seen_posts.is_known("nike", "5")
@@ -0,0 +1,291 @@
+import csv
+import gzip
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+import pytest
+
+import facebook_scraper
+from facebook_scraper.fb_types import Post
+from facebook_scraper.sinks import (
+    CsvSink,
+    JsonLinesSink,
+    JsonSink,
+    QueuedSink,
+    Sink,
+    SqliteSink,
+    make_sink,
+    numbered_filename,
+)
+
+
+def make_posts(count):
+    return [Post(post_id=str(i), text=f"Post {i}", likes=i) for i in range(count)]
+
+
+class ListSink(Sink):
+    def __init__(self):
+        self.batches = []
+        self.closed = False
+
+    def write_many(self, posts):
+        self.batches.append(list(posts))
+
+    def close(self):
+        self.closed = True
+
+
+class TestFileSinks:
+    def test_json_is_an_array(self, tmp_path):
+        filename = str(tmp_path / "posts.json")
+        with JsonSink(filename, keys=["post_id", "likes"]) as sink:
+            sink.write_many(make_posts(2))
+            sink.write(make_posts(3)[2])
+        with open(filename) as f:
+            assert json.load(f) == [
+                {"post_id": "0", "likes": 0},
+                {"post_id": "1", "likes": 1},
+                {"post_id": "2", "likes": 2},
+            ]
+
+    def test_empty_json(self, tmp_path):
+        filename = str(tmp_path / "posts.json")
+        JsonSink(filename).close()
+        with open(filename) as f:
+            assert json.load(f) == []
+
+    def test_json_lines_gzip(self, tmp_path):
+        filename = str(tmp_path / "posts.jsonl.gz")
+        with make_sink("jsonl", filename) as sink:
+            assert isinstance(sink, JsonLinesSink)
+            sink.write_many(make_posts(3))
+        with gzip.open(filename, "rt") as f:
+            posts = [json.loads(line) for line in f]
+        assert [post["text"] for post in posts] == ["Post 0", "Post 1", "Post 2"]
+
+    def test_csv_header_from_first_post(self, tmp_path):
+        filename = str(tmp_path / "posts.csv")
+        with CsvSink(filename) as sink:
+            sink.write_many(make_posts(2))
+        with open(filename, newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 2
+        assert rows[1]["post_id"] == "1"
+        assert list(rows[0])[:3] == list(Post.fields)[:3]
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            make_sink("xml", str(tmp_path / "posts.xml"))
+
+    def test_numbered_filename(self, tmp_path):
+        filename = str(tmp_path / "nike_posts.jsonl.gz")
+        assert numbered_filename(filename) == filename
+        open(filename, "w").close()
+        open(str(tmp_path / "nike_posts.2.jsonl.gz"), "w").close()
+        assert numbered_filename(filename) == str(tmp_path / "nike_posts.3.jsonl.gz")
+
+    def test_write_posts_to_csv_resumes_into_a_new_file(self, tmp_path, monkeypatch):
+        filename = str(tmp_path / "nintendo_posts.jsonl")
+        checkpoint = str(tmp_path / "nintendo.checkpoint.json")
+        runs = [make_posts(2), make_posts(3)[2:]]
+
+        def get_posts(**kwargs):
+            return iter(runs.pop(0))
+
+        monkeypatch.setattr(facebook_scraper, "get_posts", get_posts)
+        for _ in range(2):
+            facebook_scraper.write_posts_to_csv(
+                "nintendo", filename=filename, format="jsonl", checkpoint=checkpoint
+            )
+        with open(filename) as f:
+            assert [json.loads(line)["post_id"] for line in f] == ["0", "1"]
+        with open(str(tmp_path / "nintendo_posts.2.jsonl")) as f:
+            assert [json.loads(line)["post_id"] for line in f] == ["2"]
+
+
+class TestQueuedSink:
+    def test_batches(self):
+        inner = ListSink()
+        sink = QueuedSink(inner, batch_size=10)
+        sink.write_many(make_posts(25))
+        sink.close()
+        assert inner.closed
+        assert sum(len(batch) for batch in inner.batches) == 25
+        assert all(len(batch) <= 10 for batch in inner.batches)
+        assert sink.stats()["written"] == 25
+
+    def test_backpressure(self):
+        release = threading.Event()
+
+        class SlowSink(ListSink):
+            def write_many(self, posts):
+                release.wait()
+                super().write_many(posts)
+
+        sink = QueuedSink(SlowSink(), batch_size=1, max_queued=2)
+        writer = threading.Thread(target=sink.write_many, args=(make_posts(10),))
+        writer.start()
+        writer.join(0.2)
+        # The writer thread holds one post and the queue two, the rest wait
+        assert writer.is_alive()
+        assert sink.queue.qsize() == 2
+        release.set()
+        writer.join()
+        sink.close()
+        assert sink.stats()["written"] == 10
+
+    def test_call_after_flush(self):
+        inner = ListSink()
+        sink = QueuedSink(inner, flush_interval=60)
+        flushed = []
+        sink.write_many(make_posts(3))
+        sink.call_after_flush(lambda: flushed.append(sum(map(len, inner.batches))))
+        sink.write_many(make_posts(2))
+        sink.thread.join(0.1)
+        # Not flushed yet
+        assert flushed == []
+        sink.close()
+        assert flushed == [5]
+
+        class BrokenSink(ListSink):
+            def write_many(self, posts):
+                raise OSError("No space left on device")
+
+        sink = QueuedSink(BrokenSink())
+        sink.write(make_posts(1)[0])
+        sink.call_after_flush(lambda: flushed.append("broken"))
+        with pytest.raises(OSError):
+            sink.close()
+        assert flushed == [5]
+
+    def test_errors_are_raised_to_the_writer(self):
+        class BrokenSink(ListSink):
+            def write_many(self, posts):
+                raise OSError("No space left on device")
+
+        sink = QueuedSink(BrokenSink(), flush_interval=0.01)
+        sink.write(make_posts(1)[0])
+        sink.thread.join(0.2)
+
+        # The writer thread waits for the end of the queue rather than polling it
+        gets = []
+        get = sink.queue.get
+
+        def counting_get(*args, **kwargs):
+            gets.append(kwargs.get("timeout"))
+            return get(*args, **kwargs)
+
+        sink.queue.get = counting_get
+        sink.thread.join(0.2)
+        with pytest.raises(OSError):
+            sink.close()
+        assert sink.sink.closed
+        assert len(gets) <= 2
+
+
+class TestParquetSink:
+    def test_typed_columns(self, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        from facebook_scraper.sinks import ParquetSink
+
+        filename = str(tmp_path / "posts.parquet")
+        posts = make_posts(5)
+        posts[0].update(
+            time=datetime(2021, 6, 1, 12, 30),
+            images=["https://example.com/1.jpg", "https://example.com/2.jpg"],
+            reactions={"like": 3, "love": 1},
+            reactors=[{"name": "Kevin", "link": "https://facebook.com/kevin", "type": "like"}],
+            comments_full=[
+                {
+                    "comment_id": "10",
+                    "comment_text": "Nice",
+                    "comment_reaction_count": "2",
+                    "replies": [{"comment_id": "11", "comment_text": "Thanks"}],
+                }
+            ],
+            fetched_time=datetime(2021, 6, 2),
+            header={"unknown": "type"},
+        )
+        posts[1]["likes"] = "not a number"
+        with ParquetSink(filename, row_group_size=2) as sink:
+            sink.write_many(posts)
+
+        parquet_file = pq.ParquetFile(filename)
+        assert parquet_file.metadata.num_row_groups == 3
+        table = parquet_file.read()
+        assert str(table.schema.field("likes").type) == "int64"
+        assert str(table.schema.field("time").type) == "timestamp[us]"
+        assert str(table.schema.field("images").type.value_type) == "string"
+        rows = table.to_pylist()
+        assert [row["likes"] for row in rows] == [0, None, 2, 3, 4]
+        assert rows[0]["time"] == datetime(2021, 6, 1, 12, 30)
+        assert rows[0]["images"] == ["https://example.com/1.jpg", "https://example.com/2.jpg"]
+        assert dict(rows[0]["reactions"]) == {"like": 3, "love": 1}
+        assert rows[0]["reactors"][0]["name"] == "Kevin"
+        comment = rows[0]["comments_full"][0]
+        assert comment["comment_reaction_count"] == 2
+        assert comment["replies"][0]["comment_text"] == "Thanks"
+        assert json.loads(rows[0]["header"]) == {"unknown": "type"}
+        assert rows[1]["images"] is None
+
+
+class TestSqliteSink:
+    def test_upsert(self, tmp_path):
+        filename = str(tmp_path / "posts.sqlite")
+        posts = make_posts(2)
+        posts[0]["comments_full"] = [
+            {
+                "comment_id": "10",
+                "comment_text": "Nice",
+                "comment_reactors": [
+                    {"name": "A", "link": "https://facebook.com/a", "type": "like"}
+                ],
+                "replies": [{"comment_id": "11", "comment_text": "Thanks"}],
+            }
+        ]
+        posts[0]["reactors"] = [{"name": "B", "link": "https://facebook.com/b", "type": "love"}]
+        with SqliteSink(filename) as sink:
+            sink.write_many(posts)
+
+        # The second run sees a new post, more likes on the first one, and nothing new on the
+        # second one
+        posts = make_posts(3)
+        posts[0]["likes"] = 5
+        posts[1]["likes"] = None
+        with SqliteSink(filename) as sink:
+            sink.write_many(posts)
+
+        connection = sqlite3.connect(filename)
+        rows = connection.execute(
+            "SELECT post_id, likes, first_run, changed_run, seen_run FROM posts ORDER BY post_id"
+        ).fetchall()
+        assert rows == [("0", 5, 1, 2, 2), ("1", 1, 1, 1, 2), ("2", 2, 2, 2, 2)]
+        assert connection.execute("SELECT comment_id, parent_id FROM comments").fetchall() == [
+            ("10", None),
+            ("11", "10"),
+        ]
+        assert connection.execute(
+            "SELECT comment_id, name FROM reactors ORDER BY name"
+        ).fetchall() == [("10", "A"), ("", "B")]
+        assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+    def test_write_posts_to_csv_updates_the_database(self, tmp_path, monkeypatch):
+        filename = str(tmp_path / "nintendo.sqlite")
+        runs = [make_posts(2), make_posts(3)]
+        runs[1][1]["likes"] = 7
+
+        def get_posts(**kwargs):
+            return iter(runs.pop(0))
+
+        monkeypatch.setattr(facebook_scraper, "get_posts", get_posts)
+        facebook_scraper.write_posts_to_csv("nintendo", filename=filename, format="sqlite")
+        facebook_scraper.write_posts_to_csv("nintendo", filename=filename, format="sqlite")
+        connection = sqlite3.connect(filename)
+        rows = connection.execute(
+            "SELECT post_id, likes, first_run, changed_run, seen_run FROM posts ORDER BY post_id"
+        ).fetchall()
+        assert rows == [("0", 0, 1, 1, 2), ("1", 7, 1, 2, 2), ("2", 2, 2, 2, 2)]
+        connection.close()
+
@@ -0,0 +1,43 @@
+from requests_html import HTML
+
+from facebook_scraper.extractors import PostExtractor
+from facebook_scraper.facebook_scraper import FacebookScraper
+from facebook_scraper.timings import Timings
+
+
+class TestTimings:
+    def test_stats(self):
+        timings = Timings()
+        for seconds in [0.003] * 8 + [0.3, 12]:
+            timings.add("request", seconds, 100)
+        stats = timings.stats()["request"]
+        assert stats["count"] == 10
+        assert stats["bytes"] == 1000
+        assert stats["p50"] == 0.005
+        assert stats["p90"] == 0.5
+        assert stats["max"] == 12
+        assert stats["histogram"]["<=0.005s"] == 8
+        assert stats["histogram"]["<=30s"] == 1
+        assert "request" in timings.report()
+
+    def test_extract_methods_are_timed(self):
+        timings = Timings()
+        element = HTML(html="<article data-ft='{\"top_level_post_id\":\"1\"}'></article>").find(
+            "article", first=True
+        )
+        options = {"allow_extra_requests": False, "timings": timings}
+        PostExtractor(element, options, None).extract_post()
+        stats = timings.stats()
+        assert stats["extract.extract_post_id"]["count"] == 1
+        assert stats["extract.extract_time"]["count"] == 1
+
+    def test_requests_are_timed(self, fake_session):
+        scraper = FacebookScraper(session=fake_session())
+        scraper.set_timings(True)
+        scraper.get("https://m.facebook.com/nintendo")
+        stats = scraper.timings.stats()
+        assert stats["request"]["count"] == 1
+        content = b"<html><head><title>Nintendo</title><script></script></head></html>"
+        assert stats["request"]["bytes"] == len(content)
+        assert stats["request.ttfb"]["count"] == 1
+        assert stats["throttle"]["count"] == 1